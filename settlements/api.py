@@ -0,0 +1,244 @@
+from django.core.exceptions import BadRequest, ImproperlyConfigured
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+from .facades import StatisticsFacade
+from .models import Municipality, Region
+from .pagination import KeysetCursor
+from .services import SettlementExporter, get_dataset_version
+
+_NOT_LOADED = object()
+
+
+def request_dataset_version(request):
+    """Версия набора данных, прочитанная один раз на запрос"""
+    dataset_version = getattr(request, '_settlements_dataset_version', _NOT_LOADED)
+
+    if dataset_version is _NOT_LOADED:
+        dataset_version = get_dataset_version()
+        request._settlements_dataset_version = dataset_version
+
+    return dataset_version
+
+
+def dataset_etag(request, *args, **kwargs):
+    """ETag ответа API: меняется с каждым импортом"""
+    dataset_version = request_dataset_version(request)
+    return f"settlements-v{dataset_version.version}" if dataset_version else None
+
+
+def dataset_last_modified(request, *args, **kwargs):
+    """Last-Modified ответа API: время последнего импорта"""
+    dataset_version = request_dataset_version(request)
+    return dataset_version.updated_at if dataset_version else None
+
+
+@method_decorator(cache_control(max_age=0, must_revalidate=True), name='dispatch')
+@method_decorator(condition(etag_func=dataset_etag, last_modified_func=dataset_last_modified), name='get')
+class StatisticsApiView(View):
+    """
+    Базовый JSON-эндпоинт поверх StatisticsFacade.
+    Данные меняются только при импорте, поэтому ETag и Last-Modified
+    берутся из версии набора данных: повторный запрос с If-None-Match
+    или If-Modified-Since получает 304 без обращения к фасаду.
+    Параметры запроса (validate) проверяются раньше: несуществующий
+    регион получает 404, а не 304 по ETag другого ответа.
+    """
+    http_method_names = ['get', 'head', 'options']
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD'):
+            self.validate(**kwargs)
+
+        return super().dispatch(request, *args, **kwargs)
+
+    def validate(self, **kwargs):
+        """Проверить параметры запроса: Http404 или BadRequest до условного ответа"""
+
+    def get(self, request, *args, **kwargs):
+        facade = StatisticsFacade()
+
+        return HttpResponse(
+            facade.formatter.dict_to_json(self.get_data(facade, **kwargs)),
+            content_type='application/json'
+        )
+
+    def get_data(self, facade, **kwargs):
+        raise NotImplementedError
+
+
+class StatsApiView(StatisticsApiView):
+    def get_data(self, facade):
+        return {
+            'top_regions': facade.get_top_regions(),
+            'population_stats': facade.get_population_stats(),
+            'settlement_population_stats': facade.get_settlement_population_stats(),
+            'general_stats': facade.get_general_stats(),
+            'settlement_types': facade.get_settlement_types_distribution(),
+            'population_distribution': facade.get_population_histogram(),
+        }
+
+
+class RegionApiView(StatisticsApiView):
+    def validate(self, region_name):
+        if not Region.objects.filter(name=region_name).exists():
+            raise Http404(f"Регион {region_name!r} не найден")
+
+    def get_data(self, facade, region_name):
+        return {
+            'region': region_name,
+            'general_stats': facade.get_general_stats(region_name),
+            'population_stats': facade.get_population_stats_by_region(region_name),
+            'settlement_population_stats': facade.get_settlement_population_stats(region_name),
+            'municipalities': facade.get_municipalities_by_region(region_name),
+            'settlement_types': facade.get_settlement_types_distribution(region_name),
+            'population_distribution': facade.get_population_histogram(region_name),
+        }
+
+
+class MunicipalityApiView(StatisticsApiView):
+    def validate(self, region_name, municipality_name):
+        get_object_or_404(Municipality, name=municipality_name, region__name=region_name)
+
+    def get_data(self, facade, region_name, municipality_name):
+        return {
+            'region': region_name,
+            'municipality': municipality_name,
+            'general_stats': facade.get_municipality_general_stats(region_name, municipality_name),
+            'population_stats': facade.get_municipality_population_stats(region_name, municipality_name),
+            # Поселения одного муниципалитета читаются по индексу, перцентили считаются точно
+            'settlement_population_stats': facade.get_settlement_population_stats(
+                region_name, municipality_name, approximate=False
+            ),
+            'settlement_types': facade.get_settlement_types_distribution(region_name, municipality_name),
+            'population_distribution': facade.get_population_histogram(region_name, municipality_name),
+        }
+
+
+class RegionsComparisonApiView(StatisticsApiView):
+    """Сравнение регионов (?region=...&region=..., ?top= — число муниципалитетов в топе)"""
+    max_regions = 20
+    top_municipalities = 5
+    max_top_municipalities = 50
+
+    def validate(self):
+        region_names = list(dict.fromkeys(name for name in self.request.GET.getlist('region') if name))
+
+        if len(region_names) > self.max_regions:
+            raise BadRequest(f"Можно сравнить не больше {self.max_regions} регионов")
+
+        unknown = set(region_names) - set(Region.objects.filter(name__in=region_names).values_list('name', flat=True))
+        if unknown:
+            raise Http404(f"Регионы не найдены: {', '.join(sorted(unknown))}")
+
+        self.region_names = region_names
+
+    def get_data(self, facade):
+        region_names = self.region_names
+
+        try:
+            top = min(int(self.request.GET.get('top', self.top_municipalities)), self.max_top_municipalities)
+        except ValueError:
+            top = self.top_municipalities
+
+        return {
+            'regions': facade.get_regions_comparison(region_names, max(top, 1)) if region_names else [],
+        }
+
+
+class MunicipalitySettlementsApiView(StatisticsApiView):
+    """Список поселений муниципалитета с фильтрами и курсорной пагинацией (?after=, ?before=)"""
+    page_size = 100
+    max_page_size = 1000
+
+    def validate(self, region_name, municipality_name):
+        get_object_or_404(Municipality, name=municipality_name, region__name=region_name)
+
+    def get_data(self, facade, region_name, municipality_name):
+        try:
+            page_size = min(int(self.request.GET.get('limit', self.page_size)), self.max_page_size)
+        except ValueError:
+            page_size = self.page_size
+
+        page = facade.get_municipality_settlements_page(
+            region_name,
+            municipality_name,
+            self.request.GET.get('search', ''),
+            self.request.GET.get('type', ''),
+            after=KeysetCursor.clean(self.request.GET.get('after')),
+            page_size=max(page_size, 1),
+            before=KeysetCursor.clean(self.request.GET.get('before'))
+        )
+
+        return {
+            'region': region_name,
+            'municipality': municipality_name,
+            **page,
+        }
+
+
+class SettlementSearchApiView(StatisticsApiView):
+    """Поиск поселений по названию по всей стране (?q=, ?limit=)"""
+    limit = 20
+    max_limit = 100
+
+    def get_data(self, facade):
+        query = self.request.GET.get('q', '').strip()
+
+        try:
+            limit = min(int(self.request.GET.get('limit', self.limit)), self.max_limit)
+        except ValueError:
+            limit = self.limit
+
+        return {
+            'query': query,
+            'results': facade.get_settlement_search_results(query, max(limit, 1)) if query else [],
+        }
+
+
+@method_decorator(condition(etag_func=dataset_etag, last_modified_func=dataset_last_modified), name='get')
+class SettlementExportView(StatisticsApiView):
+    """
+    Выгрузка поселений в CSV или Parquet (?format=csv|parquet) с фильтрами
+    ?region=, ?municipality=, ?type=, ?search= — как на страницах муниципалитетов.
+    Ответ передаётся потоком, строки читаются из БД серверным курсором.
+    """
+
+    def validate(self):
+        region_name = self.request.GET.get('region') or None
+        municipality_name = self.request.GET.get('municipality') or None
+
+        try:
+            self.exporter = SettlementExporter(self.request.GET.get('format', 'csv'))
+        except (ValueError, ImproperlyConfigured) as error:
+            raise BadRequest(str(error))
+
+        if municipality_name:
+            if not region_name:
+                raise BadRequest("Муниципалитет задаётся только вместе с регионом")
+
+            get_object_or_404(Municipality, name=municipality_name, region__name=region_name)
+        elif region_name:
+            get_object_or_404(Region, name=region_name)
+
+    def get(self, request):
+        exporter = self.exporter
+        region_name = request.GET.get('region') or None
+        municipality_name = request.GET.get('municipality') or None
+
+        response = StreamingHttpResponse(
+            exporter.export(
+                region_name,
+                municipality_name,
+                request.GET.get('search') or None,
+                request.GET.get('type') or None,
+            ),
+            content_type=exporter.content_type
+        )
+        response['Content-Disposition'] = f'attachment; filename="settlements.{exporter.file_format}"'
+
+        return response
@@ -0,0 +1,10 @@
+from .facade_benchmark import FacadeBenchmark
+from .formatter_benchmark import FormatterBenchmark
+from .import_benchmark import ImportBenchmark
+from .query_plans import QueryPlanBenchmark
+from .synthetic import SyntheticDataset
+from .view_latency import ViewLatencyBenchmark
+
+__all__ = [
+    'FacadeBenchmark', 'FormatterBenchmark', 'ImportBenchmark', 'QueryPlanBenchmark', 'SyntheticDataset', 'ViewLatencyBenchmark'
+]
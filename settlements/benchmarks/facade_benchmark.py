@@ -0,0 +1,181 @@
+import os
+import platform
+import tempfile
+import time
+from io import StringIO
+
+import django
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection, reset_queries
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from settlements import views
+from settlements.facades import StatisticsFacade, facade_call
+from settlements.models import Region
+from .query_plans import QueryPlanBenchmark
+from .synthetic import SyntheticDataset
+from .utils import private_result_cache, rolled_back, summarize
+
+DEFAULT_SIZES = (10000, 100000, 1000000)
+
+
+def facade_calls(region_name, municipality_name):
+    """Все публичные методы StatisticsFacade с аргументами для замера"""
+    location = (region_name, municipality_name)
+
+    return {
+        'get_top_regions': facade_call('get_top_regions'),
+        'get_population_stats': facade_call('get_population_stats'),
+        'get_settlement_population_stats': facade_call('get_settlement_population_stats'),
+        'get_settlement_population_stats[region]': facade_call('get_settlement_population_stats', region_name),
+        'get_settlement_population_stats[exact]': facade_call('get_settlement_population_stats', approximate=False),
+        'get_general_stats': facade_call('get_general_stats'),
+        'get_general_stats[region]': facade_call('get_general_stats', region_name),
+        'get_population_stats_by_region': facade_call('get_population_stats_by_region', region_name),
+        'get_municipalities_by_region': facade_call('get_municipalities_by_region', region_name),
+        'get_regions_comparison': facade_call('get_regions_comparison', [region_name]),
+        'get_settlement_types_distribution': facade_call('get_settlement_types_distribution'),
+        'get_settlement_types_distribution[region]': facade_call(
+            'get_settlement_types_distribution', region_name
+        ),
+        'get_settlement_types_chart': facade_call('get_settlement_types_chart'),
+        'get_settlement_types_chart[region]': facade_call('get_settlement_types_chart', region_name),
+        'get_population_distribution': facade_call('get_population_distribution'),
+        'get_population_distribution[region]': facade_call('get_population_distribution', region_name),
+        'get_population_histogram': facade_call('get_population_histogram', *location),
+        'get_municipality_general_stats': facade_call('get_municipality_general_stats', *location),
+        'get_municipality_population_stats': facade_call('get_municipality_population_stats', *location),
+        'get_municipality_settlements': facade_call('get_municipality_settlements', *location),
+        'get_municipality_settlements_page': facade_call('get_municipality_settlements_page', *location),
+        'get_settlement_types': facade_call('get_settlement_types', *location),
+        'get_settlement_search_results': facade_call('get_settlement_search_results', municipality_name),
+    }
+
+
+class FacadeBenchmark:
+    """
+    Время методов StatisticsFacade и страниц на синтетических наборах разного размера.
+
+    Для каждого размера набор генерируется, загружается через import_data
+    и замеряется в транзакции, которая затем откатывается: исходные данные
+    БД не меняются, но на время замера таблицы заблокированы TRUNCATE,
+    поэтому запускать его стоит на копии БД. Кэш результатов на время замера
+    подменяется отдельным (private_result_cache) и очищается перед каждым вызовом. Замеряются синхронные страницы: асинхронные
+    выполняют запросы в других соединениях и не видят незакоммиченный набор.
+    """
+    pages = {
+        'stats': views.StatsView,
+        'region': views.RegionDetailView,
+        'municipality': views.MunicipalityDetailView,
+    }
+
+    def __init__(self, sizes=DEFAULT_SIZES, repeat=3, engine=None, seed=0):
+        self.sizes = sizes
+        self.repeat = repeat
+        self.engine = engine or getattr(settings, 'SETTLEMENTS_STATS_ENGINE', 'pandas')
+        self.seed = seed
+        self.cache = None
+        self.factory = RequestFactory()
+
+    def environment(self):
+        return {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'postgresql': connection.pg_version,
+            'engine': self.engine,
+            'seed': self.seed,
+        }
+
+    def time_call(self, func):
+        """Замер func без кэша: время и число SQL-запросов последнего прогона"""
+        timings = []
+
+        for _ in range(self.repeat):
+            self.cache.clear()
+            reset_queries()  # журнал запросов ограничен, после импорта он заполнен
+
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                func()
+                timings.append(time.perf_counter() - started)
+
+        return {**summarize(timings), 'queries': len(queries)}
+
+    def load_dataset(self, size):
+        """Заменить данные синтетическим набором и вернуть время загрузки"""
+        with connection.cursor() as cursor:
+            # TRUNCATE невозможен, пока в транзакции есть отложенные проверки внешних ключей
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+            cursor.execute(f'TRUNCATE "{Region._meta.db_table}" CASCADE')
+
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        os.close(fd)
+
+        try:
+            SyntheticDataset(settlements=size, seed=self.seed).write_csv(path)
+
+            started = time.perf_counter()
+            call_command('import_data', path, stream=True, engine='copy', staging=True, stdout=StringIO())
+            return time.perf_counter() - started
+        finally:
+            os.remove(path)
+
+    def measure_methods(self, region_name, municipality_name):
+        results = {}
+
+        for name, call in facade_calls(region_name, municipality_name).items():
+            def run():
+                facade = StatisticsFacade(self.engine)
+                getattr(facade, call.method)(*call.args, **call.kwargs)
+
+            results[name] = self.time_call(run)
+
+        return results
+
+    def measure_pages(self, region_name, municipality_name):
+        results = {}
+
+        for page, view_class in self.pages.items():
+            kwargs = {}
+            if page in ('region', 'municipality'):
+                kwargs['region_name'] = region_name
+            if page == 'municipality':
+                kwargs['municipality_name'] = municipality_name
+
+            view = view_class.as_view()
+            path = reverse(f'settlements:{page}', kwargs=kwargs)
+
+            with override_settings(SETTLEMENTS_STATS_ENGINE=self.engine):
+                results[page] = self.time_call(lambda: view(self.factory.get(path), **kwargs).render())
+
+        return results
+
+    def measure_size(self, size):
+        with rolled_back():
+            import_seconds = self.load_dataset(size)
+            region_name, municipality_name = QueryPlanBenchmark.largest_municipality()
+
+            return {
+                'settlements': size,
+                'import_seconds': import_seconds,
+                'region': region_name,
+                'municipality': municipality_name,
+                'methods': self.measure_methods(region_name, municipality_name),
+                'pages': self.measure_pages(region_name, municipality_name),
+            }
+
+    def run(self):
+        with private_result_cache() as cache:
+            self.cache = cache
+
+            return {
+                'environment': self.environment(),
+                'sizes': {str(size): self.measure_size(size) for size in self.sizes},
+            }
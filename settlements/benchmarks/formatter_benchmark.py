@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from settlements.services import DataFormatter
+from settlements.services.json_backends import JSON_BACKENDS, orjson
+from .synthetic import CATEGORY_PROFILES
+from .utils import measure
+
+
+class FormatterBenchmark:
+    """
+    Время DataFormatter на DataFrame из rows строк (без БД):
+    форматирование колонки чисел построчно и векторно, записи и колонки,
+    сериализация записей и колонок каждым доступным JSON-бэкендом.
+    """
+
+    def __init__(self, rows=100000, repeat=5, seed=0):
+        self.rows = rows
+        self.repeat = repeat
+        self.seed = seed
+
+    def dataframe(self):
+        rng = np.random.default_rng(self.seed)
+
+        population = rng.lognormal(np.log(300), 1.5, self.rows).round()
+        population[rng.random(self.rows) < 0.1] = np.nan
+
+        return pd.DataFrame({
+            'type': rng.choice(list(CATEGORY_PROFILES), self.rows),
+            'population': population,
+            'count': rng.integers(1, 1000, self.rows),
+        })
+
+    def backends(self):
+        return [name for name in JSON_BACKENDS if name != 'orjson' or orjson is not None]
+
+    def run(self):
+        dataframe = self.dataframe()
+        formatter = DataFormatter('json')
+
+        def format_by_row():
+            dataframe['population'].apply(
+                lambda x: formatter.format_number(x) if pd.notna(x) else '0'
+            )
+
+        results = {
+            'format_column': {
+                'apply': measure(format_by_row, self.repeat),
+                'vectorized': measure(lambda: formatter.format_numbers(dataframe['population']), self.repeat),
+            },
+            'payload': {
+                'records': measure(lambda: formatter.dataframe_to_dict_records(dataframe), self.repeat),
+                'columns': measure(lambda: formatter.dataframe_to_columns(dataframe), self.repeat),
+            },
+            'json': {},
+        }
+
+        records = formatter.dataframe_to_dict_records(dataframe)
+        columns = formatter.dataframe_to_columns(dataframe)
+
+        for name in self.backends():
+            backend = DataFormatter(name)
+            results['json'][name] = {
+                'records': measure(lambda: backend.dict_to_json(records), self.repeat),
+                'columns': measure(lambda: backend.dict_to_json(columns), self.repeat),
+            }
+
+        return {'rows': self.rows, 'results': results}
@@ -0,0 +1,45 @@
+from io import StringIO
+
+from django.core.management import call_command
+
+from settlements.models import Settlement
+from .utils import measure, rolled_back
+
+
+class ImportBenchmark:
+    """
+    Сравнение способов записи поселений в import_data.
+    Каждый прогон выполняется в транзакции, которая затем откатывается,
+    поэтому все движки загружают файл в одинаковое исходное состояние БД.
+    """
+
+    def __init__(self, csv_file, engines=('orm', 'copy'), stream=False, staging=False, repeat=1):
+        self.csv_file = csv_file
+        self.engines = engines
+        self.stream = stream
+        self.staging = staging
+        self.repeat = repeat
+
+    def run(self):
+        results = {}
+
+        for engine in self.engines:
+            rows = []
+
+            def import_once():
+                with rolled_back():
+                    before = Settlement.objects.count()
+                    call_command(
+                        'import_data', self.csv_file,
+                        engine=engine, stream=self.stream, staging=self.staging,
+                        stdout=StringIO()
+                    )
+                    rows.append(Settlement.objects.count() - before)
+
+            timing = measure(import_once, self.repeat)
+            timing['rows'] = rows[-1]
+            timing['rows_per_sec'] = rows[-1] / timing['median'] if timing['median'] else 0
+
+            results[engine] = timing
+
+        return results
@@ -0,0 +1,103 @@
+import re
+
+from django.db import connection
+from django.db.models import Count
+
+from settlements.models import Municipality, Settlement
+from settlements.services import DataFetcher
+from .utils import rolled_back
+
+EXECUTION_TIME = re.compile(r'Execution Time: ([\d.]+) ms')
+SETTLEMENT_ACCESS = re.compile(
+    rf'(Seq Scan on {Settlement._meta.db_table}'
+    rf'|Index (?:Only )?Scan(?: Backward)? using \S+ on {Settlement._meta.db_table}'
+    r'|Bitmap Index Scan on \S+)'
+)
+
+
+class QueryPlanBenchmark:
+    """
+    Планы выполнения запросов страницы муниципалитета с индексами и без них.
+
+    Вариант «без индексов» выполняется в транзакции, где индексы удаляются
+    и затем восстанавливаются откатом. DROP INDEX блокирует таблицу
+    до конца транзакции, поэтому запускать замер стоит на копии БД.
+    """
+    index_names = (
+        'settlement_mun_population_idx',
+        'settlement_mun_type_idx',
+        'settlement_name_trgm_idx',
+    )
+
+    def __init__(self, region_name=None, municipality_name=None, search='ов', page_size=20):
+        if not (region_name and municipality_name):
+            region_name, municipality_name = self.largest_municipality()
+
+        self.region_name = region_name
+        self.municipality_name = municipality_name
+        self.search = search
+        self.page_size = page_size
+
+    @staticmethod
+    def largest_municipality():
+        """Муниципалитет с наибольшим числом поселений"""
+        municipality = Municipality.objects.select_related('region').annotate(
+            settlements_count=Count('settlements')
+        ).order_by('-settlements_count').first()
+
+        if municipality is None:
+            return None, None
+
+        return municipality.region.name, municipality.name
+
+    def queries(self):
+        fetcher = DataFetcher()
+        region, municipality = self.region_name, self.municipality_name
+
+        settlement_type = fetcher.fetch_settlement_types(region, municipality).first()
+
+        return {
+            'settlement_page': fetcher.fetch_settlement_details(
+                region, municipality
+            )[:self.page_size],
+            'settlement_page_by_type': fetcher.fetch_settlement_details(
+                region, municipality, settlement_type=settlement_type
+            )[:self.page_size],
+            'settlement_search': fetcher.fetch_settlement_details(
+                region, municipality, search_query=self.search
+            )[:self.page_size],
+            'settlement_types': fetcher.fetch_settlement_types(region, municipality),
+            'country_search': Settlement.objects.filter(name__icontains=self.search)[:self.page_size],
+        }
+
+    def explain_all(self):
+        results = {}
+
+        for name, queryset in self.queries().items():
+            plan = queryset.explain(analyze=True)
+            execution_time = EXECUTION_TIME.search(plan)
+
+            results[name] = {
+                'access': SETTLEMENT_ACCESS.findall(plan),
+                'seq_scan': f'Seq Scan on {Settlement._meta.db_table}' in plan,
+                'execution_ms': float(execution_time.group(1)) if execution_time else None,
+                'plan': plan,
+            }
+
+        return results
+
+    def run(self):
+        report = {
+            'region': self.region_name,
+            'municipality': self.municipality_name,
+            'with_indexes': self.explain_all(),
+        }
+
+        with rolled_back():
+            with connection.cursor() as cursor:
+                for index_name in self.index_names:
+                    cursor.execute(f'DROP INDEX IF EXISTS "{index_name}"')
+
+            report['without_indexes'] = self.explain_all()
+
+        return report
@@ -0,0 +1,112 @@
+import csv
+
+import numpy as np
+
+from settlements.management.commands.import_data import SETTLEMENT_CATEGORIES
+
+# Доля категорий среди поселений и логнормальное распределение населения:
+# (доля, медиана населения, sigma). Типы внутри категории берутся из SETTLEMENT_CATEGORIES.
+CATEGORY_PROFILES = {
+    'Город': (0.01, 30000, 1.2),
+    'Поселок городского типа': (0.01, 5000, 0.8),
+    'Село': (0.25, 500, 1.0),
+    'Деревня': (0.45, 60, 1.2),
+    'Хутор': (0.05, 80, 1.0),
+    'Станица': (0.02, 2000, 0.9),
+    'Поселение коренных народов': (0.02, 300, 0.9),
+    'Станция': (0.02, 30, 1.0),
+    'Коттеджный поселок': (0.02, 200, 1.0),
+    'Садоводство': (0.03, 20, 1.2),
+    'Рабочий поселок': (0.01, 3000, 0.9),
+    'Поселок': (0.10, 150, 1.3),
+    'Прочее': (0.01, 50, 1.5),
+}
+
+CSV_COLUMNS = ['region', 'municipality', 'settlement', 'type', 'population']
+
+
+class SyntheticDataset:
+    """
+    Синтетическая страна для замеров производительности.
+
+    Размеры регионов и муниципалитетов неравномерны (логнормальные веса),
+    население поселений зависит от категории и имеет тяжёлый хвост,
+    часть поселений пустует. Файл имеет формат CSV для import_data,
+    один и тот же seed даёт один и тот же файл.
+    """
+
+    def __init__(self, settlements=100000, regions=85, municipalities=None, empty_share=0.1, seed=0):
+        self.settlements = settlements
+        self.regions = regions
+        self.municipalities = municipalities or max(regions, min(settlements // 100, 2500))
+        self.empty_share = empty_share
+        self.seed = seed
+
+        self.categories = list(CATEGORY_PROFILES)
+        self.category_types = [SETTLEMENT_CATEGORIES[category] for category in self.categories]
+
+        weights = np.array([CATEGORY_PROFILES[category][0] for category in self.categories])
+        self.category_weights = weights / weights.sum()
+
+    @staticmethod
+    def skewed_weights(rng, size, sigma=1.0):
+        weights = rng.lognormal(0, sigma, size)
+        return weights / weights.sum()
+
+    def municipality_regions(self, rng):
+        """Регион каждого муниципалитета: в каждом регионе хотя бы один"""
+        assigned = rng.choice(
+            self.regions,
+            size=self.municipalities - self.regions,
+            p=self.skewed_weights(rng, self.regions, 0.7)
+        )
+
+        return np.concatenate([np.arange(self.regions), assigned])
+
+    def iter_rows(self, chunk_size=100000):
+        """Строки CSV (region, municipality, settlement, type, population) частями"""
+        rng = np.random.default_rng(self.seed)
+
+        municipality_regions = self.municipality_regions(rng)
+        municipality_weights = self.skewed_weights(rng, self.municipalities, 1.2)
+
+        medians = np.array([CATEGORY_PROFILES[category][1] for category in self.categories])
+        sigmas = np.array([CATEGORY_PROFILES[category][2] for category in self.categories])
+
+        for start in range(0, self.settlements, chunk_size):
+            size = min(chunk_size, self.settlements - start)
+
+            municipalities = rng.choice(self.municipalities, size=size, p=municipality_weights)
+            if start == 0:
+                # Каждый муниципалитет получает хотя бы одно поселение
+                covered = min(size, self.municipalities)
+                municipalities[:covered] = np.arange(covered)
+
+            categories = rng.choice(len(self.categories), size=size, p=self.category_weights)
+
+            populations = np.rint(rng.lognormal(np.log(medians[categories]), sigmas[categories]))
+            populations[rng.random(size) < self.empty_share] = 0
+
+            type_picks = rng.random(size)
+
+            for offset in range(size):
+                category = categories[offset]
+                types = self.category_types[category]
+                municipality = municipalities[offset]
+
+                yield (
+                    f"Регион {municipality_regions[municipality] + 1}",
+                    f"Муниципальный округ {municipality + 1}",
+                    f"Населённый пункт {start + offset + 1}",
+                    types[int(type_picks[offset] * len(types))],
+                    int(populations[offset]),
+                )
+
+    def write_csv(self, path):
+        """Сохранить набор в CSV и вернуть число строк"""
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_COLUMNS)
+            writer.writerows(self.iter_rows())
+
+        return self.settlements
@@ -0,0 +1,74 @@
+import json
+import statistics
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.test.utils import override_settings
+
+
+class RollbackBenchmark(Exception):
+    """Служебное исключение для отката изменений после замера"""
+
+
+@contextmanager
+def rolled_back():
+    """Выполнить блок в транзакции и откатить все его изменения"""
+    try:
+        with transaction.atomic():
+            yield
+            raise RollbackBenchmark
+    except RollbackBenchmark:
+        pass
+
+
+@contextmanager
+def private_result_cache():
+    """
+    Подменить кэш результатов фасада (SETTLEMENTS_CACHE_ALIAS) отдельным
+    LocMemCache на время замера и вернуть его. Замер может очищать этот кэш
+    сколько угодно: общий кэш, которым пользуются рабочие процессы, не трогается.
+    """
+    alias = getattr(settings, 'SETTLEMENTS_CACHE_ALIAS', 'default')
+    private = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': f'settlements-benchmark-{uuid.uuid4().hex}',
+    }
+
+    with override_settings(CACHES={**settings.CACHES, alias: private}):
+        cache = caches[alias]
+        try:
+            yield cache
+        finally:
+            cache.clear()
+
+
+def measure(func, repeat=1):
+    """Выполнить func repeat раз и вернуть сводку по времени (в секундах)"""
+    timings = []
+
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    return summarize(timings)
+
+
+def summarize(timings):
+    """Сводка по списку замеров времени (в секундах)"""
+    return {
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'max': max(timings),
+        'runs': len(timings),
+    }
+
+
+def write_report(path, report):
+    """Сохранить отчёт в JSON, пригодный для сравнения между релизами"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2, sort_keys=True)
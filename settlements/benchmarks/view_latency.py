@@ -0,0 +1,88 @@
+import time
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import AsyncRequestFactory
+from django.urls import reverse
+
+from settlements import views
+from .query_plans import QueryPlanBenchmark
+from .utils import private_result_cache, summarize
+
+
+class ViewLatencyBenchmark:
+    """
+    Время ответа страниц в синхронном и асинхронном вариантах под ASGI.
+
+    Синхронная страница вызывается так же, как её вызывает ASGIHandler
+    (sync_to_async в общем потоке), асинхронная — напрямую в цикле событий.
+    Кэш результатов на время замера подменяется отдельным (private_result_cache)
+    и очищается перед каждым запросом, поэтому замер
+    отражает полный расчёт статистики, а не чтение из кэша.
+    """
+    pages = {
+        'stats': (views.StatsView, views.AsyncStatsView),
+        'region': (views.RegionDetailView, views.AsyncRegionDetailView),
+        'municipality': (views.MunicipalityDetailView, views.AsyncMunicipalityDetailView),
+    }
+
+    def __init__(self, region_name=None, municipality_name=None, repeat=5):
+        if not (region_name and municipality_name):
+            region_name, municipality_name = QueryPlanBenchmark.largest_municipality()
+
+        self.region_name = region_name
+        self.municipality_name = municipality_name
+        self.repeat = repeat
+        self.cache = None
+        self.factory = AsyncRequestFactory()
+
+    def page_kwargs(self, page):
+        if page == 'region':
+            return {'region_name': self.region_name}
+
+        if page == 'municipality':
+            return {'region_name': self.region_name, 'municipality_name': self.municipality_name}
+
+        return {}
+
+    async def request(self, view, path, kwargs):
+        await sync_to_async(self.cache.clear)()
+
+        started = time.perf_counter()
+
+        if view.view_class.view_is_async:
+            response = await view(self.factory.get(path), **kwargs)
+        else:
+            response = await sync_to_async(view)(self.factory.get(path), **kwargs)
+
+        await sync_to_async(response.render)()
+
+        return time.perf_counter() - started
+
+    async def measure_page(self, page):
+        kwargs = self.page_kwargs(page)
+        path = reverse(f'settlements:{page}', kwargs=kwargs)
+        result = {}
+
+        for mode, view_class in zip(('sync', 'async'), self.pages[page]):
+            view = view_class.as_view()
+            await self.request(view, path, kwargs)  # прогрев соединений и импорта шаблонов
+
+            timings = [await self.request(view, path, kwargs) for _ in range(self.repeat)]
+            result[mode] = summarize(timings)
+
+        result['speedup'] = result['sync']['median'] / result['async']['median']
+
+        return result
+
+    async def arun(self):
+        return {
+            'region': self.region_name,
+            'municipality': self.municipality_name,
+            'pages': {page: await self.measure_page(page) for page in self.pages},
+        }
+
+    def run(self):
+        with private_result_cache() as cache:
+            self.cache = cache
+
+            return async_to_sync(self.arun)()
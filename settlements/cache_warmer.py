@@ -0,0 +1,151 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from typing import NamedTuple
+
+import django
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import close_old_connections, connections
+
+from .db_router import use_primary
+from .facades import StatisticsFacade
+from .models import Municipality, Region
+from .services import get_dataset_version
+from .views import municipality_page_calls, region_page_calls, stats_page_calls
+
+
+class WarmupProgress(NamedTuple):
+    """Состояние прогрева после очередной страницы"""
+    pages: int
+    total_pages: int
+    computed: int
+    skipped: int
+    elapsed: float
+
+    @property
+    def pages_per_second(self):
+        return self.pages / self.elapsed if self.elapsed else 0.0
+
+
+def process_local_cache(alias=None):
+    """Кэш виден только своему процессу: прогрев из команды до сервера не дойдёт"""
+    cache = caches[alias or getattr(settings, 'SETTLEMENTS_CACHE_ALIAS', 'default')]
+    return isinstance(cache, (LocMemCache, DummyCache))
+
+
+def _init_worker():
+    # При запуске через spawn/forkserver Django в процессе ещё не настроен
+    django.setup()
+
+
+def warm_page(calls, dataset_version, force=False, primary=False):
+    """
+    Выполнить вызовы фасада одной страницы, заполнив кэш результатов.
+    Вызовы, результат которых уже есть в кэше, пропускаются (кроме force).
+    primary — читать с основной БД, а не с реплики.
+    Возвращает (вычислено, пропущено).
+    """
+    facade = StatisticsFacade()
+    facade.result_cache.dataset_version = dataset_version
+
+    computed = skipped = 0
+    with use_primary() if primary else nullcontext():
+        for call in calls.values():
+            if not force and facade.is_cached(call.method, *call.args, **call.kwargs):
+                skipped += 1
+                continue
+
+            getattr(facade, call.method)(*call.args, **call.kwargs)
+            computed += 1
+
+    return computed, skipped
+
+
+def _warm_page_in_worker(task):
+    # Соединение процесса пула закрывается по тем же правилам CONN_MAX_AGE, что и после запроса
+    try:
+        return warm_page(*task)
+    finally:
+        close_old_connections()
+
+
+class CacheWarmer:
+    """
+    Прогрев кэша StatisticsFacade: главная страница, страницы всех регионов
+    и первые страницы всех муниципалитетов вычисляются заранее, после импорта.
+
+    Страницы распределяются по пулу процессов (workers), каждый процесс
+    работает со своим соединением с БД и своим фасадом. Результаты попадают
+    в общий кэш, поэтому прогрев полезен только с кэшем, разделяемым
+    процессами (Redis, Memcached, БД, файлы), а не с LocMemCache.
+    С primary данные читаются с основной БД: сразу после импорта
+    реплика может ещё не содержать новую версию данных.
+    """
+
+    def __init__(self, workers=None, force=False, chunk_size=8, primary=False):
+        self.workers = workers or getattr(settings, 'SETTLEMENTS_WARM_CACHE_WORKERS', 0) or os.cpu_count() or 1
+        self.force = force
+        self.chunk_size = chunk_size
+        self.primary = primary
+
+    @staticmethod
+    def pages():
+        """Вызовы фасада всех страниц: [{ключ: FacadeCall}]"""
+        pages = [stats_page_calls()]
+
+        for region_name in Region.objects.order_by('name').values_list('name', flat=True):
+            pages.append(region_page_calls(region_name))
+
+        municipalities = Municipality.objects.order_by('region__name', 'name').values_list('region__name', 'name')
+        for region_name, municipality_name in municipalities:
+            pages.append(municipality_page_calls(region_name, municipality_name))
+
+        return pages
+
+    def run(self, progress=None):
+        """
+        Прогреть кэш для текущей версии данных.
+        progress(WarmupProgress) вызывается после каждой страницы.
+        """
+        with use_primary() if self.primary else nullcontext():
+            dataset_version = get_dataset_version()
+            pages = self.pages() if dataset_version is not None else []
+
+        if dataset_version is None:
+            # Без версии данных кэш фасада не используется
+            return WarmupProgress(0, 0, 0, 0, 0.0)
+
+        tasks = [(calls, dataset_version.version, self.force, self.primary) for calls in pages]
+
+        started = time.perf_counter()
+        computed = skipped = 0
+        state = WarmupProgress(0, len(tasks), 0, 0, 0.0)
+
+        for done, (page_computed, page_skipped) in enumerate(self._map(tasks), start=1):
+            computed += page_computed
+            skipped += page_skipped
+            state = WarmupProgress(done, len(tasks), computed, skipped, time.perf_counter() - started)
+
+            if progress:
+                progress(state)
+
+        return state
+
+    def _map(self, tasks):
+        if self.workers <= 1:
+            yield from (warm_page(*task) for task in tasks)
+            return
+
+        # Дочерние процессы не должны унаследовать открытые соединения родителя,
+        # а также пул соединений psycopg: его фоновые потоки после fork не работают
+        connections.close_all()
+        for connection in connections.all(initialized_only=True):
+            if hasattr(connection, 'close_pool'):
+                connection.close_pool()
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) as pool:
+            yield from pool.map(_warm_page_in_worker, tasks, chunksize=self.chunk_size)
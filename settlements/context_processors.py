@@ -0,0 +1,6 @@
+from settlements.state.breadcrumb import BreadcrumbState
+
+
+def breadcrumb(request):
+    """Хлебные крошки страницы, построенные по параметрам URL текущего запроса"""
+    return {'breadcrumb': BreadcrumbState.from_request(request).get_breadcrumb()}
@@ -0,0 +1,104 @@
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_use_primary = ContextVar('settlements_use_primary', default=False)
+_use_replica = ContextVar('settlements_use_replica', default=False)
+
+
+@contextmanager
+def use_primary():
+    """
+    Читать данные приложения с основной БД, а не с реплики.
+    Нужно там, где чтение должно видеть только что записанное: импорт,
+    пересчёт агрегатов, прогрев кэша сразу после импорта.
+    """
+    token = _use_primary.set(True)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+@contextmanager
+def use_replica():
+    """
+    Читать данные приложения с реплики (если она настроена).
+    Включается только для аналитических чтений StatisticsFacade;
+    use_primary() и открытая транзакция на основной БД имеют приоритет.
+    """
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def replica_reads(method):
+    """Выполнять метод внутри use_replica()"""
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        with use_replica():
+            return method(*args, **kwargs)
+
+    return wrapper
+
+
+def read_replica():
+    """
+    Псевдоним реплики для аналитических чтений или None, если реплика не настроена
+    или указывает на ту же БД, что и основная (например, зеркало MIRROR в тестах).
+    """
+    alias = getattr(settings, 'SETTLEMENTS_READ_REPLICA', None)
+    if not alias or alias not in settings.DATABASES:
+        return None
+
+    replica = connections[alias].settings_dict
+    primary = connections[DEFAULT_DB_ALIAS].settings_dict
+    if all(replica.get(key) == primary.get(key) for key in ('NAME', 'HOST', 'PORT')):
+        return None
+
+    return alias
+
+
+class ReplicaRouter:
+    """
+    Чтения моделей settlements внутри use_replica() (методы StatisticsFacade)
+    идут на реплику SETTLEMENTS_READ_REPLICA, остальные чтения и запись —
+    на основную БД. Внутри use_primary() и внутри транзакции на основной БД
+    чтения тоже идут на основную БД: они должны видеть незафиксированные записи.
+    Без настроенной реплики роутер ничего не меняет.
+    """
+    app_label = 'settlements'
+
+    def db_for_read(self, model, **hints):
+        replica = read_replica()
+
+        if not replica or model._meta.app_label != self.app_label:
+            return None
+
+        if not _use_replica.get() or _use_primary.get():
+            return None
+
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+
+        return replica
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label != self.app_label:
+            return None
+
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплика содержит те же строки, что и основная БД
+        databases = {DEFAULT_DB_ALIAS, read_replica()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+
+        return None
@@ -1,3 +1,4 @@
 from .statistics_facade import StatisticsFacade
+from .concurrent import FacadeCall, facade_call, gather_facade_calls, run_facade_calls
 
-__all__ = ['StatisticsFacade']
+__all__ = ['StatisticsFacade', 'FacadeCall', 'facade_call', 'gather_facade_calls', 'run_facade_calls']
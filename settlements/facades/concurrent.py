@@ -0,0 +1,64 @@
+import asyncio
+from typing import NamedTuple
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+from settlements.db_router import replica_reads
+
+from .statistics_facade import StatisticsFacade
+
+
+class FacadeCall(NamedTuple):
+    """Отложенный вызов метода StatisticsFacade"""
+    method: str
+    args: tuple
+    kwargs: dict
+
+
+def facade_call(method, *args, **kwargs):
+    return FacadeCall(method, args, kwargs)
+
+
+def run_facade_calls(calls, facade=None):
+    """Выполнить вызовы {ключ: FacadeCall} последовательно на одном фасаде"""
+    facade = facade or StatisticsFacade()
+
+    return {
+        key: getattr(facade, call.method)(*call.args, **call.kwargs)
+        for key, call in calls.items()
+    }
+
+
+@replica_reads
+def _read_dataset_version():
+    return StatisticsFacade().result_cache.load_version()
+
+
+def _run_in_worker(call, dataset_version):
+    # У каждого потока своё соединение с БД и свой фасад;
+    # соединение закрывается по тем же правилам CONN_MAX_AGE, что и после запроса
+    try:
+        facade = StatisticsFacade()
+        facade.result_cache.dataset_version = dataset_version
+
+        return getattr(facade, call.method)(*call.args, **call.kwargs)
+    finally:
+        close_old_connections()
+
+
+async def gather_facade_calls(calls):
+    """
+    Выполнить независимые вызовы {ключ: FacadeCall} параллельно.
+    Каждый вызов идёт в отдельном потоке со своим соединением,
+    поэтому запросы к БД и обработка в pandas перекрываются по времени.
+    Версия данных читается один раз и общая для всех вызовов.
+    """
+    dataset_version = await sync_to_async(_read_dataset_version)()
+
+    results = await asyncio.gather(*(
+        sync_to_async(_run_in_worker, thread_sensitive=False)(call, dataset_version)
+        for call in calls.values()
+    ))
+
+    return dict(zip(calls, results))
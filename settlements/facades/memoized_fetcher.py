@@ -0,0 +1,37 @@
+import functools
+
+
+class MemoizedFetcher:
+    """
+    Обёртка над DataFetcher, запоминающая результаты одинаковых вызовов fetch_*.
+
+    Живёт столько же, сколько экземпляр фасада (то есть один запрос),
+    поэтому несколько методов фасада получают один и тот же queryset:
+    таблица читается один раз, а следующие шаги обработки работают
+    с уже загруженными в память строками.
+    """
+
+    def __init__(self, fetcher):
+        self._fetcher = fetcher
+        self._results = {}
+
+    def __getattr__(self, name):
+        attr = getattr(self._fetcher, name)
+
+        if not name.startswith('fetch_') or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def memoized(*args, **kwargs):
+            key = (name, args, tuple(sorted(kwargs.items())))
+
+            if key not in self._results:
+                self._results[key] = attr(*args, **kwargs)
+
+            return self._results[key]
+
+        return memoized
+
+    def clear(self):
+        """Сбросить запомненные результаты"""
+        self._results.clear()
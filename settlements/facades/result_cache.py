@@ -0,0 +1,106 @@
+import functools
+import hashlib
+import inspect
+
+from django.conf import settings
+from django.core.cache import caches
+
+from settlements.services import get_dataset_version
+
+_MISSING = object()
+
+
+class ResultCache:
+    """
+    Кэш результатов фасада поверх Django cache framework.
+
+    Ключ строится из имени метода и его аргументов, а номер версии набора
+    данных передаётся как version кэша: после импорта все старые записи
+    перестают находиться разом и со временем вытесняются по TTL.
+    Пока импорт не выполнялся (версии нет), кэш не используется.
+    """
+    key_prefix = 'settlements'
+
+    def __init__(self, alias=None, timeout=None):
+        self.cache = caches[alias or getattr(settings, 'SETTLEMENTS_CACHE_ALIAS', 'default')]
+        self.timeout = timeout if timeout is not None else getattr(
+            settings, 'SETTLEMENTS_CACHE_TIMEOUT', 60 * 60 * 24
+        )
+        self._dataset_version = _MISSING
+
+    def load_version(self):
+        """
+        Прочитать номер версии набора данных из БД, если он ещё не прочитан.
+        Вызывается заранее, когда чтение версии не должно попасть в замер запросов.
+        """
+        if self._dataset_version is _MISSING:
+            current = get_dataset_version()
+            self._dataset_version = current.version if current else None
+
+        return self._dataset_version
+
+    @property
+    def dataset_version(self):
+        """Номер версии набора данных (читается из БД один раз на экземпляр)"""
+        return self.load_version()
+
+    @dataset_version.setter
+    def dataset_version(self, value):
+        # Позволяет разделить одну прочитанную версию между несколькими фасадами
+        self._dataset_version = value
+
+    @property
+    def enabled(self):
+        return self.dataset_version is not None
+
+    def make_key(self, method_name, arguments):
+        """Ключ кэша: префикс, имя метода и хэш аргументов"""
+        digest = hashlib.md5(repr(arguments).encode('utf-8')).hexdigest()
+        return f"{self.key_prefix}:{method_name}:{digest}"
+
+    def contains(self, method_name, arguments):
+        """Есть ли результат для текущей версии данных"""
+        if not self.enabled:
+            return False
+
+        return self.cache.has_key(self.make_key(method_name, arguments), version=self.dataset_version)
+
+    def get_or_compute(self, method_name, arguments, compute):
+        if not self.enabled:
+            return compute()
+
+        key = self.make_key(method_name, arguments)
+        result = self.cache.get(key, _MISSING, version=self.dataset_version)
+
+        if result is _MISSING:
+            result = compute()
+            self.cache.set(key, result, self.timeout, version=self.dataset_version)
+
+        return result
+
+
+def cached_result(method):
+    """
+    Кэшировать результат метода фасада в self.result_cache.
+    Аргументы приводятся к каноническому виду, поэтому позиционный
+    и именованный вызовы попадают в одну запись.
+    """
+    signature = inspect.signature(method)
+
+    def cache_arguments(self, *args, **kwargs):
+        """Аргументы вызова в каноническом виде — часть ключа кэша"""
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+
+        return tuple(
+            (name, value) for name, value in bound.arguments.items() if name != 'self'
+        )
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        return self.result_cache.get_or_compute(
+            method.__name__, cache_arguments(self, *args, **kwargs), lambda: method(self, *args, **kwargs)
+        )
+
+    wrapper.cache_arguments = cache_arguments
+    return wrapper
@@ -1,7 +1,25 @@
 import pandas as pd
-from django.db.models import Q
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 
-from settlements.services import DataFetcher, DataProcessor, DataFormatter
+from settlements.db_router import replica_reads, use_replica
+from settlements.instrumentation import instrument_component, instrumented
+from settlements.pagination import KeysetCursor
+from settlements.services import (
+    DataFetcher, DataProcessor, SqlDataProcessor, DataFormatter, SnapshotFetcher, SnapshotProcessor,
+    get_search_index
+)
+from .memoized_fetcher import MemoizedFetcher
+from .result_cache import ResultCache, cached_result
+
+# Перцентили населения поселений по умолчанию
+SETTLEMENT_PERCENTILES = (90, 99)
+
+PROCESSORS = {
+    'pandas': DataProcessor,
+    'sql': SqlDataProcessor,
+    'snapshot': SnapshotProcessor,
+}
 
 
 class StatisticsFacade:
@@ -9,133 +27,294 @@ class StatisticsFacade:
     Предоставляет упрощённый единый интерфейс,
     состоящей из трёх компонентов:
     - DataFetcher (получение данных из БД)
-    - DataProcessor (обработка данных с Pandas)
+    - DataProcessor (обработка данных с Pandas) или SqlDataProcessor (в PostgreSQL)
     - DataFormatter (форматирование для отображения)
+
+    Движок обработки выбирается настройкой SETTLEMENTS_STATS_ENGINE ('pandas' или 'sql');
+    движок 'snapshot' отвечает на все запросы из колоночного снимка в памяти процесса.
+    Чтения методов фасада идут на реплику, если она настроена (см. ReplicaRouter).
+    Результаты кэшируются до следующего импорта (см. ResultCache),
+    а одинаковые выборки в пределах экземпляра выполняются один раз (см. MemoizedFetcher).
     """
 
-    def __init__(self):
-        self.fetcher = DataFetcher()
-        self.processor = DataProcessor()
-        self.formatter = DataFormatter()
+    def __init__(self, engine=None):
+        engine = engine or getattr(settings, 'SETTLEMENTS_STATS_ENGINE', 'pandas')
+
+        if engine not in PROCESSORS:
+            raise ImproperlyConfigured(
+                f"Неизвестный движок статистики '{engine}', доступны: {', '.join(PROCESSORS)}"
+            )
+
+        self.engine = engine
+        self.processor = instrument_component(PROCESSORS[engine](), 'processor')
+        self.formatter = instrument_component(DataFormatter(), 'formatter')
+        self.result_cache = ResultCache()
+
+        if engine == 'snapshot':
+            with use_replica():
+                fetcher = SnapshotFetcher()
+            # Версия данных уже прочитана при проверке актуальности снимка
+            self.result_cache.dataset_version = fetcher.snapshot.version
+        else:
+            fetcher = DataFetcher()
+
+        self.fetcher = MemoizedFetcher(fetcher)
+
+    @replica_reads
+    def is_cached(self, method_name, *args, **kwargs):
+        """
+        Есть ли в кэше результат вызова для текущей версии данных.
+        Для методов без кэширования всегда False.
+        """
+        cache_arguments = getattr(getattr(type(self), method_name), 'cache_arguments', None)
+        if cache_arguments is None:
+            return False
+
+        return self.result_cache.contains(method_name, cache_arguments(self, *args, **kwargs))
 
     # ==================== ОБЩАЯ СТАТИСТИКА ====================
 
+    @instrumented
+    @replica_reads
+    @cached_result
     def get_top_regions(self):
         """
         Получить топ регионов по населению.
         """
-        raw_data = self.fetcher.fetch_all_settlements_with_relations()
+        rows = self.fetcher.fetch_region_aggregates()
 
-        aggregated = self.processor.aggregate_by_region(raw_data)
+        if rows:
+            aggregated = pd.DataFrame(
+                rows, columns=['name', 'population', 'municipalities', 'settlements']
+            )
+        else:
+            # Агрегаты ещё не построены — считаем по всем поселениям
+            raw_data = self.fetcher.fetch_all_settlements_with_relations()
+            aggregated = self.processor.aggregate_by_region(raw_data)
 
         formatted = self.formatter.format_dataframe_column(aggregated, 'population')
 
         return self.formatter.dataframe_to_dict_records(formatted)
 
+    @instrumented
+    @replica_reads
+    @cached_result
     def get_population_stats(self):
         """
         Получить общую статистику по населению (mean, median, max, min, total).
         """
-        raw_data = self.fetcher.fetch_all_settlements_with_relations()
-        df = pd.DataFrame(raw_data, columns=['region', 'municipality', 'population'])
-
-        # Получить население по регионам
-        region_pops = df.groupby('region')['population'].sum()
-
-        # Вычислить статистику
-        stats = self.processor.calculate_statistics(region_pops)
+        rows = self.fetcher.fetch_region_aggregates()
+
+        if rows:
+            # Население по регионам из агрегатов
+            region_pops = pd.Series([population for _, population, _, _ in rows])
+            stats = self.processor.calculate_statistics(region_pops)
+        else:
+            raw_data = self.fetcher.fetch_all_settlements_with_relations()
+            stats = self.processor.calculate_group_statistics(
+                raw_data, ['region', 'municipality', 'population'], 'region'
+            )
 
         # Форматировать для отображения
         return self.formatter.statistics_to_formatted_dict(stats)
 
-    def get_general_stats(self, region_name=None):
+    @instrumented
+    @replica_reads
+    @cached_result
+    def get_settlement_population_stats(self, region_name=None, municipality_name=None,
+                                        percentiles=SETTLEMENT_PERCENTILES, approximate=True):
         """
-        Получить общую статистику по регионам, муниципалитетам и поселениям.
+        Получить статистику населения поселений страны, региона или муниципалитета
+        (mean, median, max, min, total и перцентили p90, p99).
+        В приближённом режиме медиана и перцентили берутся из объединённых скетчей
+        муниципалитетов (погрешность не больше 1%), без чтения поселений;
+        пока агрегаты не построены, статистика считается точно.
         """
-        from settlements.models import Region, Municipality
+        percentiles = tuple(percentiles)
+        sketch = self.fetcher.fetch_population_sketch(region_name, municipality_name) if approximate else None
 
-        add_q_m = Q()
-        add_q_s = Q()
+        if sketch is not None:
+            stats = self.processor.calculate_statistics(sketch, approximate=True, percentiles=percentiles)
+        else:
+            stats = self.processor.calculate_statistics(
+                self.fetcher.fetch_populated_settlements(region_name, municipality_name),
+                percentiles=percentiles
+            )
 
-        total_regions = Region.objects.count()
-        regions_info = {'regions': total_regions}
+        return self.formatter.statistics_to_formatted_dict(stats)
 
-        if region_name:
-            add_q_m |= Q(region__name=region_name)
-            add_q_s |= Q(municipality__region__name=region_name)
-            regions_info = {}
+    @instrumented
+    @replica_reads
+    @cached_result
+    def get_general_stats(self, region_name=None):
+        """
+        Получить общую статистику по регионам, муниципалитетам и поселениям.
+        """
+        totals = self.fetcher.fetch_aggregated_statistics(region_name)
 
-        total_municipalities = Municipality.objects.filter(add_q_m).count()
+        if totals is None:
+            # Агрегаты ещё не построены: те же счётчики одним запросом к исходным таблицам
+            totals = self.fetcher.fetch_location_counts(region_name)
 
-        # Получить статистику по поселениям
-        settlement_stats = self.fetcher.fetch_settlement_statistics(region_name)
+        regions_info = {} if region_name else {'regions': totals['regions']}
 
         return {
             **regions_info,
-            'municipalities': total_municipalities,
-            'settlements': settlement_stats['total'],
-            'empty_settlements': settlement_stats['empty'],
-            'populated_settlements': settlement_stats['populated'],
+            'municipalities': totals['municipalities'],
+            'settlements': totals['total'],
+            'empty_settlements': totals['empty'],
+            'populated_settlements': totals['populated'],
         }
 
     # ==================== СТАТИСТИКА ПО РЕГИОНАМ ====================
 
+    @instrumented
+    @replica_reads
+    @cached_result
     def get_population_stats_by_region(self, region_name):
         """
         Получить статистику по населению конкретного региона.
         """
-        raw_data = self.fetcher.fetch_settlements_by_region(region_name)
-        df = pd.DataFrame(raw_data, columns=['municipality', 'population'])
+        rows = self.fetcher.fetch_municipality_aggregates(region_name)
 
-        municipality_pops = df.groupby('municipality')['population'].sum()
+        if not rows:
+            raw_data = self.fetcher.fetch_settlements_by_region(region_name)
+
+            return self.processor.calculate_group_statistics(
+                raw_data, ['municipality', 'population'], 'municipality'
+            )
+
+        municipality_pops = pd.Series([population for _, _, population in rows])
 
         return self.processor.calculate_statistics(municipality_pops)
 
+    @instrumented
+    @replica_reads
+    @cached_result
     def get_municipalities_by_region(self, region_name):
         """
         Получить все муниципалитеты региона со статистикой.
         """
-        raw_data = self.fetcher.fetch_settlements_by_region(region_name)
+        rows = self.fetcher.fetch_municipality_aggregates(region_name)
 
-        aggregated = self.processor.aggregate_by_municipality(raw_data)
+        if rows:
+            aggregated = pd.DataFrame(
+                rows, columns=['municipality', 'settlements_count', 'population_total']
+            )
+        else:
+            raw_data = self.fetcher.fetch_settlements_by_region(region_name)
+            aggregated = self.processor.aggregate_by_municipality(raw_data)
 
         formatted = self.formatter.format_dataframe_column(aggregated, 'population_total')
 
         return self.formatter.dataframe_to_dict_records(formatted)
 
-    def get_settlement_types_distribution(self, q_filter=None):
+    @instrumented
+    @replica_reads
+    @cached_result
+    def get_settlement_types_distribution(self, region_name=None, municipality_name=None):
         """
         Получить распределение поселений по типам.
         """
-        from settlements.models import Settlement
+        settlements = self.fetcher.fetch_settlement_types_with_population(
+            region_name, municipality_name
+        )
 
-        if not q_filter:
-            q_filter = Q()
+        stats = self.processor.get_distribution_by_type(settlements)
+        return self.formatter.dataframe_to_dict_records(stats)
 
-        settlements = Settlement.objects.filter(q_filter).values_list('type', 'population')
+    @instrumented
+    @replica_reads
+    @cached_result
+    def get_settlement_types_chart(self, region_name=None, municipality_name=None):
+        """
+        Получить распределение по типам для графика: JSON по колонкам (type, population).
+        """
+        settlements = self.fetcher.fetch_settlement_types_with_population(
+            region_name, municipality_name
+        )
 
         stats = self.processor.get_distribution_by_type(settlements)
-        return self.formatter.dataframe_to_dict_records(stats)
+        return self.formatter.dict_to_json(
+            self.formatter.dataframe_to_columns(stats, ['type', 'population'])
+        )
+
+    @instrumented
+    @replica_reads
+    @cached_result
+    def get_population_distribution(self, region_name=None, municipality_name=None):
+        """
+        Получить распределение населения (для графиков) в виде JSON по колонкам (from, to, count).
+        """
+        edges, counts = self._population_histogram(region_name, municipality_name)
 
-    def get_population_distribution(self, q_filter=None):
+        return self.formatter.dict_to_json(self.formatter.histogram_to_columns(edges, counts))
+
+    @instrumented
+    @replica_reads
+    @cached_result
+    def get_population_histogram(self, region_name=None, municipality_name=None):
         """
-        Получить распределение населения (для графиков).
+        Получить гистограмму населения по логарифмической шкале.
+        Считается на сервере, возвращаются только непустые интервалы.
         """
-        from settlements.models import Settlement
+        edges, counts = self._population_histogram(region_name, municipality_name)
+
+        return self.formatter.histogram_to_records(edges, counts)
 
-        if not q_filter:
-            q_filter = Q()
+    def _population_histogram(self, region_name, municipality_name):
+        edges = self.processor.histogram_edges(
+            getattr(settings, 'SETTLEMENTS_HISTOGRAM_BINS_PER_DECADE', 4)
+        )
+
+        counts = self.processor.calculate_histogram(
+            self.fetcher.fetch_populated_settlements(region_name, municipality_name),
+            edges
+        )
+
+        return edges, counts
+
+    # ==================== СРАВНЕНИЕ РЕГИОНОВ ====================
+
+    @instrumented
+    @replica_reads
+    @cached_result
+    def get_regions_comparison(self, region_names, top_municipalities=5, percentiles=SETTLEMENT_PERCENTILES):
+        """
+        Сравнить несколько регионов: общая статистика, статистика населения НП,
+        распределение по типам и топ муниципалитетов по населению.
+        Поселения всех регионов читаются одной выборкой и группируются за один проход,
+        вместо отдельных расчётов страницы каждого региона.
+        """
+        region_names = tuple(dict.fromkeys(region_names))
 
-        population_distribution = list(
-            Settlement.objects.filter(
-                Q(population__gt=0) & (q_filter or Q())
-            ).values('population')
+        comparison = self.processor.compare_regions(
+            self.fetcher.fetch_settlements_by_regions(region_names),
+            region_names,
+            percentiles=tuple(percentiles),
+            top_municipalities=top_municipalities
         )
 
-        return self.formatter.dict_to_json(population_distribution)
+        return [
+            {
+                'region': region_name,
+                'general_stats': result['general_stats'],
+                'settlement_population_stats': self.formatter.statistics_to_formatted_dict(
+                    result['population_stats']
+                ),
+                'settlement_types': self.formatter.dataframe_to_dict_records(result['settlement_types']),
+                'top_municipalities': self.formatter.dataframe_to_dict_records(
+                    self.formatter.format_dataframe_column(result['top_municipalities'], 'population_total')
+                ),
+            }
+            for region_name, result in comparison.items()
+        ]
 
     # ==================== СТАТИСТИКА ПО МУНИЦИПАЛИТЕТАМ ====================
 
+    @instrumented
+    @replica_reads
+    @cached_result
     def get_municipality_general_stats(self, region_name, municipality_name):
         """
         Получить общую статистику по муниципалитету.
@@ -151,6 +330,9 @@ class StatisticsFacade:
             'populated_settlements': settlement_stats['populated'],
         }
 
+    @instrumented
+    @replica_reads
+    @cached_result
     def get_municipality_population_stats(self, region_name, municipality_name):
         """
         Получить статистику по населению муниципалитета.
@@ -163,6 +345,9 @@ class StatisticsFacade:
         stats = self.processor.calculate_statistics(raw_data)
         return stats
 
+    @instrumented
+    @replica_reads
+    @cached_result
     def get_municipality_settlements(self, region_name, municipality_name,
                                      search_query=None, settlement_type=None):
         """
@@ -177,10 +362,80 @@ class StatisticsFacade:
 
         return list(settlements.values('name', 'type', 'population'))
 
+    @instrumented
+    @replica_reads
+    @cached_result
+    def get_municipality_settlements_page(self, region_name, municipality_name, search_query=None,
+                                          settlement_type=None, after=None, page_size=20, before=None):
+        """
+        Получить страницу поселений муниципалитета по курсору ?after=
+        (или предыдущую страницу по курсору ?before=).
+        Из БД читается только запрошенная страница и общее число найденных.
+        """
+        position = self._decode_cursor(after)
+        before_position = self._decode_cursor(before)
+
+        rows = self.fetcher.fetch_settlement_page(
+            region_name, municipality_name, search_query, settlement_type,
+            after=position, limit=page_size, before=before_position
+        )
+
+        if before_position is not None:
+            # Лишняя строка — первая: перед страницей есть ещё строки
+            has_previous = len(rows) > page_size
+            rows = rows[-page_size:]
+            has_next = True
+        else:
+            has_previous = position is not None
+            has_next = len(rows) > page_size
+            rows = rows[:page_size]
+
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = KeysetCursor.encode(rows[-1]['population'], rows[-1]['id'])
+        if rows and has_previous:
+            previous_cursor = KeysetCursor.encode(rows[0]['population'], rows[0]['id'])
+
+        total = self.fetcher.fetch_settlement_details(
+            region_name, municipality_name, search_query, settlement_type
+        ).count()
+
+        return {
+            'settlements': rows,
+            'next_cursor': next_cursor,
+            'previous_cursor': previous_cursor,
+            'total': total,
+        }
+
+    @staticmethod
+    def _decode_cursor(cursor):
+        """Позиция курсора страницы; пустой или некорректный курсор — начало списка"""
+        try:
+            return KeysetCursor.decode(cursor) if cursor else None
+        except ValueError:
+            return None
+
+    @instrumented
+    @replica_reads
+    @cached_result
     def get_settlement_types(self, region_name, municipality_name):
         """
         Получить все типы поселений в муниципалитете.
         """
         return list(
             self.fetcher.fetch_settlement_types(region_name, municipality_name)
-        )
\ No newline at end of file
+        )
+
+    # ==================== ПОИСК ====================
+
+    @instrumented
+    @replica_reads
+    def get_settlement_search_results(self, query, limit=20):
+        """
+        Найти поселения по названию по всей стране (с регионом и муниципалитетом).
+        Индекс поиска в памяти отвечает за миллисекунды, поэтому результаты
+        не кэшируются: каждый запрос занимал бы отдельную запись кэша.
+        """
+        # Движок snapshot уже держит актуальный снимок, остальным его загружает индекс
+        snapshot = self.fetcher.snapshot if self.engine == 'snapshot' else None
+        return get_search_index(snapshot).search(query, limit)
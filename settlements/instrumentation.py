@@ -0,0 +1,245 @@
+import contextvars
+import functools
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+from .metrics import REGISTRY
+
+logger = logging.getLogger('settlements.slow_requests')
+
+FACADE_DURATION = REGISTRY.histogram(
+    'settlements_facade_duration_seconds', 'Время выполнения метода StatisticsFacade', ['method']
+)
+FACADE_SQL_DURATION = REGISTRY.histogram(
+    'settlements_facade_sql_duration_seconds', 'Время SQL-запросов метода StatisticsFacade', ['method']
+)
+FACADE_QUERIES = REGISTRY.counter(
+    'settlements_facade_queries_total', 'Число SQL-запросов методов StatisticsFacade', ['method']
+)
+FACADE_ROWS = REGISTRY.counter(
+    'settlements_facade_rows_total', 'Число строк, полученных методами StatisticsFacade', ['method']
+)
+COMPONENT_DURATION = REGISTRY.histogram(
+    'settlements_component_duration_seconds',
+    'Время методов DataProcessor и DataFormatter', ['component', 'method']
+)
+REQUEST_DURATION = REGISTRY.histogram(
+    'settlements_request_duration_seconds', 'Время обработки HTTP-запроса', ['view']
+)
+REQUEST_SQL_DURATION = REGISTRY.histogram(
+    'settlements_request_sql_duration_seconds', 'Время SQL-запросов за HTTP-запрос', ['view']
+)
+REQUEST_QUERIES = REGISTRY.counter(
+    'settlements_request_queries_total', 'Число SQL-запросов за HTTP-запросы', ['view']
+)
+SLOW_REQUESTS = REGISTRY.counter(
+    'settlements_slow_requests_total', 'Число запросов медленнее SETTLEMENTS_SLOW_REQUEST_MS', ['view']
+)
+
+# Активные замеры текущего контекста (запрос, вызовы фасада); копируется в sync_to_async
+_scopes = contextvars.ContextVar('settlements_instrumentation_scopes', default=())
+
+
+class Measurement:
+    """Накопитель SQL-запросов и времени для одного замера"""
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+        self._facade_intervals = []
+        self._lock = threading.Lock()
+
+    def add_query(self, seconds, rows):
+        with self._lock:
+            self.queries += 1
+            self.sql_seconds += seconds
+            self.rows += rows
+
+    def add_facade_time(self, started, finished):
+        with self._lock:
+            self._facade_intervals.append((started, finished))
+
+    @property
+    def facade_seconds(self):
+        """
+        Время, в течение которого выполнялся хотя бы один метод фасада.
+        Параллельные вызовы (gather_facade_calls) перекрываются по времени,
+        поэтому считается объединение интервалов, а не сумма длительностей.
+        """
+        with self._lock:
+            intervals = sorted(self._facade_intervals)
+
+        total = 0.0
+        current_start = current_end = None
+
+        for started, finished in intervals:
+            if current_end is None or started > current_end:
+                if current_end is not None:
+                    total += current_end - current_start
+                current_start, current_end = started, finished
+            else:
+                current_end = max(current_end, finished)
+
+        if current_end is not None:
+            total += current_end - current_start
+
+        return total
+
+
+def _record_query(execute, sql, params, many, context):
+    started = time.perf_counter()
+
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        rowcount = getattr(context['cursor'], 'rowcount', -1)
+
+        for scope in _scopes.get():
+            scope.add_query(elapsed, max(rowcount, 0))
+
+
+@contextmanager
+def measure(kind):
+    """
+    Считать SQL-запросы во всех соединениях текущего потока.
+    Вложенные замеры видят те же запросы, что и внешние.
+    """
+    scope = Measurement(kind)
+    token = _scopes.set(_scopes.get() + (scope,))
+
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                if _record_query not in connection.execute_wrappers:
+                    stack.enter_context(connection.execute_wrapper(_record_query))
+
+            yield scope
+    finally:
+        _scopes.reset(token)
+
+
+def instrumented(method):
+    """Метрики метода фасада: время, SQL-запросы и их время, число строк"""
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        outermost = not any(scope.kind == 'facade' for scope in _scopes.get())
+        started = time.perf_counter()
+
+        with measure('facade') as scope:
+            try:
+                return method(*args, **kwargs)
+            finally:
+                finished = time.perf_counter()
+                elapsed = finished - started
+
+                FACADE_DURATION.observe(elapsed, method=name)
+                FACADE_SQL_DURATION.observe(scope.sql_seconds, method=name)
+                FACADE_QUERIES.inc(scope.queries, method=name)
+                FACADE_ROWS.inc(scope.rows, method=name)
+
+                if outermost:
+                    for parent in _scopes.get()[:-1]:
+                        parent.add_facade_time(started, finished)
+
+    return wrapper
+
+
+def instrument_component(component, component_name):
+    """
+    Замерять публичные методы экземпляра (DataProcessor, DataFormatter).
+    Методы подменяются на экземпляре, класс объекта не меняется.
+    """
+    for name in dir(type(component)):
+        attr = getattr(component, name)
+        if name.startswith('_') or not callable(attr):
+            continue
+
+        setattr(component, name, _timed(attr, component_name, name))
+
+    return component
+
+
+def _timed(func, component_name, method_name):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+
+        try:
+            return func(*args, **kwargs)
+        finally:
+            COMPONENT_DURATION.observe(
+                time.perf_counter() - started, component=component_name, method=method_name
+            )
+
+    return wrapper
+
+
+class InstrumentationMiddleware:
+    """
+    Время и SQL-запросы каждого HTTP-запроса.
+    Запросы дольше SETTLEMENTS_SLOW_REQUEST_MS пишутся в лог settlements.slow_requests
+    с разбивкой на SQL, методы фасада и остальное (обработка, шаблоны); 0 отключает лог.
+    Работает и в синхронной, и в асинхронной цепочке: под ASGI асинхронные
+    представления не переводятся в синхронный режим через async_to_sync.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_request_ms = getattr(settings, 'SETTLEMENTS_SLOW_REQUEST_MS', 1000)
+        self.async_mode = iscoroutinefunction(get_response)
+
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        started = time.perf_counter()
+
+        with measure('request') as scope:
+            response = self.get_response(request)
+
+        self.record(request, scope, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+
+        with measure('request') as scope:
+            response = await self.get_response(request)
+
+        self.record(request, scope, time.perf_counter() - started)
+        return response
+
+    def record(self, request, scope, elapsed):
+        """Записать метрики запроса и, если он медленный, строку в лог"""
+        view = getattr(request.resolver_match, 'view_name', None) or 'unresolved'
+
+        REQUEST_DURATION.observe(elapsed, view=view)
+        REQUEST_SQL_DURATION.observe(scope.sql_seconds, view=view)
+        REQUEST_QUERIES.inc(scope.queries, view=view)
+
+        if self.slow_request_ms and elapsed * 1000 >= self.slow_request_ms:
+            SLOW_REQUESTS.inc(view=view)
+            facade_seconds = scope.facade_seconds
+            logger.warning(
+                'Медленный запрос %s %s: %.0f мс; SQL: %d запросов, %.0f мс, %d строк; '
+                'фасад: %.0f мс; остальное: %.0f мс',
+                request.method, request.get_full_path(), elapsed * 1000,
+                scope.queries, scope.sql_seconds * 1000, scope.rows,
+                facade_seconds * 1000, (elapsed - facade_seconds) * 1000,
+            )
@@ -0,0 +1,154 @@
+from django.core.management.base import BaseCommand
+
+from settlements.benchmarks import (
+    FacadeBenchmark, FormatterBenchmark, ImportBenchmark, QueryPlanBenchmark, ViewLatencyBenchmark
+)
+from settlements.benchmarks.facade_benchmark import DEFAULT_SIZES
+from settlements.benchmarks.utils import write_report
+
+
+class Command(BaseCommand):
+    help = 'Замеры производительности загрузки и выдачи статистики'
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest='suite', required=True)
+
+        import_parser = subparsers.add_parser('import', help='Сравнить движки import_data')
+        import_parser.add_argument('csv_file', type=str, help='Путь к CSV файлу')
+        import_parser.add_argument(
+            '--engines', nargs='+', default=['orm', 'copy'], choices=['orm', 'copy'],
+            help='Сравниваемые движки записи'
+        )
+        import_parser.add_argument('--stream', action='store_true', help='Потоковое чтение CSV')
+        import_parser.add_argument('--staging', action='store_true', help='COPY через временную таблицу')
+        import_parser.add_argument('--repeat', type=int, default=1, help='Число повторов')
+        import_parser.add_argument('--report', type=str, help='Сохранить отчёт в JSON')
+
+        queries_parser = subparsers.add_parser(
+            'queries', help='Планы запросов страницы муниципалитета с индексами и без них'
+        )
+        queries_parser.add_argument('--region', type=str, help='Регион (по умолчанию — самый крупный муниципалитет)')
+        queries_parser.add_argument('--municipality', type=str, help='Муниципалитет')
+        queries_parser.add_argument('--search', type=str, default='ов', help='Строка поиска по названию')
+        queries_parser.add_argument('--plans', action='store_true', help='Вывести планы целиком')
+        queries_parser.add_argument('--report', type=str, help='Сохранить отчёт в JSON')
+
+        views_parser = subparsers.add_parser(
+            'views', help='Время ответа страниц: синхронные и асинхронные представления под ASGI'
+        )
+        views_parser.add_argument('--region', type=str, help='Регион (по умолчанию — самый крупный муниципалитет)')
+        views_parser.add_argument('--municipality', type=str, help='Муниципалитет')
+        views_parser.add_argument('--repeat', type=int, default=5, help='Число повторов')
+        views_parser.add_argument('--report', type=str, help='Сохранить отчёт в JSON')
+
+        facade_parser = subparsers.add_parser(
+            'facade', help='Методы StatisticsFacade и страницы на синтетических наборах разного размера'
+        )
+        facade_parser.add_argument(
+            '--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+            help='Размеры наборов (число поселений)'
+        )
+        facade_parser.add_argument('--engine', choices=['pandas', 'sql', 'snapshot'], help='Движок агрегации фасада')
+        facade_parser.add_argument('--seed', type=int, default=0, help='Зерно генератора набора')
+        facade_parser.add_argument('--repeat', type=int, default=3, help='Число повторов')
+        facade_parser.add_argument('--report', type=str, help='Сохранить отчёт в JSON')
+
+        formatter_parser = subparsers.add_parser(
+            'formatter', help='Форматирование чисел, записи и колонки, JSON-бэкенды DataFormatter'
+        )
+        formatter_parser.add_argument('--rows', type=int, default=100000, help='Число строк DataFrame')
+        formatter_parser.add_argument('--repeat', type=int, default=5, help='Число повторов')
+        formatter_parser.add_argument('--report', type=str, help='Сохранить отчёт в JSON')
+
+    def handle(self, *args, **options):
+        suite = options['suite']
+
+        if suite == 'import':
+            results = ImportBenchmark(
+                options['csv_file'],
+                engines=options['engines'],
+                stream=options['stream'],
+                staging=options['staging'],
+                repeat=options['repeat'],
+            ).run()
+
+            for engine, timing in results.items():
+                self.stdout.write(
+                    f"{engine:>6}: {timing['median']:.2f} с, "
+                    f"{timing['rows']:,} строк, {timing['rows_per_sec']:,.0f} строк/с"
+                )
+
+        if suite == 'queries':
+            results = QueryPlanBenchmark(
+                region_name=options['region'],
+                municipality_name=options['municipality'],
+                search=options['search'],
+            ).run()
+
+            self.stdout.write(f"{results['region']} / {results['municipality']}")
+            for name, with_indexes in results['with_indexes'].items():
+                without_indexes = results['without_indexes'][name]
+                self.stdout.write(f"{name}:")
+                self.stdout.write(f"    без индексов: {self.describe_plan(without_indexes)}")
+                self.stdout.write(f"    с индексами:  {self.describe_plan(with_indexes)}")
+
+                if options['plans']:
+                    self.stdout.write(with_indexes['plan'])
+
+        if suite == 'views':
+            results = ViewLatencyBenchmark(
+                region_name=options['region'],
+                municipality_name=options['municipality'],
+                repeat=options['repeat'],
+            ).run()
+
+            self.stdout.write(f"{results['region']} / {results['municipality']}")
+            for page, timing in results['pages'].items():
+                self.stdout.write(
+                    f"{page:>12}: sync {timing['sync']['median'] * 1000:.0f} мс, "
+                    f"async {timing['async']['median'] * 1000:.0f} мс, "
+                    f"ускорение {timing['speedup']:.2f}x"
+                )
+
+        if suite == 'facade':
+            results = FacadeBenchmark(
+                sizes=options['sizes'],
+                repeat=options['repeat'],
+                engine=options['engine'],
+                seed=options['seed'],
+            ).run()
+
+            for size, result in results['sizes'].items():
+                self.stdout.write(f"{int(size):,} поселений (импорт {result['import_seconds']:.1f} с):")
+
+                for group in ('methods', 'pages'):
+                    for name, timing in result[group].items():
+                        self.stdout.write(
+                            f"    {name:<45} {timing['median'] * 1000:>9.1f} мс, запросов: {timing['queries']}"
+                        )
+
+        if suite == 'formatter':
+            results = FormatterBenchmark(rows=options['rows'], repeat=options['repeat']).run()
+
+            self.stdout.write(f"{results['rows']:,} строк:")
+            for group, timings in results['results'].items():
+                for name, timing in self.flatten(timings):
+                    self.stdout.write(f"    {group + ' ' + name:<30} {timing['median'] * 1000:>9.1f} мс")
+
+        if options.get('report'):
+            write_report(options['report'], {suite: results})
+            self.stdout.write(self.style.SUCCESS(f"Отчёт сохранён: {options['report']}"))
+
+    @classmethod
+    def flatten(cls, timings, prefix=''):
+        """Пары (имя, замер) из вложенных словарей замеров"""
+        for name, value in timings.items():
+            if 'median' in value:
+                yield prefix + name, value
+            else:
+                yield from cls.flatten(value, f'{prefix}{name} ')
+
+    @staticmethod
+    def describe_plan(result):
+        access = ', '.join(result['access']) or 'нет обращений к таблице поселений'
+        return f"{result['execution_ms']:.2f} мс — {access}"
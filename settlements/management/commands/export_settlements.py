@@ -0,0 +1,56 @@
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from settlements.services import SettlementExporter
+
+
+class Command(BaseCommand):
+    help = 'Выгрузить поселения в CSV или Parquet с фильтрами страниц муниципалитетов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', type=str, help='Путь к файлу выгрузки')
+        parser.add_argument(
+            '--format', choices=['csv', 'parquet'],
+            help='Формат файла (по умолчанию по расширению: .parquet — Parquet, иначе CSV)'
+        )
+        parser.add_argument('--region', help='Только поселения региона')
+        parser.add_argument('--municipality', help='Только поселения муниципалитета (вместе с --region)')
+        parser.add_argument('--type', help='Только поселения этого типа')
+        parser.add_argument('--search', help='Только поселения, в названии которых есть эта строка')
+        parser.add_argument(
+            '--chunk-size', type=int, default=5000,
+            help='Строк за одно чтение серверного курсора (по умолчанию 5000)'
+        )
+        parser.add_argument(
+            '--row-group-size', type=int, default=50000,
+            help='Строк в группе строк Parquet (по умолчанию 50000)'
+        )
+
+    def handle(self, *args, **options):
+        output = options['output']
+        file_format = options['format'] or ('parquet' if output.endswith('.parquet') else 'csv')
+
+        if options['municipality'] and not options['region']:
+            raise CommandError('Муниципалитет задаётся только вместе с регионом (--region)')
+
+        try:
+            exporter = SettlementExporter(
+                file_format, chunk_size=options['chunk_size'], row_group_size=options['row_group_size']
+            )
+        except ImproperlyConfigured as error:
+            raise CommandError(str(error))
+
+        started = time.perf_counter()
+
+        with open(output, 'wb') as f:
+            for chunk in exporter.export(
+                options['region'], options['municipality'], options['search'], options['type']
+            ):
+                f.write(chunk)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Выгружено {exporter.exported:,} поселений в {output} "
+            f"за {time.perf_counter() - started:.1f} с"
+        ))
@@ -0,0 +1,34 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from settlements.services import SettlementSnapshot, get_dataset_version
+
+
+class Command(BaseCommand):
+    help = 'Выгрузить снимок поселений в файл для движка snapshot (np.memmap)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', type=str,
+            help='Путь к файлу снимка (по умолчанию SETTLEMENTS_SNAPSHOT_PATH)'
+        )
+
+    def handle(self, *args, **options):
+        output = options['output'] or getattr(settings, 'SETTLEMENTS_SNAPSHOT_PATH', '')
+        if not output:
+            raise CommandError('Укажите --output или SETTLEMENTS_SNAPSHOT_PATH')
+
+        dataset_version = get_dataset_version()
+        if dataset_version is None:
+            raise CommandError('Версия данных не задана: сначала выполните import_data')
+
+        started = time.perf_counter()
+        snapshot = SettlementSnapshot.from_database(version=dataset_version.version)
+        size = snapshot.to_file(output)
+
+        self.stdout.write(
+            f"Снимок версии {dataset_version.version}: {len(snapshot):,} поселений, "
+            f"{size / 2 ** 20:.1f} МБ в {output} за {time.perf_counter() - started:.1f} с"
+        )
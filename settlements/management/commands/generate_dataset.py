@@ -0,0 +1,65 @@
+import os
+import tempfile
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from settlements.benchmarks.synthetic import SyntheticDataset
+
+
+class Command(BaseCommand):
+    help = 'Сгенерировать синтетический набор поселений в формате CSV для import_data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--settlements', type=int, default=100000, help='Число поселений')
+        parser.add_argument('--regions', type=int, default=85, help='Число регионов')
+        parser.add_argument(
+            '--municipalities', type=int,
+            help='Число муниципалитетов (по умолчанию — одно на 100 поселений, не больше 2500)'
+        )
+        parser.add_argument('--empty-share', type=float, default=0.1, help='Доля поселений без населения')
+        parser.add_argument('--seed', type=int, default=0, help='Зерно генератора случайных чисел')
+        parser.add_argument('--output', type=str, help='Путь к CSV файлу')
+        parser.add_argument(
+            '--load',
+            action='store_true',
+            help='Сразу загрузить набор в БД через import_data (COPY, потоковый режим)'
+        )
+
+    def handle(self, *args, **options):
+        if not (options['output'] or options['load']):
+            raise CommandError('Укажите --output и/или --load')
+
+        dataset = SyntheticDataset(
+            settlements=options['settlements'],
+            regions=options['regions'],
+            municipalities=options['municipalities'],
+            empty_share=options['empty_share'],
+            seed=options['seed'],
+        )
+
+        if dataset.municipalities < dataset.regions:
+            raise CommandError('Муниципалитетов должно быть не меньше, чем регионов')
+
+        output = options['output']
+        if output is None:
+            fd, output = tempfile.mkstemp(suffix='.csv')
+            os.close(fd)
+
+        try:
+            started = time.perf_counter()
+            rows = dataset.write_csv(output)
+            self.stdout.write(
+                f"Сгенерировано {rows:,} поселений в {dataset.municipalities:,} муниципалитетах "
+                f"и {dataset.regions:,} регионах за {time.perf_counter() - started:.1f} с"
+            )
+
+            if options['load']:
+                call_command(
+                    'import_data', output, stream=True, engine='copy', staging=True,
+                    stdout=self.stdout
+                )
+        finally:
+            if not options['output']:
+                os.remove(output)
@@ -1,7 +1,15 @@
+import time
+
 import pandas as pd
-from django.core.management.base import BaseCommand
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
+from settlements.cache_warmer import process_local_cache
+from settlements.db_router import use_primary
 from settlements.models import Region, Municipality, Settlement
+from settlements.services import (
+    AggregateBuilder, CopySettlementLoader, SettlementSynchronizer, bump_dataset_version
+)
 
 SETTLEMENT_CATEGORIES = {
     'Город': ['г', 'город', 'городок', 'гп'],
@@ -28,54 +36,262 @@ def get_category(settlement_type):
     return 'Прочее'
 
 
+# Обратный словарь «тип НП -> категория» для векторной классификации
+TYPE_CATEGORIES = {}
+for _category, _types in SETTLEMENT_CATEGORIES.items():
+    for _type in _types:
+        TYPE_CATEGORIES.setdefault(_type, _category)
+
+
+def get_categories(settlement_types):
+    """Определяет категории для целой колонки типов НП (аналог get_category)"""
+    return settlement_types.map(TYPE_CATEGORIES).fillna('Прочее')
+
+
 class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument('csv_file', type=str, help='Путь к CSV файлу')
+        parser.add_argument(
+            '--stream',
+            action='store_true',
+            help='Потоковый импорт: читать CSV частями, не загружая файл целиком'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=50000,
+            help='Размер части CSV в потоковом режиме (по умолчанию 50000 строк)'
+        )
+        parser.add_argument(
+            '--engine',
+            choices=['orm', 'copy'],
+            default='orm',
+            help='Способ записи поселений: orm (bulk_create) или copy (COPY FROM STDIN)'
+        )
+        parser.add_argument(
+            '--staging',
+            action='store_true',
+            help='Для --engine=copy: копировать во временную таблицу и переносить одним INSERT ... SELECT'
+        )
+        parser.add_argument(
+            '--mode',
+            choices=['append', 'incremental'],
+            default='append',
+            help='append — добавить новые поселения; incremental — синхронизировать '
+                 'с файлом: вставить новые, обновить изменившиеся, удалить отсутствующие'
+        )
+        parser.add_argument(
+            '--warm-cache',
+            action='store_true',
+            help='После импорта прогреть кэш статистики всех страниц (команда warm_cache)'
+        )
+        parser.add_argument(
+            '--warm-cache-workers',
+            type=int,
+            help='Число процессов прогрева кэша (по умолчанию SETTLEMENTS_WARM_CACHE_WORKERS)'
+        )
 
     def handle(self, *args, **options):
+        # Импорт читает то, что сам же записал: регионы, муниципалитеты, агрегаты
+        with use_primary():
+            self.import_data(options)
+
+    def import_data(self, options):
         filepath = options['csv_file']
-        df = pd.read_csv(filepath, sep=',', encoding='utf-8')
-        df['category'] = df['type'].apply(get_category)
+
+        if options['mode'] == 'incremental' and options['engine'] == 'copy':
+            raise CommandError('Инкрементальный режим записывает изменения через ORM, --engine=copy не поддерживается')
+
+        self.loader = None
+        if options['engine'] == 'copy':
+            self.loader = CopySettlementLoader(staging=options['staging'])
 
         with transaction.atomic():
-            region_cache = {}
-            for region_name in df['region'].unique():
-                region, _ = Region.objects.get_or_create(name=region_name)
-                region_cache[region_name] = region
+            if options['mode'] == 'incremental':
+                counts = self.import_incremental(filepath, options['chunk_size'])
+                self.stdout.write(
+                    f"Добавлено: {counts['inserted']:,}, обновлено: {counts['updated']:,}, "
+                    f"удалено: {counts['deleted']:,}, без изменений: {counts['unchanged']:,}"
+                )
 
-            municipality_cache = {}
-            for _, row in df.iterrows():
-                key = f"{row['municipality']}|{row['region']}"
-                if key not in municipality_cache:
-                    region = region_cache[row['region']]
-                    mun, _ = Municipality.objects.get_or_create(
-                        name=row['municipality'],
-                        region=region
-                    )
-                    municipality_cache[key] = mun
-
-            batch_size = 5000
-            for start in range(0, len(df), batch_size):
-                batch = df.iloc[start:start + batch_size]
-                settlements_batch = []
-
-                for _, row in batch.iterrows():
-                    key = f"{row['municipality']}|{row['region']}"
-                    municipality = municipality_cache[key]
-
-                    settlements_batch.append(Settlement(
-                        name=row['settlement'],
-                        type=row['category'],
-                        population=int(row.get('population', 0)),
-                        municipality=municipality
+                if counts['duplicates']:
+                    self.stdout.write(self.style.WARNING(
+                        f"Повторов поселений в файле: {counts['duplicates']:,} (оставлена первая строка)"
                     ))
 
-                Settlement.objects.bulk_create(
-                    settlements_batch,
-                    ignore_conflicts=True,
-                    batch_size=1000
-                )
+                if not any(counts[name] for name in ('inserted', 'updated', 'deleted')):
+                    self.stdout.write(self.style.SUCCESS('Изменений нет, импорт завершен!'))
+                    return
 
-                self.stdout.write(f"{start + len(batch):,} / {len(df):,}")
+            else:
+                if self.loader:
+                    self.loader.begin()
+
+                if options['stream']:
+                    self.import_streaming(filepath, options['chunk_size'])
+                else:
+                    self.import_in_memory(filepath)
+
+                if self.loader:
+                    loaded = self.loader.finish()
+                    self.stdout.write(f"Загружено через COPY: {loaded:,}")
+
+            built = AggregateBuilder().rebuild()
+            self.stdout.write(
+                f"Агрегаты пересчитаны: регионов {built['regions']:,}, "
+                f"муниципалитетов {built['municipalities']:,}"
+            )
+
+            dataset_version = bump_dataset_version()
+            self.stdout.write(f"Версия данных: {dataset_version.version}")
 
             self.stdout.write(self.style.SUCCESS('Импорт завершен!'))
+
+        # Процессы прогрева видят данные только после фиксации транзакции импорта
+        if options['warm_cache']:
+            self.warm_cache(options['warm_cache_workers'])
+
+    def warm_cache(self, workers):
+        if process_local_cache():
+            self.stdout.write(self.style.WARNING(
+                'Кэш хранится в памяти процесса, прогрев после импорта пропущен'
+            ))
+            return
+
+        call_command('warm_cache', workers=workers, primary=True, stdout=self.stdout)
+
+    def import_in_memory(self, filepath):
+        """Импорт с загрузкой всего CSV в память"""
+        df = pd.read_csv(filepath, sep=',', encoding='utf-8')
+        df['category'] = get_categories(df['type'])
+
+        region_cache = {}
+        for region_name in df['region'].unique():
+            region, _ = Region.objects.get_or_create(name=region_name)
+            region_cache[region_name] = region
+
+        municipality_cache = {}
+        for _, row in df.iterrows():
+            key = f"{row['municipality']}|{row['region']}"
+            if key not in municipality_cache:
+                region = region_cache[row['region']]
+                mun, _ = Municipality.objects.get_or_create(
+                    name=row['municipality'],
+                    region=region
+                )
+                municipality_cache[key] = mun
+
+        batch_size = 5000
+        for start in range(0, len(df), batch_size):
+            batch = df.iloc[start:start + batch_size]
+            settlements_batch = []
+
+            for _, row in batch.iterrows():
+                key = f"{row['municipality']}|{row['region']}"
+                municipality = municipality_cache[key]
+
+                settlements_batch.append((
+                    row['settlement'],
+                    row['category'],
+                    int(row.get('population', 0)),
+                    municipality.pk
+                ))
+
+            self.write_settlements(settlements_batch)
+
+            self.stdout.write(f"{start + len(batch):,} / {len(df):,}")
+
+    def import_streaming(self, filepath, chunk_size):
+        """
+        Потоковый импорт: CSV читается частями по chunk_size строк.
+        В памяти держатся только текущая часть и словари регионов
+        и муниципалитетов, поэтому потребление не зависит от размера файла.
+        """
+        for rows in self.read_chunks(filepath, chunk_size):
+            self.write_settlements(rows)
+
+    def import_incremental(self, filepath, chunk_size):
+        """
+        Инкрементальный импорт: файл читается частями и сравнивается
+        с текущим состоянием БД по естественному ключу, записываются только изменения.
+        """
+        synchronizer = SettlementSynchronizer()
+        synchronizer.load_existing()
+
+        for rows in self.read_chunks(filepath, chunk_size):
+            synchronizer.apply(rows)
+
+        return synchronizer.finish()
+
+    def read_chunks(self, filepath, chunk_size):
+        """
+        Читать CSV частями и отдавать строки (name, type, population, municipality_id).
+        Регионы и муниципалитеты создаются по мере появления в файле.
+        """
+        region_cache = {}
+        municipality_cache = {}
+
+        total = 0
+        started = time.perf_counter()
+
+        for chunk in pd.read_csv(filepath, sep=',', encoding='utf-8', chunksize=chunk_size):
+            self.resolve_municipalities(chunk, region_cache, municipality_cache)
+
+            if 'population' in chunk:
+                populations = chunk['population'].fillna(0).astype('int64')
+            else:
+                populations = pd.Series(0, index=chunk.index)
+
+            yield [
+                (name, category, int(population), municipality_cache[(region_name, municipality_name)].pk)
+                for region_name, municipality_name, name, category, population in zip(
+                    chunk['region'],
+                    chunk['municipality'],
+                    chunk['settlement'],
+                    get_categories(chunk['type']),
+                    populations,
+                )
+            ]
+
+            total += len(chunk)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{total:,} строк, {total / elapsed if elapsed else 0:,.0f} строк/с"
+            )
+
+    def write_settlements(self, rows):
+        """Записать порцию поселений (name, type, population, municipality_id)"""
+        if self.loader:
+            self.loader.load(rows)
+            return
+
+        Settlement.objects.bulk_create(
+            [
+                Settlement(
+                    name=name,
+                    type=settlement_type,
+                    population=population,
+                    municipality_id=municipality_id
+                )
+                for name, settlement_type, population, municipality_id in rows
+            ],
+            ignore_conflicts=True,
+            batch_size=1000
+        )
+
+    @staticmethod
+    def resolve_municipalities(chunk, region_cache, municipality_cache):
+        """Создать регионы и муниципалитеты, впервые встреченные в части CSV"""
+        pairs = chunk[['region', 'municipality']].drop_duplicates()
+
+        for region_name, municipality_name in zip(pairs['region'], pairs['municipality']):
+            if (region_name, municipality_name) in municipality_cache:
+                continue
+
+            if region_name not in region_cache:
+                region_cache[region_name], _ = Region.objects.get_or_create(name=region_name)
+
+            municipality_cache[(region_name, municipality_name)], _ = Municipality.objects.get_or_create(
+                name=municipality_name,
+                region=region_cache[region_name]
+            )
@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from settlements.cache_warmer import CacheWarmer, process_local_cache
+
+
+class Command(BaseCommand):
+    help = 'Заполнить кэш StatisticsFacade для главной страницы, всех регионов и муниципалитетов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int,
+            help='Число процессов (по умолчанию SETTLEMENTS_WARM_CACHE_WORKERS или число процессоров)'
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Пересчитать и результаты, уже лежащие в кэше'
+        )
+        parser.add_argument(
+            '--primary', action='store_true',
+            help='Читать данные с основной БД, а не с реплики (сразу после импорта)'
+        )
+        parser.add_argument(
+            '--progress-every', type=int, default=100,
+            help='Выводить прогресс каждые N страниц (по умолчанию 100)'
+        )
+
+    def handle(self, *args, **options):
+        if process_local_cache():
+            alias = getattr(settings, 'SETTLEMENTS_CACHE_ALIAS', 'default')
+            raise CommandError(
+                f"Кэш '{alias}' хранится в памяти процесса: результаты прогрева не увидят процессы сервера"
+            )
+
+        warmer = CacheWarmer(workers=options['workers'], force=options['force'], primary=options['primary'])
+        every = max(options['progress_every'], 1)
+
+        def report(state):
+            if state.pages % every == 0 or state.pages == state.total_pages:
+                self.stdout.write(
+                    f"{state.pages:,} / {state.total_pages:,} страниц, "
+                    f"{state.pages_per_second:,.1f} страниц/с"
+                )
+
+        state = warmer.run(report)
+
+        if not state.total_pages:
+            raise CommandError('Версия данных не задана: сначала выполните import_data')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Кэш прогрет за {state.elapsed:.1f} с ({warmer.workers} процессов): "
+            f"вычислено {state.computed:,}, уже в кэше {state.skipped:,}"
+        ))
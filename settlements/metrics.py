@@ -0,0 +1,127 @@
+import math
+import threading
+from bisect import bisect_left
+
+# Границы интервалов гистограмм задержек, секунды
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"'))
+        for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Монотонный счётчик с метками"""
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+
+        for key, value in sorted(values.items()):
+            yield self.name, tuple(zip(self.labelnames, key)), value
+
+
+class Histogram:
+    """Гистограмма с накопительными интервалами, как в Prometheus"""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        # Интервал le включает своё значение: первая граница, не меньшая value
+        index = bisect_left(self.buckets, value)
+
+        with self._lock:
+            counts, total = self._series.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[index] += 1
+            self._series[key] = (counts, total + value)
+
+    def samples(self):
+        with self._lock:
+            series = {key: (list(counts), total) for key, (counts, total) in self._series.items()}
+
+        for key, (counts, total) in sorted(series.items()):
+            labels = tuple(zip(self.labelnames, key))
+            cumulative = 0
+
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                yield f'{self.name}_bucket', labels + (('le', _format_value(float(bound))),), cumulative
+
+            yield f'{self.name}_sum', labels, total
+            yield f'{self.name}_count', labels, cumulative
+
+
+class MetricsRegistry:
+    """
+    Метрики процесса в текстовом формате Prometheus.
+    Значения хранятся в памяти процесса: при нескольких воркерах
+    каждый отдаёт свои метрики, суммирование — на стороне Prometheus.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        lines = []
+
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
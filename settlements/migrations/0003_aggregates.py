@@ -0,0 +1,45 @@
+# Generated by Django 6.0.1 on 2026-10-18 09:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('settlements', '0002_remove_settlement_children_population'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MunicipalityAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('population', models.BigIntegerField(default=0, verbose_name='Население')),
+                ('settlements', models.PositiveIntegerField(default=0, verbose_name='Населенных пунктов')),
+                ('empty_settlements', models.PositiveIntegerField(default=0, verbose_name='Пустых НП')),
+                ('populated_settlements', models.PositiveIntegerField(default=0, verbose_name='Населенных НП')),
+                ('municipality', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='aggregate', to='settlements.municipality')),
+            ],
+            options={
+                'verbose_name': 'Агрегат муниципалитета',
+                'verbose_name_plural': 'Агрегаты муниципалитетов',
+            },
+        ),
+        migrations.CreateModel(
+            name='RegionAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('population', models.BigIntegerField(default=0, verbose_name='Население')),
+                ('municipalities', models.PositiveIntegerField(default=0, verbose_name='Муниципалитетов')),
+                ('settlements', models.PositiveIntegerField(default=0, verbose_name='Населенных пунктов')),
+                ('empty_settlements', models.PositiveIntegerField(default=0, verbose_name='Пустых НП')),
+                ('populated_settlements', models.PositiveIntegerField(default=0, verbose_name='Населенных НП')),
+                ('region', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='aggregate', to='settlements.region')),
+            ],
+            options={
+                'verbose_name': 'Агрегат региона',
+                'verbose_name_plural': 'Агрегаты регионов',
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0.1 on 2026-10-18 09:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('settlements', '0003_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DatasetVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField(default=0, verbose_name='Версия данных')),
+                ('updated_at', models.DateTimeField(verbose_name='Время импорта')),
+            ],
+            options={
+                'verbose_name': 'Версия набора данных',
+                'verbose_name_plural': 'Версии набора данных',
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 6.0.1 on 2026-10-18 09:53
+
+import logging
+
+from django.db import migrations, models
+
+logger = logging.getLogger(__name__)
+
+
+def delete_duplicates(apps, schema_editor):
+    """
+    Повторные импорты дублировали строки: оставляем самую раннюю запись.
+    Одноимённые НП одного типа в одном муниципалитете при этом сливаются в одну
+    запись, поэтому число удалённых строк пишется в лог.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("""
+            DELETE FROM settlements_settlement duplicate
+            USING settlements_settlement original
+            WHERE duplicate.municipality_id = original.municipality_id
+              AND duplicate.name = original.name
+              AND duplicate.type = original.type
+              AND duplicate.id > original.id
+        """)
+        deleted = cursor.rowcount
+
+    if deleted:
+        logger.warning('Удалено повторов поселений по ключу (муниципалитет, название, тип): %d', deleted)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('settlements', '0004_dataset_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='settlement',
+            constraint=models.UniqueConstraint(fields=('municipality', 'name', 'type'), name='unique_settlement_natural_key'),
+        ),
+    ]
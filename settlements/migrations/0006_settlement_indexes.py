@@ -0,0 +1,54 @@
+# Generated by Django 6.0.1 on 2026-10-18 09:54
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+TRIGRAM_INDEX = django.contrib.postgres.indexes.GinIndex(
+    django.contrib.postgres.indexes.OpClass(
+        django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'
+    ),
+    name='settlement_name_trgm_idx',
+)
+
+
+def create_trigram_index(apps, schema_editor):
+    # pg_trgm входит в contrib и есть в официальных образах PostgreSQL,
+    # но на сборках без contrib индекс пропускается, а поиск работает без него
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.add_index(apps.get_model('settlements', 'Settlement'), TRIGRAM_INDEX)
+
+
+def drop_trigram_index(apps, schema_editor):
+    schema_editor.execute(f'DROP INDEX IF EXISTS "{TRIGRAM_INDEX.name}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('settlements', '0005_settlement_natural_key'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='settlement',
+            index=models.Index(fields=['municipality', '-population'], name='settlement_mun_population_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='settlement',
+            index=models.Index(fields=['municipality', 'type'], name='settlement_mun_type_idx'),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='settlement', index=TRIGRAM_INDEX),
+            ],
+            database_operations=[
+                migrations.RunPython(create_trigram_index, drop_trigram_index),
+            ],
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:23
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+# Агрегаты, построенные до этой миграции, получают скетчи при следующем полном import_data;
+# до тех пор статистика населения НП считается точно (DataFetcher.fetch_population_sketch)
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('settlements', '0006_settlement_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='municipalityaggregate',
+            name='population_max',
+            field=models.BigIntegerField(blank=True, null=True, verbose_name='Максимальное население НП'),
+        ),
+        migrations.AddField(
+            model_name='municipalityaggregate',
+            name='population_min',
+            field=models.BigIntegerField(blank=True, null=True, verbose_name='Минимальное население НП'),
+        ),
+        migrations.AddField(
+            model_name='municipalityaggregate',
+            name='sketch_counts',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.PositiveIntegerField(), blank=True, default=list, size=None, verbose_name='Счётчики скетча'),
+        ),
+        migrations.AddField(
+            model_name='municipalityaggregate',
+            name='sketch_offset',
+            field=models.IntegerField(default=0, verbose_name='Первый интервал скетча'),
+        ),
+        migrations.AddField(
+            model_name='regionaggregate',
+            name='population_max',
+            field=models.BigIntegerField(blank=True, null=True, verbose_name='Максимальное население НП'),
+        ),
+        migrations.AddField(
+            model_name='regionaggregate',
+            name='population_min',
+            field=models.BigIntegerField(blank=True, null=True, verbose_name='Минимальное население НП'),
+        ),
+        migrations.AddField(
+            model_name='regionaggregate',
+            name='sketch_counts',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.PositiveIntegerField(), blank=True, default=list, size=None, verbose_name='Счётчики скетча'),
+        ),
+        migrations.AddField(
+            model_name='regionaggregate',
+            name='sketch_offset',
+            field=models.IntegerField(default=0, verbose_name='Первый интервал скетча'),
+        ),
+    ]
@@ -1,4 +1,7 @@
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
 
 class Region(models.Model):
@@ -35,6 +38,75 @@ class Settlement(models.Model):
     class Meta:
         verbose_name = "Населенный пункт"
         verbose_name_plural = "Населенные пункты"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['municipality', 'name', 'type'],
+                name='unique_settlement_natural_key'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['municipality', '-population'], name='settlement_mun_population_idx'),
+            models.Index(fields=['municipality', 'type'], name='settlement_mun_type_idx'),
+            # Поиск name__icontains выполняется как UPPER(name) LIKE UPPER(...)
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='settlement_name_trgm_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.type})"
+
+
+class RegionAggregate(models.Model):
+    region = models.OneToOneField(Region, on_delete=models.CASCADE, related_name='aggregate')
+    population = models.BigIntegerField(default=0, verbose_name="Население")
+    municipalities = models.PositiveIntegerField(default=0, verbose_name="Муниципалитетов")
+    settlements = models.PositiveIntegerField(default=0, verbose_name="Населенных пунктов")
+    empty_settlements = models.PositiveIntegerField(default=0, verbose_name="Пустых НП")
+    populated_settlements = models.PositiveIntegerField(default=0, verbose_name="Населенных НП")
+    population_min = models.BigIntegerField(null=True, blank=True, verbose_name="Минимальное население НП")
+    population_max = models.BigIntegerField(null=True, blank=True, verbose_name="Максимальное население НП")
+    # Скетч квантилей населения НП (QuantileSketch): счётчики интервалов начиная с sketch_offset
+    sketch_offset = models.IntegerField(default=0, verbose_name="Первый интервал скетча")
+    sketch_counts = ArrayField(
+        models.PositiveIntegerField(), default=list, blank=True, verbose_name="Счётчики скетча"
+    )
+
+    class Meta:
+        verbose_name = "Агрегат региона"
+        verbose_name_plural = "Агрегаты регионов"
+
+    def __str__(self):
+        return f"{self.region.name}: {self.population}"
+
+
+class MunicipalityAggregate(models.Model):
+    municipality = models.OneToOneField(Municipality, on_delete=models.CASCADE, related_name='aggregate')
+    population = models.BigIntegerField(default=0, verbose_name="Население")
+    settlements = models.PositiveIntegerField(default=0, verbose_name="Населенных пунктов")
+    empty_settlements = models.PositiveIntegerField(default=0, verbose_name="Пустых НП")
+    populated_settlements = models.PositiveIntegerField(default=0, verbose_name="Населенных НП")
+    population_min = models.BigIntegerField(null=True, blank=True, verbose_name="Минимальное население НП")
+    population_max = models.BigIntegerField(null=True, blank=True, verbose_name="Максимальное население НП")
+    # Скетч квантилей населения НП (QuantileSketch): счётчики интервалов начиная с sketch_offset
+    sketch_offset = models.IntegerField(default=0, verbose_name="Первый интервал скетча")
+    sketch_counts = ArrayField(
+        models.PositiveIntegerField(), default=list, blank=True, verbose_name="Счётчики скетча"
+    )
+
+    class Meta:
+        verbose_name = "Агрегат муниципалитета"
+        verbose_name_plural = "Агрегаты муниципалитетов"
+
+    def __str__(self):
+        return f"{self.municipality.name}: {self.population}"
+
+
+class DatasetVersion(models.Model):
+    version = models.PositiveIntegerField(default=0, verbose_name="Версия данных")
+    updated_at = models.DateTimeField(verbose_name="Время импорта")
+
+    class Meta:
+        verbose_name = "Версия набора данных"
+        verbose_name_plural = "Версии набора данных"
+
+    def __str__(self):
+        return f"v{self.version} ({self.updated_at:%Y-%m-%d %H:%M})"
@@ -0,0 +1,62 @@
+class KeysetCursor:
+    """
+    Позиция в списке поселений, упорядоченном по (population DESC, id DESC).
+    Кодируется в строку вида "<population>:<id>", для NULL — "null:<id>".
+    """
+    NULL = 'null'
+
+    @classmethod
+    def encode(cls, population, pk):
+        return f"{cls.NULL if population is None else population}:{pk}"
+
+    @classmethod
+    def decode(cls, cursor):
+        """Разобрать курсор в (population, id); ValueError для некорректной строки"""
+        population, separator, pk = str(cursor).partition(':')
+
+        if not separator:
+            raise ValueError(f"Некорректный курсор: {cursor!r}")
+
+        return (None if population == cls.NULL else int(population)), int(pk)
+
+    @classmethod
+    def clean(cls, cursor):
+        """Курсор из параметра запроса или None, если он пустой или некорректный"""
+        try:
+            cls.decode(cursor)
+        except ValueError:
+            return None
+
+        return cursor
+
+
+class KeysetPage:
+    """
+    Страница курсорной пагинации для шаблонов.
+    Повторяет ту часть интерфейса django.core.paginator.Page,
+    которая не требует знать номер страницы.
+    """
+
+    def __init__(self, object_list, next_cursor, total_count, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.total_count = total_count
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
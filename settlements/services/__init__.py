@@ -1,5 +1,24 @@
 from .data_fetcher import DataFetcher
 from .data_processor import DataProcessor
+from .sql_data_processor import SqlDataProcessor
 from .data_formatter import DataFormatter
+from .aggregate_builder import AggregateBuilder
+from .copy_loader import CopySettlementLoader
+from .settlement_export import SettlementExporter
+from .settlement_sync import SettlementSynchronizer
+from .dataset_version import get_dataset_version, bump_dataset_version
+from .name_search import SettlementSearchIndex, get_search_index, normalize_name
+from .quantile_sketch import QuantileSketch
+from .snapshot import SettlementSnapshot, get_snapshot, load_snapshot
+from .snapshot_file import StringTable
+from .snapshot_fetcher import SnapshotFetcher, SnapshotSelection
+from .snapshot_processor import SnapshotProcessor
 
-__all__ = ['DataFetcher', 'DataProcessor', 'DataFormatter']
+__all__ = [
+    'DataFetcher', 'DataProcessor', 'SqlDataProcessor', 'DataFormatter',
+    'AggregateBuilder', 'CopySettlementLoader', 'SettlementExporter', 'SettlementSynchronizer',
+    'get_dataset_version', 'bump_dataset_version', 'QuantileSketch',
+    'SettlementSearchIndex', 'get_search_index', 'normalize_name',
+    'SettlementSnapshot', 'get_snapshot', 'load_snapshot', 'StringTable',
+    'SnapshotFetcher', 'SnapshotSelection', 'SnapshotProcessor',
+]
@@ -0,0 +1,128 @@
+from collections import defaultdict
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q, Sum
+
+from settlements.models import Region, Municipality, Settlement, RegionAggregate, MunicipalityAggregate
+from .expressions import SketchBucket
+from .quantile_sketch import LOG_GAMMA, QuantileSketch
+
+
+class AggregateBuilder:
+    """
+    Пересчитывает предрасчитанные агрегаты регионов и муниципалитетов.
+    Вся группировка выполняется в БД, в Python попадает по строке на объект
+    (для скетчей квантилей — на непустой интервал муниципалитета;
+    скетчи регионов получаются слиянием скетчей муниципалитетов).
+    """
+
+    def rebuild(self):
+        """Полностью пересобрать таблицы агрегатов"""
+        with transaction.atomic():
+            MunicipalityAggregate.objects.all().delete()
+            RegionAggregate.objects.all().delete()
+
+            sketches = self._build_sketches()
+            municipality_aggregates = self._build_municipality_aggregates(sketches)
+            region_aggregates = self._build_region_aggregates(sketches)
+
+            MunicipalityAggregate.objects.bulk_create(municipality_aggregates, batch_size=1000)
+            RegionAggregate.objects.bulk_create(region_aggregates, batch_size=1000)
+
+        return {
+            'regions': len(region_aggregates),
+            'municipalities': len(municipality_aggregates),
+        }
+
+    def _build_municipality_aggregates(self, sketches):
+        populated_filter = Q(settlements__population__gt=0)
+
+        rows = Municipality.objects.annotate(
+            population_total=Sum('settlements__population'),
+            settlements_total=Count('settlements'),
+            populated_total=Count('settlements', filter=populated_filter),
+            population_min=Min('settlements__population', filter=populated_filter),
+            population_max=Max('settlements__population', filter=populated_filter),
+        ).values_list(
+            'id', 'population_total', 'settlements_total', 'populated_total', 'population_min', 'population_max'
+        )
+
+        return [
+            MunicipalityAggregate(
+                municipality_id=municipality_id,
+                population=population or 0,
+                settlements=settlements,
+                empty_settlements=settlements - populated,
+                populated_settlements=populated,
+                population_min=population_min,
+                population_max=population_max,
+                **self._sketch_fields(sketches.get(municipality_id)),
+            )
+            for municipality_id, population, settlements, populated, population_min, population_max in rows
+        ]
+
+    def _build_sketches(self):
+        """
+        Скетчи квантилей населения по муниципалитетам: {id: QuantileSketch} (только интервалы).
+        Номера интервалов считаются в БД, из неё приходят только счётчики интервалов.
+        """
+        rows = Settlement.objects.filter(population__gt=0).annotate(
+            bucket=SketchBucket('population', LOG_GAMMA)
+        ).values('municipality_id', 'bucket').annotate(
+            settlements_count=Count('*')
+        ).order_by('municipality_id', 'bucket').values_list('municipality_id', 'bucket', 'settlements_count')
+
+        rows = np.array(list(rows), dtype=np.int64).reshape(-1, 3)
+        municipality_ids, starts = np.unique(rows[:, 0], return_index=True)
+
+        return {
+            municipality_id: QuantileSketch.from_buckets(group[:, 1], group[:, 2])
+            for municipality_id, group in zip(municipality_ids.tolist(), np.split(rows, starts[1:]))
+        }
+
+    @staticmethod
+    def _sketch_fields(sketch):
+        if sketch is None:
+            return {'sketch_offset': 0, 'sketch_counts': []}
+
+        return {'sketch_offset': sketch.offset, 'sketch_counts': sketch.counts.tolist()}
+
+    def _build_region_aggregates(self, sketches):
+        populated_filter = Q(municipalities__settlements__population__gt=0)
+
+        rows = Region.objects.annotate(
+            population_total=Sum('municipalities__settlements__population'),
+            municipalities_total=Count('municipalities', distinct=True),
+            settlements_total=Count('municipalities__settlements'),
+            populated_total=Count('municipalities__settlements', filter=populated_filter),
+            population_min=Min('municipalities__settlements__population', filter=populated_filter),
+            population_max=Max('municipalities__settlements__population', filter=populated_filter),
+        ).values_list(
+            'id', 'population_total', 'municipalities_total', 'settlements_total', 'populated_total',
+            'population_min', 'population_max'
+        )
+
+        # Скетч региона — слияние скетчей его муниципалитетов
+        region_sketches = defaultdict(list)
+        for municipality_id, region_id in Municipality.objects.values_list('id', 'region_id'):
+            if municipality_id in sketches:
+                region_sketches[region_id].append(sketches[municipality_id])
+
+        return [
+            RegionAggregate(
+                region_id=region_id,
+                population=population or 0,
+                municipalities=municipalities,
+                settlements=settlements,
+                empty_settlements=settlements - populated,
+                populated_settlements=populated,
+                population_min=population_min,
+                population_max=population_max,
+                **self._sketch_fields(
+                    QuantileSketch.merge(region_sketches[region_id]) if region_id in region_sketches else None
+                ),
+            )
+            for region_id, population, municipalities, settlements, populated, population_min, population_max
+            in rows
+        ]
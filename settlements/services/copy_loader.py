@@ -0,0 +1,95 @@
+import csv
+import io
+
+from django.db import connections
+
+from settlements.models import Settlement
+
+
+class CopySettlementLoader:
+    """
+    Быстрая загрузка поселений в PostgreSQL через COPY FROM STDIN.
+
+    Строки передаются кортежами (name, type, population, municipality_id).
+    В режиме staging данные сначала копируются во временную таблицу
+    (временные таблицы PostgreSQL не пишутся в WAL), а затем переносятся
+    в основную одним INSERT ... SELECT в finish(); повторы по естественному
+    ключу при этом пропускаются, как ignore_conflicts в bulk_create.
+    Прямой COPY в основную таблицу на повторе прерывается с IntegrityError.
+    """
+    columns = ('name', 'type', 'population', 'municipality_id')
+    staging_table = 'settlements_settlement_staging'
+
+    def __init__(self, using='default', staging=False):
+        self.connection = connections[using]
+        self.staging = staging
+        self.table = Settlement._meta.db_table
+        self.loaded = 0
+
+    @property
+    def target_table(self):
+        return self.staging_table if self.staging else self.table
+
+    def begin(self):
+        """Подготовить промежуточную таблицу (в режиме staging)"""
+        if not self.staging:
+            return
+
+        columns = ', '.join(f'"{column}"' for column in self.columns)
+
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TEMPORARY TABLE "{self.staging_table}" ON COMMIT DROP AS '
+                f'SELECT {columns} FROM "{self.table}" WITH NO DATA'
+            )
+
+    def load(self, rows):
+        """Скопировать порцию строк в целевую таблицу"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        count = 0
+        for name, settlement_type, population, municipality_id in rows:
+            writer.writerow((
+                name,
+                settlement_type,
+                '' if population is None else population,
+                municipality_id,
+            ))
+            count += 1
+
+        if not count:
+            return 0
+
+        buffer.seek(0)
+        columns = ', '.join(f'"{column}"' for column in self.columns)
+
+        sql = f'COPY "{self.target_table}" ({columns}) FROM STDIN WITH (FORMAT csv)'
+
+        with self.connection.cursor() as cursor:
+            if hasattr(cursor.cursor, 'copy_expert'):
+                cursor.copy_expert(sql, buffer)
+            else:
+                # psycopg 3 (например, с пулом соединений): COPY через cursor.copy()
+                with cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+
+        self.loaded += count
+        return count
+
+    def finish(self):
+        """Перенести данные из промежуточной таблицы в основную"""
+        if not self.staging:
+            return self.loaded
+
+        columns = ', '.join(f'"{column}"' for column in self.columns)
+
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO "{self.table}" ({columns}) '
+                f'SELECT {columns} FROM "{self.staging_table}" '
+                f'ON CONFLICT DO NOTHING'
+            )
+            cursor.execute(f'DROP TABLE "{self.staging_table}"')
+
+        return self.loaded
@@ -1,4 +1,9 @@
-from settlements.models import Settlement, Region, Municipality
+from django.db.models import Count, Q, Subquery, Sum, Value
+
+from settlements.models import (
+    Settlement, Region, Municipality, RegionAggregate, MunicipalityAggregate
+)
+from .quantile_sketch import QuantileSketch
 
 
 class DataFetcher:
@@ -16,18 +21,24 @@ class DataFetcher:
             'municipality__name', 'population'
         )
 
+    def fetch_settlements_by_regions(self, region_names):
+        """Получить поселения нескольких регионов (region, municipality, type, population) одной выборкой"""
+        return Settlement.objects.filter(
+            municipality__region__name__in=list(region_names)
+        ).values_list('municipality__region__name', 'municipality__name', 'type', 'population')
+
     def fetch_settlements_by_municipality(self, region_name, municipality_name):
         """Получить все поселения конкретного муниципалитета"""
-        return list(Settlement.objects.filter(
+        return Settlement.objects.filter(
             municipality__name=municipality_name,
             municipality__region__name=region_name
-        ).values_list('population'))
+        ).values_list('population')
 
-    def fetch_settlement_details(self, region_name, municipality_name, search_query=None, settlement_type=None):
+    def fetch_settlement_details(self, region_name=None, municipality_name=None, search_query=None,
+                                 settlement_type=None):
         """Получить подробные сведения о поселениях с фильтрацией"""
         settlements = Settlement.objects.filter(
-            municipality__name=municipality_name,
-            municipality__region__name=region_name
+            self._location_filter(region_name, municipality_name)
         ).select_related('municipality')
 
         if settlement_type:
@@ -38,6 +49,60 @@ class DataFetcher:
 
         return settlements.order_by('-population')
 
+    def fetch_settlement_export(self, region_name=None, municipality_name=None, search_query=None,
+                                settlement_type=None):
+        """
+        Строки выгрузки (region, municipality, name, type, population) с теми же
+        фильтрами, что и fetch_settlement_details. Порядок по id не требует
+        сортировки всей выборки, поэтому первые строки отдаются сразу.
+        """
+        return self.fetch_settlement_details(
+            region_name, municipality_name, search_query, settlement_type
+        ).order_by('id').values_list(
+            'municipality__region__name', 'municipality__name', 'name', 'type', 'population'
+        )
+
+    def fetch_settlement_page(self, region_name, municipality_name, search_query=None,
+                              settlement_type=None, after=None, limit=20, before=None):
+        """
+        Получить страницу поселений по курсору (population, id).
+        Возвращает до limit + 1 строк: лишняя строка означает, что есть следующая страница.
+        С курсором before — строки перед ним в том же порядке, лишняя строка
+        (первая) означает, что есть и предыдущая страница.
+        """
+        settlements = self.fetch_settlement_details(
+            region_name, municipality_name, search_query, settlement_type
+        ).order_by('-population', '-id')
+
+        if before is not None:
+            population, pk = before
+
+            # Обратный порядок (population, id) по возрастанию — в PostgreSQL NULL идут последними
+            if population is None:
+                preceding = Q(population__isnull=True, id__gt=pk)
+            else:
+                preceding = Q(population__isnull=True) | Q(population__gt=population) | Q(
+                    population=population, id__gt=pk
+                )
+
+            rows = settlements.filter(preceding).reverse().values('id', 'name', 'type', 'population')
+            return list(rows[:limit + 1])[::-1]
+
+        if after is not None:
+            population, pk = after
+
+            # В PostgreSQL NULL при сортировке по убыванию идут первыми
+            if population is None:
+                settlements = settlements.filter(
+                    Q(population__isnull=True, id__lt=pk) | Q(population__isnull=False)
+                )
+            else:
+                settlements = settlements.filter(
+                    Q(population__lt=population) | Q(population=population, id__lt=pk)
+                )
+
+        return list(settlements.values('id', 'name', 'type', 'population')[:limit + 1])
+
     def fetch_settlement_types(self, region_name, municipality_name):
         """Получить все типы поселений в муниципалитете"""
         return Settlement.objects.filter(
@@ -45,21 +110,167 @@ class DataFetcher:
             municipality__region__name=region_name
         ).values_list('type', flat=True).distinct().order_by('type')
 
+    def fetch_settlement_types_with_population(self, region_name=None, municipality_name=None):
+        """Получить типы и население поселений (в пределах региона/муниципалитета)"""
+        return Settlement.objects.filter(
+            self._location_filter(region_name, municipality_name)
+        ).values_list('type', 'population')
+
+    def fetch_populated_settlements(self, region_name=None, municipality_name=None):
+        """Получить население заселённых поселений (в пределах региона/муниципалитета)"""
+        return Settlement.objects.filter(
+            self._location_filter(region_name, municipality_name),
+            population__gt=0
+        ).values('population')
+
     def fetch_settlement_statistics(self, region_name=None, municipality_name=None):
-        """Получить статистику по поселениям"""
-        settlements = Settlement.objects.all()
+        """Получить статистику по поселениям (один запрос)"""
+        counts = self.fetch_scalars(
+            Settlement.objects.filter(self._location_filter(region_name, municipality_name)),
+            total=Count('id'),
+            populated=Count('id', filter=Q(population__gt=0)),
+        )
+
+        return {
+            'total': counts['total'],
+            'populated': counts['populated'],
+            'empty': counts['total'] - counts['populated']
+        }
+
+    def fetch_location_counts(self, region_name=None):
+        """
+        Получить число регионов, муниципалитетов и поселений (всего, заселённых,
+        пустых) без таблиц агрегатов — одним запросом.
+        """
+        regions = Region.objects.all()
+        municipalities = Municipality.objects.all()
+
+        if region_name:
+            regions = regions.filter(name=region_name)
+            municipalities = municipalities.filter(region__name=region_name)
+
+        counts = self.fetch_scalars(
+            Settlement.objects.filter(self._location_filter(region_name)),
+            subqueries={
+                'regions': (regions, Count('id')),
+                'municipalities': (municipalities, Count('id')),
+            },
+            total=Count('id'),
+            populated=Count('id', filter=Q(population__gt=0)),
+        )
+        counts['empty'] = counts['total'] - counts['populated']
+
+        return counts
+
+    def fetch_region_aggregates(self):
+        """Получить предрасчитанные агрегаты регионов (name, population, municipalities, settlements)"""
+        return list(RegionAggregate.objects.filter(
+            settlements__gt=0
+        ).order_by('-population').values_list(
+            'region__name', 'population', 'municipalities', 'settlements'
+        ))
+
+    def fetch_municipality_aggregates(self, region_name):
+        """Получить предрасчитанные агрегаты муниципалитетов региона"""
+        return list(MunicipalityAggregate.objects.filter(
+            municipality__region__name=region_name,
+            settlements__gt=0
+        ).order_by('-population').values_list(
+            'municipality__name', 'settlements', 'population'
+        ))
+
+    def fetch_aggregated_statistics(self, region_name=None):
+        """
+        Получить сводные счётчики из таблиц агрегатов.
+        Возвращает None, если агрегаты ещё не построены.
+        """
+        aggregates = RegionAggregate.objects.all()
 
         if region_name:
-            settlements = settlements.filter(municipality__region__name=region_name)
+            aggregates = aggregates.filter(region__name=region_name)
+
+        totals = aggregates.aggregate(
+            regions=Count('id'),
+            municipalities=Sum('municipalities'),
+            total=Sum('settlements'),
+            populated=Sum('populated_settlements'),
+            empty=Sum('empty_settlements'),
+        )
 
+        if not totals['regions']:
+            return None
+
+        return totals
+
+    def fetch_population_sketch(self, region_name=None, municipality_name=None):
+        """
+        Скетч квантилей населения НП, объединённый из скетчей регионов
+        (или муниципалитетов, если задан муниципалитет).
+        Возвращает None, если агрегаты ещё не построены или построены
+        до появления скетчей (у населённых НП нет счётчиков скетча).
+        """
         if municipality_name:
-            settlements = settlements.filter(municipality__name=municipality_name)
+            aggregates = MunicipalityAggregate.objects.filter(municipality__name=municipality_name)
+            if region_name:
+                aggregates = aggregates.filter(municipality__region__name=region_name)
+        else:
+            aggregates = RegionAggregate.objects.all()
+            if region_name:
+                aggregates = aggregates.filter(region__name=region_name)
+
+        rows = aggregates.values_list(
+            'sketch_offset', 'sketch_counts', 'population', 'population_min', 'population_max',
+            'populated_settlements'
+        )
 
-        total = settlements.count()
-        populated = settlements.filter(population__gt=0).count()
+        sketches = []
+        for offset, counts, total, minimum, maximum, populated in rows:
+            if populated and not counts:
+                return None
 
-        return {
-            'total': total,
-            'populated': populated,
-            'empty': total - populated
-        }
\ No newline at end of file
+            sketches.append(QuantileSketch(offset, counts, total, minimum, maximum))
+
+        if not sketches:
+            return None
+
+        return QuantileSketch.merge(sketches)
+
+    @classmethod
+    def fetch_scalars(cls, queryset, subqueries=None, **aggregates):
+        """
+        Посчитать скалярные счётчики и суммы одним SQL-запросом.
+
+        aggregates — агрегаты по строкам queryset, в том числе условные
+        (Count('id', filter=Q(...))), subqueries — {имя: (queryset, агрегат)}
+        по другим таблицам, они попадают в тот же SELECT скалярными подзапросами.
+        Возвращает {имя: значение}; агрегаты пустых выборок равны 0.
+        """
+        row = cls._scalar_row(queryset, **aggregates)
+
+        for name, (subquery, aggregate) in (subqueries or {}).items():
+            row = row.annotate(**{name: Subquery(cls._scalar_row(subquery, value=aggregate))})
+
+        values = next(iter(row), {})
+
+        names = [*aggregates, *(subqueries or {})]
+        return {name: values.get(name) or 0 for name in names}
+
+    @staticmethod
+    def _scalar_row(queryset, **aggregates):
+        """Агрегаты queryset одной строкой: группировка по константе убирает GROUP BY"""
+        return queryset.order_by().annotate(
+            _batch=Value(1)
+        ).values('_batch').annotate(**aggregates).values(*aggregates)
+
+    @staticmethod
+    def _location_filter(region_name=None, municipality_name=None):
+        """Условие отбора поселений по региону и муниципалитету"""
+        q_filter = Q()
+
+        if region_name:
+            q_filter &= Q(municipality__region__name=region_name)
+
+        if municipality_name:
+            q_filter &= Q(municipality__name=municipality_name)
+
+        return q_filter
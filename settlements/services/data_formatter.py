@@ -1,9 +1,20 @@
-import json
-
+import numpy as np
 import pandas as pd
+from django.conf import settings
+
+from .json_backends import get_json_backend
+
+# Строки групп разрядов для format_numbers: '7' и ' 007'
+_HEAD_GROUPS = np.array([str(group) for group in range(1000)])
+_TAIL_GROUPS = np.array([f' {group:03d}' for group in range(1000)])
 
 
 class DataFormatter:
+    def __init__(self, json_backend=None):
+        self.json_dumps = get_json_backend(
+            json_backend or getattr(settings, 'SETTLEMENTS_JSON_BACKEND', 'auto')
+        )
+
     @staticmethod
     def format_number(num):
         """Форматировать число с разделителями (1 000 000)"""
@@ -12,17 +23,61 @@ class DataFormatter:
 
         return f"{int(num):,}".replace(',', ' ')
 
+    @staticmethod
+    def format_numbers(values):
+        """
+        Векторный аналог format_number для колонки значений.
+        Число разбивается на группы по три разряда, строки групп берутся из таблиц.
+        """
+        numbers = pd.to_numeric(pd.Series(values), errors='coerce').fillna(0)
+        if not pd.api.types.is_integer_dtype(numbers.dtype):
+            numbers = numbers.astype(np.float64)
+        numbers = numbers.to_numpy().astype(np.int64)
+
+        magnitude = np.abs(numbers)
+        groups = [magnitude % 1000]
+        rest = magnitude // 1000
+        while rest.any():
+            groups.append(rest % 1000)
+            rest //= 1000
+
+        sizes = np.ones(len(magnitude), dtype=np.int64)
+        for power in range(1, len(groups)):
+            sizes += magnitude >= 1000 ** power
+
+        # Старшая группа без ведущих нулей, остальные — ' ddd'
+        text = _HEAD_GROUPS[groups[-1]]
+        for index in range(len(groups) - 2, -1, -1):
+            text = np.where(
+                sizes == index + 1,
+                _HEAD_GROUPS[groups[index]],
+                np.where(sizes > index + 1, np.char.add(text, _TAIL_GROUPS[groups[index]]), text)
+            )
+
+        return np.where(numbers < 0, np.char.add('-', text), text).tolist()
+
     def format_dataframe_column(self, dataframe, column='population'):
         """Форматировать колонку DataFrame"""
-        dataframe[column] = dataframe[column].apply(
-            lambda x: self.format_number(x) if pd.notna(x) else '0'
-        )
+        dataframe[column] = self.format_numbers(dataframe[column])
         return dataframe
 
     def dataframe_to_dict_records(self, dataframe):
         """Преобразовать DataFrame в список словарей"""
         return dataframe.to_dict('records')
 
+    def dataframe_to_columns(self, dataframe, columns=None):
+        """
+        DataFrame по колонкам ({колонка: значения}) для графиков.
+        Числовые колонки остаются массивами NumPy и сериализуются в JSON без списков.
+        """
+        columns = columns or list(dataframe.columns)
+
+        return {
+            column: dataframe[column].to_numpy() if pd.api.types.is_numeric_dtype(dataframe[column])
+            else dataframe[column].tolist()
+            for column in columns
+        }
+
     def statistics_to_formatted_dict(self, stats):
         """Форматировать словарь со статистикой"""
         if not isinstance(stats, dict):
@@ -34,6 +89,32 @@ class DataFormatter:
 
         return formatted
 
+    def histogram_to_records(self, edges, counts):
+        """
+        Интервалы гистограммы в виде [{'from', 'to', 'count'}] без пустых краёв.
+        counts нумеруются как width_bucket: у последнего интервала нет верхней границы.
+        """
+        bounds = [None, *edges, None]
+        records = [
+            {'from': bounds[bucket], 'to': bounds[bucket + 1], 'count': count}
+            for bucket, count in enumerate(counts)
+        ]
+
+        filled = [index for index, record in enumerate(records) if record['count']]
+        if not filled:
+            return []
+
+        return records[filled[0]:filled[-1] + 1]
+
+    def histogram_to_columns(self, edges, counts):
+        """Интервалы histogram_to_records по колонкам: {'from': [...], 'to': [...], 'count': [...]}"""
+        records = self.histogram_to_records(edges, counts)
+
+        return {
+            key: [record[key] for record in records]
+            for key in ('from', 'to', 'count')
+        }
+
     def dict_to_json(self, data):
-        """Преобразовать словарь в JSON для передачи на фронтенд"""
-        return json.dumps(data)
\ No newline at end of file
+        """Преобразовать словарь в JSON для передачи на фронтенд (SETTLEMENTS_JSON_BACKEND)"""
+        return self.json_dumps(data)
@@ -1,5 +1,8 @@
+import numpy as np
 import pandas as pd
 
+from .quantile_sketch import percentile_keys
+
 
 class DataProcessor:
     def aggregate_by_region(self, settlements_data):
@@ -37,10 +40,23 @@ class DataProcessor:
 
         return grouped.sort_values('population_total', ascending=False)
 
-    def calculate_statistics(self, data):
+    def calculate_statistics(self, data, approximate=False, percentiles=()):
+        """
+        Статистика по населению (mean, median, max, min, total и перцентили: 90 -> 'p90').
+        approximate=True — data является QuantileSketch: медиана и перцентили
+        оцениваются по скетчу с относительной погрешностью не больше 1%.
+        """
+        if approximate:
+            return data.statistics(percentiles)
+
+        if not isinstance(data, (list, pd.Series)):
+            data = list(data)
+
         if isinstance(data, list) and len(data) > 0:
             if isinstance(data[0], tuple):
                 data = [item[0] if item[0] is not None else 0 for item in data]
+            elif isinstance(data[0], dict):
+                data = [item['population'] for item in data]
 
         if not isinstance(data, pd.Series):
             data = pd.Series(data)
@@ -54,7 +70,8 @@ class DataProcessor:
                 'median': 0,
                 'max': 0,
                 'min': 0,
-                'total': 0
+                'total': 0,
+                **{key: 0 for key in percentile_keys(percentiles)}
             }
 
         return {
@@ -62,9 +79,21 @@ class DataProcessor:
             'median': int(data.median()),
             'max': int(data.max()),
             'min': int(data.min()),
-            'total': int(data.sum())
+            'total': int(data.sum()),
+            **{
+                key: int(data.quantile(percentile / 100))
+                for key, percentile in zip(percentile_keys(percentiles), percentiles)
+            }
         }
 
+    def calculate_group_statistics(self, settlements_data, columns, group_by):
+        """Статистика по суммарному населению групп"""
+        df = pd.DataFrame(settlements_data, columns=columns)
+
+        totals = df.groupby(group_by)['population'].sum()
+
+        return self.calculate_statistics(totals)
+
     def get_distribution_by_type(self, settlements_data):
         """Получить распределение поселений по типам"""
         df = pd.DataFrame(
@@ -75,4 +104,94 @@ class DataProcessor:
         stats = df.groupby('type')['population'].agg(['sum', 'count']).reset_index()
         stats.columns = ['type', 'population', 'count']
 
-        return stats.sort_values('population', ascending=False)
\ No newline at end of file
+        return stats.sort_values('population', ascending=False)
+
+    def compare_regions(self, settlements_data, region_names, percentiles=(), top_municipalities=5):
+        """
+        Сравнить регионы за один проход по их поселениям (region, municipality, type, population).
+        Возвращает {регион: {'general_stats', 'population_stats', 'settlement_types',
+        'top_municipalities'}} для каждого из region_names.
+        """
+        df = pd.DataFrame(settlements_data, columns=['region', 'municipality', 'type', 'population'])
+        df['population'] = pd.to_numeric(df['population'])
+
+        populated = df['population'] > 0
+        regions = df.groupby('region')
+
+        general = pd.DataFrame({
+            'municipalities': regions['municipality'].nunique(),
+            'settlements': regions.size(),
+            'populated_settlements': populated.groupby(df['region']).sum(),
+        })
+
+        population = df[populated].groupby('region')['population']
+        stats = population.agg(['mean', 'median', 'max', 'min', 'sum']).rename(columns={'sum': 'total'})
+        for key, percentile in zip(percentile_keys(percentiles), percentiles):
+            stats[key] = population.quantile(percentile / 100)
+
+        types = df.groupby(['region', 'type'])['population'].agg(['sum', 'count']).reset_index()
+        types.columns = ['region', 'type', 'population', 'count']
+
+        municipalities = df.groupby(['region', 'municipality'])['population'].agg(['count', 'sum']).reset_index()
+        municipalities.columns = ['region', 'municipality', 'settlements_count', 'population_total']
+
+        return self._comparison_by_region(
+            region_names, general, stats, types, municipalities, percentiles, top_municipalities
+        )
+
+    def _comparison_by_region(self, region_names, general, stats, types, municipalities,
+                              percentiles, top_municipalities):
+        """
+        Разложить сгруппированные по регионам таблицы на результаты регионов.
+        general и stats индексированы регионом, types и municipalities содержат колонку region.
+        """
+        empty_stats = self.calculate_statistics([], percentiles=percentiles)
+        types['population'] = types['population'].fillna(0).astype('int64')
+        municipalities['population_total'] = municipalities['population_total'].fillna(0).astype('int64')
+
+        comparison = {}
+        for region_name in region_names:
+            counts = general.loc[region_name] if region_name in general.index else None
+            settlements = int(counts['settlements']) if counts is not None else 0
+            populated = int(counts['populated_settlements']) if counts is not None else 0
+
+            region_types = types[types['region'] == region_name].drop(columns='region')
+            region_municipalities = municipalities[municipalities['region'] == region_name].drop(columns='region')
+
+            comparison[region_name] = {
+                'general_stats': {
+                    'municipalities': int(counts['municipalities']) if counts is not None else 0,
+                    'settlements': settlements,
+                    'empty_settlements': settlements - populated,
+                    'populated_settlements': populated,
+                },
+                'population_stats': {
+                    key: int(value) for key, value in stats.loc[region_name].items()
+                } if region_name in stats.index else dict(empty_stats),
+                'settlement_types': region_types.sort_values(
+                    ['population', 'type'], ascending=[False, True]
+                ),
+                'top_municipalities': region_municipalities.sort_values(
+                    ['population_total', 'municipality'], ascending=[False, True]
+                ).head(top_municipalities),
+            }
+
+        return comparison
+
+    @staticmethod
+    def histogram_edges(bins_per_decade=4, decades=8):
+        """Целые границы логарифмической шкалы населения: 1, ..., 10 ** decades"""
+        edges = np.round(np.logspace(0, decades, decades * bins_per_decade + 1))
+
+        return [int(edge) for edge in np.unique(edges)]
+
+    def calculate_histogram(self, data, edges):
+        """
+        Число поселений в интервалах [edges[i - 1], edges[i]).
+        Нумерация как у width_bucket в PostgreSQL: 0 — меньше edges[0],
+        len(edges) — не меньше последней границы.
+        """
+        values = pd.DataFrame(list(data), columns=['population'])['population'].dropna()
+        buckets = np.searchsorted(edges, values.to_numpy(), side='right')
+
+        return np.bincount(buckets, minlength=len(edges) + 1).tolist()
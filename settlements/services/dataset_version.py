@@ -0,0 +1,33 @@
+from django.db.models import F
+from django.utils import timezone
+
+from settlements.models import DatasetVersion
+
+DATASET_VERSION_PK = 1
+
+
+def get_dataset_version():
+    """
+    Получить текущую версию набора данных.
+    Возвращает None, если импорт ещё ни разу не выполнялся.
+    """
+    return DatasetVersion.objects.filter(pk=DATASET_VERSION_PK).first()
+
+
+def bump_dataset_version():
+    """
+    Увеличить версию набора данных.
+    Вызывается внутри транзакции импорта, поэтому новая версия
+    становится видна одновременно с новыми данными.
+    """
+    now = timezone.now()
+
+    updated = DatasetVersion.objects.filter(pk=DATASET_VERSION_PK).update(
+        version=F('version') + 1,
+        updated_at=now
+    )
+
+    if not updated:
+        DatasetVersion.objects.create(pk=DATASET_VERSION_PK, version=1, updated_at=now)
+
+    return get_dataset_version()
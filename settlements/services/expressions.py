@@ -0,0 +1,36 @@
+from django.contrib.postgres.fields import ArrayField
+from django.db.models import Aggregate, FloatField, Func, IntegerField, Value
+
+
+class PercentileCont(Aggregate):
+    """Непрерывный перцентиль PostgreSQL: percentile_cont(p) WITHIN GROUP (ORDER BY ...)"""
+    function = 'PERCENTILE_CONT'
+    name = 'PercentileCont'
+    template = '%(function)s(%(percentile)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+    output_field = FloatField()
+
+    def __init__(self, expression, percentile, **extra):
+        percentile = float(percentile)
+        if not 0 <= percentile <= 1:
+            raise ValueError("Перцентиль должен быть в диапазоне [0, 1]")
+
+        super().__init__(expression, percentile=percentile, **extra)
+
+
+class WidthBucket(Func):
+    """Номер интервала по отсортированному массиву границ: width_bucket(value, thresholds)"""
+    function = 'WIDTH_BUCKET'
+    output_field = IntegerField()
+
+    def __init__(self, expression, thresholds, **extra):
+        thresholds = Value(list(thresholds), output_field=ArrayField(IntegerField()))
+        super().__init__(expression, thresholds, **extra)
+
+
+class SketchBucket(Func):
+    """Номер интервала QuantileSketch для положительного значения: CEIL(LN(value) / LN(γ))"""
+    template = 'CEIL(LN(%(expressions)s) / %(log_gamma)s)::integer'
+    output_field = IntegerField()
+
+    def __init__(self, expression, log_gamma, **extra):
+        super().__init__(expression, log_gamma=float(log_gamma), **extra)
@@ -0,0 +1,52 @@
+import json
+
+import numpy as np
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+    import orjson
+except ImportError:  # orjson — необязательная зависимость
+    orjson = None
+
+
+def _to_builtin(value):
+    """Массивы и скаляры NumPy для json.dumps"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def json_dumps(data):
+    return json.dumps(data, ensure_ascii=False, default=_to_builtin)
+
+
+def orjson_dumps(data):
+    # Числовые массивы NumPy сериализуются напрямую, без промежуточных списков
+    return orjson.dumps(
+        data, default=_to_builtin, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    ).decode('utf-8')
+
+
+JSON_BACKENDS = {
+    'json': json_dumps,
+    'orjson': orjson_dumps,
+}
+
+
+def get_json_backend(name='auto'):
+    """Функция сериализации в JSON: 'json', 'orjson' или 'auto' (orjson, если установлен)"""
+    if name == 'auto':
+        name = 'orjson' if orjson is not None else 'json'
+
+    if name not in JSON_BACKENDS:
+        raise ImproperlyConfigured(
+            f"Неизвестный JSON-бэкенд '{name}', доступны: auto, {', '.join(JSON_BACKENDS)}"
+        )
+
+    if name == 'orjson' and orjson is None:
+        raise ImproperlyConfigured("JSON-бэкенд 'orjson' требует установленного пакета orjson")
+
+    return JSON_BACKENDS[name]
@@ -0,0 +1,229 @@
+import re
+import threading
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from .snapshot import NULL_POPULATION, get_snapshot
+
+# Минимальное сходство по триграммам для нечёткого совпадения (как pg_trgm.similarity_threshold)
+SIMILARITY_THRESHOLD = 0.3
+
+_SEPARATORS = re.compile(r'(?:[^\w\n]|_)+')
+_SPACE = ord(' ')
+_NEWLINE = ord('\n')
+# Конец диапазона строк с заданным префиксом для bisect
+_MAX_CHAR = '\U0010ffff'
+
+
+def normalize_name(name):
+    """Название для поиска: без учёта регистра, ё = е, знаки препинания — пробелы"""
+    return normalize_names([name])[0]
+
+
+def normalize_names(names):
+    """normalize_name для списка названий одним проходом по склеенной строке"""
+    text = '\n'.join(name.replace('\n', ' ') for name in names)
+    text = _SEPARATORS.sub(' ', text.casefold().replace('ё', 'е'))
+    return [name.strip() for name in text.split('\n')]
+
+
+def _trigrams(normalized):
+    """
+    Коды триграмм нормализованных названий и номера названий, которым они принадлежат.
+    Как в pg_trgm, каждое слово дополняется двумя пробелами слева и одним справа;
+    код триграммы — три кодовые точки по 21 биту в одном int64.
+    """
+    text = '  ' + ' \n  '.join(name.replace(' ', '   ') for name in normalized) + ' '
+    chars = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+    rows = np.cumsum(chars == _NEWLINE)
+
+    first, second, third = chars[:-2], chars[1:-1], chars[2:]
+    # Окна, заканчивающиеся двумя пробелами или с переводом строки,
+    # пересекают границу слова или названия
+    keep = ~((second == _SPACE) & (third == _SPACE))
+    keep &= (first != _NEWLINE) & (second != _NEWLINE) & (third != _NEWLINE)
+
+    codes = (first << 42) | (second << 21) | third
+    return codes[keep], rows[:-2][keep]
+
+
+class SettlementSearchIndex:
+    """
+    Индекс поиска поселений по названию среди всех поселений снимка.
+
+    Триграммный инвертированный индекс (списки строк снимка для каждой триграммы)
+    даёт нечёткие совпадения с опечатками, отсортированные списки названий
+    и слов названий — совпадения по префиксу. Названия нормализуются
+    (normalize_name), поэтому регистр и ё/е не различаются.
+    Строится по колоночному снимку и живёт столько же, сколько он.
+    """
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        normalized = normalize_names(snapshot.names[:].tolist())
+        codes, rows = _trigrams(normalized)
+
+        # Уникальные пары (триграмма, строка), сгруппированные по триграммам
+        order = np.lexsort((rows, codes))
+        codes, rows = codes[order], rows[order]
+        unique = np.ones(len(codes), dtype=bool)
+        unique[1:] = (codes[1:] != codes[:-1]) | (rows[1:] != rows[:-1])
+        codes, rows = codes[unique], rows[unique]
+
+        self.trigrams, starts = np.unique(codes, return_index=True)
+        self.posting_starts = np.append(starts, len(codes))
+        self.postings = rows
+        self.name_trigrams = np.bincount(rows, minlength=len(normalized))
+
+        # Для триграмм, которые есть в большинстве названий, хранится дополнение:
+        # строки без триграммы. Счёт общих триграмм по ним обходится дешевле
+        lengths = np.diff(self.posting_starts)
+        self.complements = {
+            position: np.setdiff1d(np.arange(len(normalized)), self._posting(position), assume_unique=True)
+            for position in np.flatnonzero(lengths > len(normalized) // 2).tolist()
+        }
+
+        names = np.array(normalized, dtype=str)
+        name_order = np.argsort(names, kind='stable')
+        self.names = names[name_order].tolist()
+        self.name_rows = name_order
+
+        # Отдельные слова названий из нескольких слов
+        word_counts = np.array([name.count(' ') + 1 if name else 0 for name in normalized])
+        words = np.array(' '.join(normalized).split(), dtype=str)
+        word_rows = np.repeat(np.arange(len(normalized)), word_counts)
+
+        multiword = np.repeat(word_counts > 1, word_counts)
+        words, word_rows = words[multiword], word_rows[multiword]
+
+        word_order = np.argsort(words, kind='stable')
+        self.words = words[word_order].tolist()
+        self.word_rows = word_rows[word_order]
+
+    def __len__(self):
+        return len(self.name_trigrams)
+
+    @staticmethod
+    def _prefix_range(keys, prefix):
+        return bisect_left(keys, prefix), bisect_left(keys, prefix + _MAX_CHAR)
+
+    def _posting(self, position):
+        return self.postings[self.posting_starts[position]:self.posting_starts[position + 1]]
+
+    def similarity(self, normalized):
+        """Сходство запроса с каждым названием: доля общих триграмм, как в pg_trgm"""
+        codes = np.unique(_trigrams([normalized])[0])
+
+        positions = np.searchsorted(self.trigrams, codes)
+        found = positions < len(self.trigrams)
+        found[found] = self.trigrams[positions[found]] == codes[found]
+        positions = positions[found].tolist()
+
+        frequent = [position for position in positions if position in self.complements]
+        postings = [self._posting(position) for position in positions if position not in self.complements]
+
+        shared = np.full(len(self), len(frequent))
+        if postings:
+            shared += np.bincount(np.concatenate(postings), minlength=len(self))
+        if frequent:
+            shared -= np.bincount(
+                np.concatenate([self.complements[position] for position in frequent]), minlength=len(self)
+            )
+
+        return shared / (len(codes) + self.name_trigrams - shared)
+
+    def prefix_matches(self, normalized):
+        """Строки с названием, равным запросу, начинающимся с него и со словом, начинающимся с него"""
+        start, end = self._prefix_range(self.names, normalized)
+        exact_end = bisect_right(self.names, normalized, start, end)
+
+        word_start, word_end = self._prefix_range(self.words, normalized)
+
+        return (
+            self.name_rows[start:exact_end],
+            self.name_rows[exact_end:end],
+            np.unique(self.word_rows[word_start:word_end]),
+        )
+
+    def _best(self, rows, score, limit):
+        """Не больше limit строк с наибольшей оценкой, при равенстве — крупнее по населению"""
+        if len(rows) > limit:
+            threshold = np.partition(score, -limit)[-limit]
+            rows, score = rows[score >= threshold], score[score >= threshold]
+
+        population = self.snapshot.population[rows]
+        return rows[np.lexsort((-population, -score))][:limit]
+
+    def search(self, query, limit=20):
+        """
+        Лучшие совпадения с запросом: точные, по началу названия, по началу слова
+        (внутри группы — крупнее по населению), затем по сходству триграмм.
+        Сходство считается, только если совпадений по префиксу меньше limit.
+        """
+        normalized = normalize_name(query)
+        if not normalized or limit <= 0:
+            return []
+
+        taken = np.zeros(len(self), dtype=bool)
+        found = []
+
+        for rows in self.prefix_matches(normalized):
+            rows = rows[~taken[rows]]
+            taken[rows] = True
+
+            found.append(self._best(rows, self.snapshot.population[rows], limit))
+            limit -= len(found[-1])
+            if not limit:
+                break
+        else:
+            similarity = self.similarity(normalized)
+            rows = np.flatnonzero((similarity >= SIMILARITY_THRESHOLD) & ~taken)
+            found.append(self._best(rows, similarity[rows], limit))
+
+        return self.rows(np.concatenate(found))
+
+    def rows(self, rows):
+        """Поселения по строкам снимка: id, название, тип, население, регион и муниципалитет"""
+        snapshot = self.snapshot
+        municipality_codes = snapshot.municipality_codes[rows]
+        region_codes = snapshot.municipality_regions[municipality_codes]
+
+        return [
+            {
+                'id': pk,
+                'name': snapshot.names[row],
+                'type': snapshot.type_names[type_code],
+                'population': None if population == NULL_POPULATION else population,
+                'region': snapshot.region_names[region],
+                'municipality': snapshot.municipality_names[municipality],
+            }
+            for row, pk, type_code, population, region, municipality in zip(
+                rows.tolist(),
+                snapshot.ids[rows].tolist(),
+                snapshot.type_codes[rows].tolist(),
+                snapshot.population[rows].tolist(),
+                region_codes.tolist(),
+                municipality_codes.tolist(),
+            )
+        ]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_search_index(snapshot=None):
+    """
+    Индекс поиска по снимку (по умолчанию — текущему); перестраивается вместе со снимком.
+    Снимок запоминается и до первого импорта, поэтому сравнения по identity достаточно.
+    """
+    global _index
+
+    snapshot = snapshot if snapshot is not None else get_snapshot()
+
+    with _index_lock:
+        if _index is None or _index.snapshot is not snapshot:
+            _index = SettlementSearchIndex(snapshot)
+
+        return _index
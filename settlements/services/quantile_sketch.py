@@ -0,0 +1,136 @@
+import math
+
+import numpy as np
+
+# Относительная погрешность оценок квантилей (α)
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LOG_GAMMA = math.log(GAMMA)
+
+
+def bucket_indexes(values):
+    """Номера интервалов скетча: значение x > 0 попадает в интервал i = ⌈log_γ x⌉, (γ^(i-1), γ^i]"""
+    return np.ceil(np.log(np.asarray(values, dtype=np.float64)) / LOG_GAMMA).astype(np.int64)
+
+
+class QuantileSketch:
+    """
+    Мергируемый скетч квантилей положительных значений (DDSketch).
+
+    Хранит число значений в логарифмических интервалах (γ^(i-1), γ^i],
+    γ = (1 + α) / (1 - α), а также точные сумму, минимум и максимум.
+    Оценка квантиля q — середина 2γ^i / (γ + 1) интервала, в котором лежит
+    значение ранга ⌊q(n - 1)⌋, её относительная погрешность не больше
+    α = RELATIVE_ACCURACY для любого q. Для чётного n медиана pandas — среднее
+    двух средних значений, оценка скетча отличается от нижнего из них не больше чем на α.
+
+    Слияние — сумма счётчиков по интервалам: результат не зависит от порядка
+    и совпадает со скетчем объединённых значений, погрешность не накапливается.
+    """
+
+    def __init__(self, offset=0, counts=(), total=0, minimum=None, maximum=None):
+        self.offset = int(offset)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.total = int(total)
+        self.minimum = minimum
+        self.maximum = maximum
+
+    @classmethod
+    def from_values(cls, values):
+        """Скетч значений (значения <= 0 и NaN отбрасываются)"""
+        values = np.asarray(values)
+        values = values[values > 0]
+
+        if not len(values):
+            return cls()
+
+        indexes = bucket_indexes(values)
+        offset = int(indexes.min())
+
+        return cls(
+            offset, np.bincount(indexes - offset),
+            total=int(values.sum()), minimum=int(values.min()), maximum=int(values.max()),
+        )
+
+    @classmethod
+    def from_buckets(cls, buckets, counts, total=0, minimum=None, maximum=None):
+        """Скетч из разреженных пар (номер интервала, число значений)"""
+        buckets = np.asarray(buckets, dtype=np.int64)
+        if not len(buckets):
+            return cls()
+
+        offset = int(buckets.min())
+        dense = np.zeros(int(buckets.max()) - offset + 1, dtype=np.int64)
+        np.add.at(dense, buckets - offset, counts)
+
+        return cls(offset, dense, total, minimum, maximum)
+
+    @classmethod
+    def merge(cls, sketches):
+        """Объединить скетчи в один"""
+        sketches = [sketch for sketch in sketches if sketch.count]
+        if not sketches:
+            return cls()
+
+        offset = min(sketch.offset for sketch in sketches)
+        end = max(sketch.offset + len(sketch.counts) for sketch in sketches)
+
+        counts = np.zeros(end - offset, dtype=np.int64)
+        for sketch in sketches:
+            start = sketch.offset - offset
+            counts[start:start + len(sketch.counts)] += sketch.counts
+
+        return cls(
+            offset, counts,
+            total=sum(sketch.total for sketch in sketches),
+            minimum=min((sketch.minimum for sketch in sketches if sketch.minimum is not None), default=None),
+            maximum=max((sketch.maximum for sketch in sketches if sketch.maximum is not None), default=None),
+        )
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def quantile(self, q):
+        """Оценка квантиля q ∈ [0, 1] с относительной погрешностью не больше α"""
+        if not 0 <= q <= 1:
+            raise ValueError("Квантиль должен быть в диапазоне [0, 1]")
+
+        count = self.count
+        if not count:
+            return 0
+
+        rank = math.floor(q * (count - 1))
+        if rank == 0:
+            return self.minimum
+        if rank == count - 1:
+            return self.maximum
+
+        index = int(np.searchsorted(np.cumsum(self.counts), rank, side='right'))
+        value = 2 * GAMMA ** (self.offset + index) / (GAMMA + 1)
+
+        # Крайние значения известны точно, оценка за их пределы не выходит
+        return min(max(value, self.minimum), self.maximum)
+
+    def statistics(self, percentiles=()):
+        """Статистика как у DataProcessor.calculate_statistics, медиана и перцентили — оценки"""
+        count = self.count
+        if not count:
+            return {key: 0 for key in ('mean', 'median', 'max', 'min', 'total', *percentile_keys(percentiles))}
+
+        return {
+            'mean': int(self.total / count),
+            'median': round(self.quantile(0.5)),
+            'max': int(self.maximum),
+            'min': int(self.minimum),
+            'total': self.total,
+            **{
+                key: round(self.quantile(percentile / 100))
+                for key, percentile in zip(percentile_keys(percentiles), percentiles)
+            },
+        }
+
+
+def percentile_keys(percentiles):
+    """Ключи перцентилей в статистике: 90 -> 'p90', 99.9 -> 'p99.9'"""
+    return [f'p{percentile:g}' for percentile in percentiles]
@@ -0,0 +1,152 @@
+import csv
+import io
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .data_fetcher import DataFetcher
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow — необязательная зависимость, нужна только для Parquet
+    pa = pq = None
+
+EXPORT_COLUMNS = ('region', 'municipality', 'name', 'type', 'population')
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+class _ByteSink:
+    """Файлоподобный приёмник для ParquetWriter: записанные байты забираются через drain()"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class SettlementExporter:
+    """
+    Потоковая выгрузка поселений в CSV или Parquet.
+
+    Строки читаются серверным курсором (iterator(chunk_size)) и сразу
+    отдаются частями байтов: CSV — по chunk_size строк, Parquet — группами
+    строк по row_group_size. В памяти держится не больше одной части,
+    поэтому потребление не зависит от размера выгрузки.
+    """
+
+    def __init__(self, file_format='csv', chunk_size=5000, row_group_size=50000):
+        if file_format not in EXPORT_FORMATS:
+            raise ValueError(
+                f"Неизвестный формат выгрузки '{file_format}', доступны: {', '.join(EXPORT_FORMATS)}"
+            )
+
+        if file_format == 'parquet' and pq is None:
+            raise ImproperlyConfigured("Выгрузка в Parquet требует установленного пакета pyarrow")
+
+        self.file_format = file_format
+        self.chunk_size = chunk_size
+        self.row_group_size = row_group_size
+        self.exported = 0
+
+    @property
+    def content_type(self):
+        return EXPORT_FORMATS[self.file_format]
+
+    def rows(self, region_name=None, municipality_name=None, search_query=None, settlement_type=None):
+        """Строки выгрузки из БД серверным курсором"""
+        return DataFetcher().fetch_settlement_export(
+            region_name, municipality_name, search_query, settlement_type
+        ).iterator(chunk_size=self.chunk_size)
+
+    def export(self, region_name=None, municipality_name=None, search_query=None, settlement_type=None):
+        """Выгрузка поселений с фильтрами fetch_settlement_details частями байтов"""
+        return self.stream(self.rows(region_name, municipality_name, search_query, settlement_type))
+
+    def stream(self, rows):
+        """Закодировать строки (region, municipality, name, type, population) частями байтов"""
+        if self.file_format == 'parquet':
+            return self._parquet_chunks(rows)
+
+        return self._csv_chunks(rows)
+
+    @staticmethod
+    def _batches(rows, size):
+        batch = []
+        for row in rows:
+            batch.append(row)
+
+            if len(batch) == size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
+    def _csv_chunks(self, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        writer.writerow(EXPORT_COLUMNS)
+
+        for batch in self._batches(rows, self.chunk_size):
+            writer.writerows(batch)
+            self.exported += len(batch)
+
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+
+        # Пустая выгрузка — только заголовок
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8')
+
+    def _parquet_chunks(self, rows):
+        schema = pa.schema([
+            ('region', pa.string()),
+            ('municipality', pa.string()),
+            ('name', pa.string()),
+            ('type', pa.string()),
+            ('population', pa.int64()),
+        ])
+
+        sink = _ByteSink()
+        writer = pq.ParquetWriter(sink, schema)
+
+        try:
+            for batch in self._batches(rows, self.row_group_size):
+                columns = list(zip(*batch))
+                writer.write_table(pa.Table.from_arrays(
+                    [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                    schema=schema
+                ))
+                self.exported += len(batch)
+
+                yield sink.drain()
+        finally:
+            writer.close()
+
+        yield sink.drain()
@@ -0,0 +1,84 @@
+from settlements.models import Settlement
+
+
+class SettlementSynchronizer:
+    """
+    Инкрементальная синхронизация поселений с очередной выгрузкой.
+
+    Поселение определяется естественным ключом (municipality_id, name, type).
+    Входящие строки сравниваются с состоянием БД, и записываются только
+    новые и изменившиеся (через bulk_create с update_conflicts), а в finish()
+    удаляются поселения, которых нет в выгрузке. Повтор ключа внутри выгрузки
+    считается отдельно (duplicates) и пропускается: как и при полном импорте,
+    остаётся первая строка.
+    """
+    unique_fields = ['municipality', 'name', 'type']
+
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+        self.populations = {}
+        self.pks = {}
+        self.seen = set()
+        self.counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0, 'duplicates': 0}
+
+    def load_existing(self):
+        """Загрузить ключи и население уже сохранённых поселений"""
+        rows = Settlement.objects.values_list(
+            'pk', 'municipality_id', 'name', 'type', 'population'
+        ).iterator(chunk_size=10000)
+
+        for pk, municipality_id, name, settlement_type, population in rows:
+            key = (municipality_id, name, settlement_type)
+            self.pks[key] = pk
+            self.populations[key] = population
+
+    def apply(self, rows):
+        """Применить порцию строк (name, type, population, municipality_id)"""
+        changed = {}
+
+        for name, settlement_type, population, municipality_id in rows:
+            key = (municipality_id, name, settlement_type)
+
+            if key in self.seen:
+                self.counts['duplicates'] += 1
+                continue
+
+            self.seen.add(key)
+
+            if key not in self.populations:
+                self.counts['inserted'] += 1
+            elif self.populations[key] != population:
+                self.counts['updated'] += 1
+            else:
+                self.counts['unchanged'] += 1
+                continue
+
+            self.populations[key] = population
+            changed[key] = population
+
+        if changed:
+            Settlement.objects.bulk_create(
+                [
+                    Settlement(
+                        municipality_id=municipality_id,
+                        name=name,
+                        type=settlement_type,
+                        population=population
+                    )
+                    for (municipality_id, name, settlement_type), population in changed.items()
+                ],
+                update_conflicts=True,
+                unique_fields=self.unique_fields,
+                update_fields=['population'],
+                batch_size=self.batch_size
+            )
+
+    def finish(self):
+        """Удалить поселения, отсутствующие в выгрузке"""
+        stale = [pk for key, pk in self.pks.items() if key not in self.seen]
+
+        for start in range(0, len(stale), self.batch_size):
+            Settlement.objects.filter(pk__in=stale[start:start + self.batch_size]).delete()
+
+        self.counts['deleted'] = len(stale)
+        return self.counts
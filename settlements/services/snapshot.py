@@ -0,0 +1,250 @@
+import os
+import threading
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Max
+
+from settlements.models import Region, Municipality, Settlement
+from .dataset_version import get_dataset_version
+from .snapshot_file import read_columns, read_header, write_snapshot
+
+# Население NULL хранится в массиве population как -1
+NULL_POPULATION = -1
+
+
+class SettlementSnapshot:
+    """
+    Колоночный снимок поселений в памяти процесса.
+
+    Регион, муниципалитет и тип закодированы целыми числами (словарное
+    кодирование), население, id и названия — выровненные по строкам массивы.
+    Строки упорядочены по муниципалитету, поэтому поселения муниципалитета
+    и региона — непрерывные срезы, а счётчики по группам считаются через bincount.
+    """
+
+    def __init__(self, region_names, municipality_names, municipality_regions, type_names,
+                 ids, names, type_codes, municipality_codes, population, version=None):
+        """Столбцы строк должны быть уже упорядочены по муниципалитетам (см. from_columns)"""
+        self.version = version
+
+        self.region_names = list(region_names)
+        self.municipality_names = list(municipality_names)
+        self.type_names = list(type_names)
+        self.municipality_regions = np.asarray(municipality_regions, dtype=np.int32)
+
+        # Массивы не копируются: они могут быть отображены из файла снимка
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.names = names
+        self.type_codes = np.asarray(type_codes, dtype=np.int32)
+        self.municipality_codes = np.asarray(municipality_codes, dtype=np.int32)
+        self.population = np.asarray(population, dtype=np.int64)
+
+        municipality_order = np.argsort(self.municipality_regions, kind='stable')
+
+        municipalities = len(self.municipality_names)
+        regions = len(self.region_names)
+
+        # Границы срезов: строки муниципалитета m — municipality_rows[m]
+        self.municipality_settlements = np.bincount(self.municipality_codes, minlength=municipalities)
+        starts = np.zeros(municipalities, dtype=np.int64)
+        ends = np.cumsum(self.municipality_settlements[municipality_order])
+        starts[municipality_order] = ends - self.municipality_settlements[municipality_order]
+        self.municipality_starts = starts
+
+        populated = self.population > 0
+        weights = np.where(self.population > 0, self.population, 0)
+        self.municipality_population = np.bincount(
+            self.municipality_codes, weights=weights, minlength=municipalities
+        ).astype(np.int64)
+        self.municipality_populated = np.bincount(
+            self.municipality_codes[populated], minlength=municipalities
+        )
+
+        region_counts = np.bincount(self.municipality_regions, minlength=regions)
+        region_ends = np.cumsum(region_counts)
+        self.region_municipalities = region_counts
+        self.region_municipality_order = municipality_order
+        self.region_municipality_starts = region_ends - region_counts
+
+        self.region_settlements = self._by_region(self.municipality_settlements)
+        self.region_population = self._by_region(self.municipality_population)
+        self.region_populated = self._by_region(self.municipality_populated)
+
+        self.region_codes = {name: code for code, name in enumerate(self.region_names)}
+        self.municipality_lookup = {}
+        for code, (name, region) in enumerate(zip(self.municipality_names, self.municipality_regions)):
+            self.municipality_lookup.setdefault(name, []).append((int(region), code))
+
+    def _by_region(self, values):
+        return np.bincount(
+            self.municipality_regions, weights=values, minlength=len(self.region_names)
+        ).astype(np.int64)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def municipality_rows(self, code):
+        start = self.municipality_starts[code]
+        return slice(start, start + self.municipality_settlements[code])
+
+    def region_municipality_codes(self, code):
+        start = self.region_municipality_starts[code]
+        return self.region_municipality_order[start:start + self.region_municipalities[code]]
+
+    def region_rows(self, code):
+        municipalities = self.region_municipality_codes(code)
+        if not len(municipalities):
+            return slice(0, 0)
+
+        # Муниципалитеты региона идут подряд, значит и их строки — один срез
+        start = self.municipality_starts[municipalities[0]]
+        return slice(start, start + self.region_settlements[code])
+
+    def municipality_codes_for(self, region_name=None, municipality_name=None):
+        """Коды муниципалитетов по названиям (None — без ограничения)"""
+        region = self.region_codes.get(region_name) if region_name else None
+        if region_name and region is None:
+            return []
+
+        if municipality_name:
+            return [
+                code for code_region, code in self.municipality_lookup.get(municipality_name, [])
+                if region is None or code_region == region
+            ]
+
+        return None if region is None else list(self.region_municipality_codes(region))
+
+    def rows(self, region_name=None, municipality_name=None):
+        """Строки снимка в пределах региона/муниципалитета: срез или массив индексов"""
+        if municipality_name:
+            codes = self.municipality_codes_for(region_name, municipality_name)
+            if len(codes) == 1:
+                return self.municipality_rows(codes[0])
+
+            return np.concatenate([
+                np.arange(len(self))[self.municipality_rows(code)] for code in codes
+            ]) if codes else np.empty(0, dtype=np.int64)
+
+        if region_name:
+            region = self.region_codes.get(region_name)
+            return slice(0, 0) if region is None else self.region_rows(region)
+
+        return slice(None)
+
+    @classmethod
+    def from_columns(cls, region_names, municipality_names, municipality_regions, type_names,
+                     ids, names, type_codes, municipality_codes, population, version=None):
+        """Снимок из столбцов в произвольном порядке строк"""
+        municipality_regions = np.asarray(municipality_regions, dtype=np.int32)
+
+        # Строки сортируются по муниципалитету, а муниципалитеты — по региону
+        municipality_order = np.argsort(municipality_regions, kind='stable')
+        municipality_rank = np.empty_like(municipality_order)
+        municipality_rank[municipality_order] = np.arange(len(municipality_order))
+
+        codes = np.asarray(municipality_codes, dtype=np.int32)
+        order = np.argsort(municipality_rank[codes], kind='stable')
+
+        return cls(
+            region_names=region_names,
+            municipality_names=municipality_names,
+            municipality_regions=municipality_regions,
+            type_names=type_names,
+            ids=np.asarray(ids, dtype=np.int64)[order],
+            names=np.asarray(names, dtype=object)[order],
+            type_codes=np.asarray(type_codes, dtype=np.int32)[order],
+            municipality_codes=codes[order],
+            population=np.asarray(population, dtype=np.int64)[order],
+            version=version,
+        )
+
+    @classmethod
+    def from_database(cls, version=None):
+        """Прочитать снимок из БД тремя запросами"""
+        regions = list(Region.objects.order_by('id').values_list('id', 'name'))
+        region_index = {pk: code for code, (pk, _) in enumerate(regions)}
+
+        municipalities = list(Municipality.objects.order_by('id').values_list('id', 'name', 'region_id'))
+        municipality_index = {pk: code for code, (pk, _, _) in enumerate(municipalities)}
+
+        rows = list(
+            Settlement.objects.values_list('id', 'name', 'type', 'population', 'municipality_id')
+            .iterator(chunk_size=50000)
+        )
+        ids, names, types, population, municipality_ids = zip(*rows) if rows else ((),) * 5
+
+        type_names, type_codes = np.unique(np.asarray(types, dtype=object), return_inverse=True)
+
+        return cls.from_columns(
+            region_names=[name for _, name in regions],
+            municipality_names=[name for _, name, _ in municipalities],
+            municipality_regions=[region_index[region_id] for _, _, region_id in municipalities],
+            type_names=[str(name) for name in type_names],
+            ids=ids,
+            names=names,
+            type_codes=type_codes,
+            municipality_codes=[municipality_index[pk] for pk in municipality_ids],
+            population=[NULL_POPULATION if value is None else value for value in population],
+            version=version,
+        )
+
+    @classmethod
+    def from_file(cls, path):
+        """Открыть снимок, выгруженный командой export_snapshot"""
+        return cls(**read_columns(path))
+
+    def to_file(self, path):
+        """Выгрузить снимок в файл для np.memmap; возвращает размер файла"""
+        return write_snapshot(self, path)
+
+
+def load_snapshot(version=None):
+    """
+    Снимок версии данных version: из файла SETTLEMENTS_SNAPSHOT_PATH,
+    если он выгружен для этой версии, иначе — из БД.
+    """
+    path = getattr(settings, 'SETTLEMENTS_SNAPSHOT_PATH', '')
+
+    if path and version is not None and os.path.exists(path):
+        header = read_header(path)
+        if header['dataset_version'] == version:
+            return SettlementSnapshot(**read_columns(path, header))
+
+    return SettlementSnapshot.from_database(version=version)
+
+
+_snapshot = None
+_snapshot_key = None
+_snapshot_lock = threading.Lock()
+
+
+def _snapshot_version_key():
+    """
+    Версия данных и ключ, по которому узнаётся снимок: версия и время импорта.
+    Пока импорт не выполнялся, версии нет, и снимок узнаётся по наибольшему
+    id поселения: это чтение одной записи индекса вместо всей таблицы
+    (любой импорт поднимает версию, и снимок перечитывается уже по ней).
+    """
+    dataset_version = get_dataset_version()
+    if dataset_version is not None:
+        return dataset_version.version, (dataset_version.version, dataset_version.updated_at)
+
+    return None, (None, Settlement.objects.aggregate(last_id=Max('id'))['last_id'])
+
+
+def get_snapshot():
+    """
+    Снимок текущей версии данных, общий для процесса.
+    При смене версии (импорт) снимок перечитывается при первом обращении.
+    """
+    global _snapshot, _snapshot_key
+
+    version, key = _snapshot_version_key()
+
+    with _snapshot_lock:
+        if _snapshot_key != key:
+            _snapshot = load_snapshot(version)
+            _snapshot_key = key
+
+        return _snapshot
@@ -0,0 +1,246 @@
+import numpy as np
+import pandas as pd
+
+from .snapshot import NULL_POPULATION, get_snapshot
+
+
+class SnapshotSelection:
+    """
+    Выборка строк снимка — аналог queryset из DataFetcher для SnapshotProcessor.
+    Поддерживает values() и count(), которые фасад вызывает у querysets.
+    """
+
+    def __init__(self, snapshot, rows):
+        self.snapshot = snapshot
+        self.rows = rows
+
+    @property
+    def population(self):
+        return self.snapshot.population[self.rows]
+
+    @property
+    def type_codes(self):
+        return self.snapshot.type_codes[self.rows]
+
+    def filter(self, mask):
+        indexes = np.arange(len(self.snapshot))[self.rows]
+        return SnapshotSelection(self.snapshot, indexes[mask])
+
+    def order_by_population(self):
+        """Порядок как в PostgreSQL для ORDER BY population DESC, id DESC: NULL первыми"""
+        indexes = np.arange(len(self.snapshot))[self.rows]
+        population = self.snapshot.population[indexes]
+        population = np.where(population == NULL_POPULATION, np.iinfo(np.int64).max, population)
+
+        order = np.lexsort((-self.snapshot.ids[indexes], -population))
+        return SnapshotSelection(self.snapshot, indexes[order])
+
+    def population_values(self):
+        """Население строк списком, NULL — None"""
+        return [None if value == NULL_POPULATION else value for value in self.population.tolist()]
+
+    def count(self):
+        return len(self.population)
+
+    def values(self, *fields):
+        columns = {
+            'id': lambda rows: self.snapshot.ids[rows].tolist(),
+            'name': lambda rows: self.snapshot.names[rows].tolist(),
+            'type': lambda rows: [self.snapshot.type_names[code] for code in self.snapshot.type_codes[rows]],
+            'population': lambda rows: SnapshotSelection(self.snapshot, rows).population_values(),
+        }
+
+        data = [columns[field](self.rows) for field in fields]
+        return [dict(zip(fields, row)) for row in zip(*data)]
+
+    def __len__(self):
+        return self.count()
+
+
+class SnapshotFetcher:
+    """
+    Аналог DataFetcher, отвечающий из колоночного снимка в памяти процесса.
+    Агрегаты возвращаются в тех же форматах, что и из таблиц агрегатов,
+    выборки поселений — как SnapshotSelection для SnapshotProcessor.
+    """
+
+    def __init__(self, snapshot=None):
+        self.snapshot = snapshot if snapshot is not None else get_snapshot()
+
+    def select(self, region_name=None, municipality_name=None):
+        return SnapshotSelection(self.snapshot, self.snapshot.rows(region_name, municipality_name))
+
+    def fetch_all_settlements_with_relations(self):
+        """Все поселения (region, municipality, population)"""
+        snapshot = self.snapshot
+        municipality_regions = snapshot.municipality_regions[snapshot.municipality_codes]
+
+        return [
+            (snapshot.region_names[region], snapshot.municipality_names[municipality], population)
+            for region, municipality, population in zip(
+                municipality_regions.tolist(),
+                snapshot.municipality_codes.tolist(),
+                self.select().population_values(),
+            )
+        ]
+
+    def fetch_settlements_by_region(self, region_name):
+        """Поселения региона (municipality, population)"""
+        selection = self.select(region_name)
+        municipality_codes = self.snapshot.municipality_codes[selection.rows].tolist()
+
+        return [
+            (self.snapshot.municipality_names[code], population)
+            for code, population in zip(municipality_codes, selection.population_values())
+        ]
+
+    def fetch_settlements_by_regions(self, region_names):
+        """Поселения нескольких регионов одним DataFrame (region, municipality, type, population)"""
+        snapshot = self.snapshot
+        indexes = np.arange(len(snapshot))
+        rows = np.concatenate(
+            [indexes[snapshot.rows(region_name)] for region_name in region_names] or [indexes[:0]]
+        )
+
+        municipality_codes = snapshot.municipality_codes[rows]
+        population = snapshot.population[rows]
+
+        return pd.DataFrame({
+            'region': np.array(snapshot.region_names, dtype=object)[
+                snapshot.municipality_regions[municipality_codes]
+            ],
+            'municipality': np.array(snapshot.municipality_names, dtype=object)[municipality_codes],
+            'type': np.array(snapshot.type_names, dtype=object)[snapshot.type_codes[rows]],
+            'population': np.where(population == NULL_POPULATION, np.nan, population),
+        })
+
+    def fetch_settlements_by_municipality(self, region_name, municipality_name):
+        return self.select(region_name, municipality_name)
+
+    def fetch_settlement_details(self, region_name, municipality_name, search_query=None, settlement_type=None):
+        selection = self.select(region_name, municipality_name)
+
+        if settlement_type:
+            code = self.type_code(settlement_type)
+            selection = selection.filter(selection.type_codes == code)
+
+        if search_query:
+            needle = search_query.casefold()
+            names = self.snapshot.names[selection.rows]
+            selection = selection.filter(
+                np.fromiter((needle in name.casefold() for name in names), dtype=bool, count=len(names))
+            )
+
+        return selection.order_by_population()
+
+    def fetch_settlement_page(self, region_name, municipality_name, search_query=None,
+                              settlement_type=None, after=None, limit=20, before=None):
+        selection = self.fetch_settlement_details(region_name, municipality_name, search_query, settlement_type)
+
+        if before is not None:
+            end = self._cursor_position(selection, before, inclusive=False)
+            page = SnapshotSelection(self.snapshot, selection.rows[max(end - limit - 1, 0):end])
+            return page.values('id', 'name', 'type', 'population')
+
+        start = self._cursor_position(selection, after, inclusive=True) if after is not None else 0
+
+        page = SnapshotSelection(self.snapshot, selection.rows[start:start + limit + 1])
+        return page.values('id', 'name', 'type', 'population')
+
+    def _cursor_position(self, selection, cursor, inclusive):
+        """Число строк упорядоченной выборки перед курсором (inclusive — вместе со строкой курсора)"""
+        population, pk = cursor
+        ordered_population = self.snapshot.population[selection.rows]
+        ordered_ids = self.snapshot.ids[selection.rows]
+        preceding_ids = ordered_ids >= pk if inclusive else ordered_ids > pk
+
+        if population is None:
+            before = (ordered_population == NULL_POPULATION) & preceding_ids
+        else:
+            before = (ordered_population == NULL_POPULATION) | (ordered_population > population) | (
+                (ordered_population == population) & preceding_ids
+            )
+
+        # Строки упорядочены, поэтому предшествующие курсору идут в начале
+        return int(before.sum())
+
+    def fetch_settlement_types(self, region_name, municipality_name):
+        codes = np.unique(self.select(region_name, municipality_name).type_codes)
+        return sorted(self.snapshot.type_names[code] for code in codes)
+
+    def fetch_settlement_types_with_population(self, region_name=None, municipality_name=None):
+        return self.select(region_name, municipality_name)
+
+    def fetch_populated_settlements(self, region_name=None, municipality_name=None):
+        selection = self.select(region_name, municipality_name)
+        return selection.filter(selection.population > 0)
+
+    def fetch_population_sketch(self, region_name=None, municipality_name=None):
+        # Снимок держит всё население в памяти: точные перцентили дешевле построения скетча
+        return None
+
+    def fetch_settlement_statistics(self, region_name=None, municipality_name=None):
+        population = self.select(region_name, municipality_name).population
+
+        total = len(population)
+        populated = int((population > 0).sum())
+
+        return {
+            'total': total,
+            'populated': populated,
+            'empty': total - populated
+        }
+
+    def fetch_region_aggregates(self):
+        snapshot = self.snapshot
+        order = np.argsort(-snapshot.region_population, kind='stable')
+
+        return [
+            (
+                snapshot.region_names[code],
+                int(snapshot.region_population[code]),
+                int(snapshot.region_municipalities[code]),
+                int(snapshot.region_settlements[code]),
+            )
+            for code in order if snapshot.region_settlements[code] > 0
+        ]
+
+    def fetch_municipality_aggregates(self, region_name):
+        snapshot = self.snapshot
+        codes = np.asarray(snapshot.municipality_codes_for(region_name) or [], dtype=np.int64)
+        codes = codes[np.argsort(-snapshot.municipality_population[codes], kind='stable')]
+
+        return [
+            (
+                snapshot.municipality_names[code],
+                int(snapshot.municipality_settlements[code]),
+                int(snapshot.municipality_population[code]),
+            )
+            for code in codes if snapshot.municipality_settlements[code] > 0
+        ]
+
+    def fetch_aggregated_statistics(self, region_name=None):
+        snapshot = self.snapshot
+
+        if region_name:
+            code = snapshot.region_codes.get(region_name)
+            regions = [] if code is None else [code]
+        else:
+            regions = slice(None)
+
+        total = int(snapshot.region_settlements[regions].sum())
+        populated = int(snapshot.region_populated[regions].sum())
+
+        return {
+            'regions': len(snapshot.region_names) if not region_name else len(regions),
+            'municipalities': int(snapshot.region_municipalities[regions].sum()),
+            'total': total,
+            'populated': populated,
+            'empty': total - populated,
+        }
+
+    def type_code(self, settlement_type):
+        try:
+            return self.snapshot.type_names.index(settlement_type)
+        except ValueError:
+            return -1
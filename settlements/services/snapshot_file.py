@@ -0,0 +1,179 @@
+import json
+import os
+import tempfile
+
+import numpy as np
+
+# Формат файла: MAGIC, длина заголовка (uint64), JSON-заголовок, массивы с выравниванием
+MAGIC = b'SETLSNAP'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+_LENGTH = np.dtype('<u8')
+
+
+class StringTable:
+    """
+    Строки в виде общего буфера UTF-8 и массива смещений.
+    Декодируются только запрошенные строки, поэтому таблица
+    может лежать в отображённом в память файле.
+    """
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    @classmethod
+    def from_strings(cls, strings):
+        encoded = [value.encode('utf-8') for value in strings]
+
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+
+        return cls(offsets, np.frombuffer(b''.join(encoded), dtype=np.uint8))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def _decode(self, index):
+        return self.data[self.offsets[index]:self.offsets[index + 1]].tobytes().decode('utf-8')
+
+    def __getitem__(self, index):
+        """Строка по номеру или массив строк по срезу/массиву номеров"""
+        if isinstance(index, (int, np.integer)):
+            return self._decode(index)
+
+        indexes = np.arange(len(self))[index]
+        result = np.empty(len(indexes), dtype=object)
+        result[:] = [self._decode(i) for i in indexes.tolist()]
+        return result
+
+    def tolist(self):
+        return self[:].tolist()
+
+
+def _columns(snapshot):
+    names = snapshot.names
+    if not isinstance(names, StringTable):
+        names = StringTable.from_strings(names)
+
+    tables = {
+        'names': names,
+        'region_names': StringTable.from_strings(snapshot.region_names),
+        'municipality_names': StringTable.from_strings(snapshot.municipality_names),
+        'type_names': StringTable.from_strings(snapshot.type_names),
+    }
+
+    arrays = {
+        'ids': snapshot.ids.astype('<i8'),
+        'type_codes': snapshot.type_codes.astype('<i4'),
+        'municipality_codes': snapshot.municipality_codes.astype('<i4'),
+        'population': snapshot.population.astype('<i8'),
+        'municipality_regions': snapshot.municipality_regions.astype('<i4'),
+    }
+    for name, table in tables.items():
+        arrays[f'{name}_offsets'] = np.asarray(table.offsets, dtype='<i8')
+        arrays[f'{name}_data'] = np.asarray(table.data, dtype=np.uint8)
+
+    return arrays
+
+
+def _align(position):
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+
+def write_snapshot(snapshot, path):
+    """
+    Записать снимок в файл. Файл заменяется атомарно (os.replace):
+    процессы, уже отобразившие старый файл, продолжают читать его.
+    Возвращает размер файла в байтах.
+    """
+    arrays = _columns(snapshot)
+
+    layout = {}
+    position = 0
+    for name, array in arrays.items():
+        layout[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': position}
+        position = _align(position + array.nbytes)
+
+    header = json.dumps({
+        'format': FORMAT_VERSION,
+        'dataset_version': snapshot.version,
+        'rows': len(snapshot),
+        'arrays': layout,
+    }).encode('utf-8')
+    data_start = _align(len(MAGIC) + _LENGTH.itemsize + len(header))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+
+    try:
+        with os.fdopen(fd, 'wb') as output:
+            output.write(MAGIC)
+            output.write(np.array(len(header), dtype=_LENGTH).tobytes())
+            output.write(header)
+
+            for name, array in arrays.items():
+                output.seek(data_start + layout[name]['offset'])
+                output.write(array.tobytes())
+
+            output.truncate(data_start + position)
+
+        # mkstemp создаёт файл только для владельца, а читать его могут воркеры других пользователей
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, path)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+    return data_start + position
+
+
+def read_header(path):
+    """Заголовок файла снимка и смещение начала массивов"""
+    with open(path, 'rb') as source:
+        if source.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{path} не является файлом снимка поселений')
+
+        length = int(np.frombuffer(source.read(_LENGTH.itemsize), dtype=_LENGTH)[0])
+        header = json.loads(source.read(length))
+
+    if header['format'] != FORMAT_VERSION:
+        raise ValueError(f"Неподдерживаемая версия формата снимка: {header['format']}")
+
+    header['data_start'] = _align(len(MAGIC) + _LENGTH.itemsize + length)
+    return header
+
+
+def read_columns(path, header=None):
+    """
+    Столбцы снимка из файла через np.memmap (аргументы SettlementSnapshot).
+    Массивы не читаются в память процесса: страницы файла общие
+    для всех процессов через кэш страниц ОС.
+    """
+    header = header or read_header(path)
+    mapped = np.memmap(path, dtype=np.uint8, mode='r')
+
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        dtype = np.dtype(spec['dtype'])
+        start = header['data_start'] + spec['offset']
+        count = int(np.prod(spec['shape']))
+
+        arrays[name] = mapped[start:start + count * dtype.itemsize].view(dtype).reshape(spec['shape'])
+
+    def table(name):
+        return StringTable(arrays[f'{name}_offsets'], arrays[f'{name}_data'])
+
+    return {
+        'region_names': table('region_names').tolist(),
+        'municipality_names': table('municipality_names').tolist(),
+        'municipality_regions': arrays['municipality_regions'],
+        'type_names': table('type_names').tolist(),
+        'ids': arrays['ids'],
+        'names': table('names'),
+        'type_codes': arrays['type_codes'],
+        'municipality_codes': arrays['municipality_codes'],
+        'population': arrays['population'],
+        'version': header['dataset_version'],
+    }
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+from .data_processor import DataProcessor
+from .quantile_sketch import percentile_keys
+from .snapshot_fetcher import SnapshotSelection
+
+
+class SnapshotProcessor(DataProcessor):
+    """
+    Аналог DataProcessor для выборок из колоночного снимка (SnapshotFetcher).
+    Группировка выполняется векторно через bincount, без обращений к БД.
+    Уже материализованные данные (списки, Series) обрабатываются как в DataProcessor.
+    """
+
+    def calculate_statistics(self, data, approximate=False, percentiles=()):
+        """Статистика по населению (значения <= 0 и NULL отбрасываются)"""
+        if approximate or not isinstance(data, SnapshotSelection):
+            return super().calculate_statistics(data, approximate, percentiles)
+
+        population = data.population
+        population = population[population > 0]
+
+        if not len(population):
+            return super().calculate_statistics([], percentiles=percentiles)
+
+        return {
+            'mean': int(population.mean()),
+            'median': int(np.median(population)),
+            'max': int(population.max()),
+            'min': int(population.min()),
+            'total': int(population.sum()),
+            **{
+                key: int(np.percentile(population, percentile))
+                for key, percentile in zip(percentile_keys(percentiles), percentiles)
+            }
+        }
+
+    def get_distribution_by_type(self, settlements_data):
+        """Получить распределение поселений по типам"""
+        if not isinstance(settlements_data, SnapshotSelection):
+            return super().get_distribution_by_type(settlements_data)
+
+        type_names = settlements_data.snapshot.type_names
+        type_codes = settlements_data.type_codes
+        population = settlements_data.population
+        known = population >= 0
+
+        present = np.bincount(type_codes, minlength=len(type_names)) > 0
+        totals = np.bincount(
+            type_codes[known], weights=population[known], minlength=len(type_names)
+        ).astype(np.int64)
+        counts = np.bincount(type_codes[known], minlength=len(type_names))
+
+        codes = np.flatnonzero(present)
+        codes = codes[np.argsort(-totals[codes], kind='stable')]
+
+        return pd.DataFrame({
+            'type': [type_names[code] for code in codes],
+            'population': totals[codes],
+            'count': counts[codes],
+        })
+
+    def calculate_histogram(self, data, edges):
+        if not isinstance(data, SnapshotSelection):
+            return super().calculate_histogram(data, edges)
+
+        population = data.population
+        buckets = np.searchsorted(edges, population[population >= 0], side='right')
+
+        return np.bincount(buckets, minlength=len(edges) + 1).tolist()
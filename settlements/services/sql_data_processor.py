@@ -0,0 +1,173 @@
+import pandas as pd
+from django.db.models import Avg, Count, F, Max, Min, Q, QuerySet, Sum
+
+from .data_processor import DataProcessor
+from .expressions import PercentileCont, WidthBucket
+from .quantile_sketch import percentile_keys
+
+
+class SqlDataProcessor(DataProcessor):
+    """
+    Аналог DataProcessor, выполняющий группировку на стороне PostgreSQL.
+    Принимает те же querysets из DataFetcher и возвращает те же структуры,
+    но из БД передаётся только сгруппированный результат.
+    Уже материализованные данные (списки, Series) обрабатываются как в DataProcessor.
+    """
+
+    def aggregate_by_region(self, settlements_data):
+        """Агрегировать данные по регионам"""
+        rows = settlements_data.values('municipality__region__name').annotate(
+            population_total=Sum('population'),
+            municipalities_count=Count('municipality', distinct=True),
+            settlements_count=Count('id'),
+        ).order_by(F('population_total').desc(nulls_last=True)).values_list(
+            'municipality__region__name', 'population_total',
+            'municipalities_count', 'settlements_count'
+        )
+
+        grouped = pd.DataFrame(
+            list(rows),
+            columns=['name', 'population', 'municipalities', 'settlements']
+        )
+        grouped['population'] = grouped['population'].fillna(0)
+
+        return grouped
+
+    def aggregate_by_municipality(self, settlements_data):
+        """Агрегировать данные по муниципалитетам"""
+        rows = settlements_data.values('municipality__name').annotate(
+            settlements_count=Count('population'),
+            population_total=Sum('population'),
+        ).order_by(F('population_total').desc(nulls_last=True)).values_list(
+            'municipality__name', 'settlements_count', 'population_total'
+        )
+
+        grouped = pd.DataFrame(
+            list(rows),
+            columns=['municipality', 'settlements_count', 'population_total']
+        )
+        grouped['population_total'] = grouped['population_total'].fillna(0)
+
+        return grouped
+
+    def calculate_statistics(self, data, approximate=False, percentiles=()):
+        """Статистика по населению (значения <= 0 и NULL отбрасываются)"""
+        if approximate or not isinstance(data, QuerySet):
+            return super().calculate_statistics(data, approximate, percentiles)
+
+        field = data.query.values_select[0] if data.query.values_select else 'population'
+
+        stats = data.filter(**{f'{field}__gt': 0}).aggregate(
+            **self._statistics_expressions(field, percentiles)
+        )
+
+        return self._statistics_to_dict(stats)
+
+    def calculate_group_statistics(self, settlements_data, columns, group_by):
+        """Статистика по суммарному населению групп"""
+        lookup = settlements_data.query.values_select[columns.index(group_by)]
+
+        totals = settlements_data.values(lookup).annotate(
+            group_total=Sum('population')
+        ).filter(group_total__gt=0)
+
+        stats = totals.aggregate(**self._statistics_expressions('group_total'))
+
+        return self._statistics_to_dict(stats)
+
+    def get_distribution_by_type(self, settlements_data):
+        """Получить распределение поселений по типам"""
+        rows = settlements_data.values('type').annotate(
+            population_total=Sum('population'),
+            settlements_count=Count('population'),
+        ).order_by(F('population_total').desc(nulls_last=True)).values_list(
+            'type', 'population_total', 'settlements_count'
+        )
+
+        stats = pd.DataFrame(list(rows), columns=['type', 'population', 'count'])
+        stats['population'] = stats['population'].fillna(0)
+
+        return stats
+
+    def calculate_histogram(self, data, edges):
+        """Число поселений в интервалах границ edges (группировка по width_bucket)"""
+        if not isinstance(data, QuerySet):
+            return super().calculate_histogram(data, edges)
+
+        field = data.query.values_select[0] if data.query.values_select else 'population'
+
+        rows = data.filter(**{f'{field}__isnull': False}).annotate(
+            bucket=WidthBucket(field, edges)
+        ).values('bucket').annotate(settlements_count=Count('*')).values_list(
+            'bucket', 'settlements_count'
+        )
+
+        counts = [0] * (len(edges) + 1)
+        for bucket, settlements_count in rows:
+            counts[bucket] = settlements_count
+
+        return counts
+
+    def compare_regions(self, settlements_data, region_names, percentiles=(), top_municipalities=5):
+        """
+        Сравнить регионы тремя сгруппированными запросами, независимо от числа регионов:
+        по регионам (счётчики и статистика населения), по типам и по муниципалитетам.
+        """
+        if not isinstance(settlements_data, QuerySet):
+            return super().compare_regions(settlements_data, region_names, percentiles, top_municipalities)
+
+        region = 'municipality__region__name'
+        populated = Q(population__gt=0)
+
+        statistics = self._statistics_expressions('population', percentiles, filter=populated)
+        counts = ['municipalities', 'settlements', 'populated_settlements']
+
+        rows = settlements_data.values(region).annotate(
+            municipalities=Count('municipality', distinct=True),
+            settlements=Count('id'),
+            populated_settlements=Count('id', filter=populated),
+            **statistics,
+        ).order_by().values_list(region, *counts, *statistics)
+
+        by_region = pd.DataFrame(list(rows), columns=[region, *counts, *statistics]).set_index(region)
+        general = by_region[counts]
+        # У регионов без заселённых НП статистика пустая (NULL)
+        stats = by_region[list(statistics)].dropna()
+
+        types = pd.DataFrame(
+            list(settlements_data.values(region, 'type').annotate(
+                population_total=Sum('population'),
+                settlements_count=Count('population'),
+            ).order_by().values_list(region, 'type', 'population_total', 'settlements_count')),
+            columns=['region', 'type', 'population', 'count']
+        )
+
+        municipalities = pd.DataFrame(
+            list(settlements_data.values(region, 'municipality__name').annotate(
+                settlements_count=Count('population'),
+                population_total=Sum('population'),
+            ).order_by().values_list(region, 'municipality__name', 'settlements_count', 'population_total')),
+            columns=['region', 'municipality', 'settlements_count', 'population_total']
+        )
+
+        return self._comparison_by_region(
+            region_names, general, stats, types, municipalities, percentiles, top_municipalities
+        )
+
+    @staticmethod
+    def _statistics_expressions(field, percentiles=(), filter=None):
+        return {
+            'mean': Avg(field, filter=filter),
+            'median': PercentileCont(field, 0.5, filter=filter),
+            'max': Max(field, filter=filter),
+            'min': Min(field, filter=filter),
+            'total': Sum(field, filter=filter),
+            **{
+                key: PercentileCont(field, percentile / 100, filter=filter)
+                for key, percentile in zip(percentile_keys(percentiles), percentiles)
+            },
+        }
+
+    @staticmethod
+    def _statistics_to_dict(stats):
+        return {key: int(value) if value is not None else 0 for key, value in stats.items()}
@@ -1,65 +1,62 @@
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
+from django.urls import reverse
 
-class BreadcrumbState:
-    _instance = None
-
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._initialized = False
-
-        return cls._instance
-
-    def __init__(self):
-        if self._initialized:
-            return
 
-        self._current_region = None
-        self._current_municipality = None
+class BreadcrumbState:
+    """
+    Навигация текущей страницы: регион и муниципалитет.
 
-        self._initialized = True
+    Создаётся заново на каждый запрос из параметров URL (см. from_request)
+    и после создания не меняется, поэтому параллельные запросы
+    в потоках или под ASGI не видят навигацию друг друга.
+    """
 
-    def set_region(self, region_name: str) -> None:
+    def __init__(self, region_name: Optional[str] = None, municipality_name: Optional[str] = None):
         """
-        Установить текущий регион.
-        Автоматически очищает муниципалитет.
-
         Args:
             region_name: Название региона
+            municipality_name: Название муниципалитета (только вместе с регионом)
         """
+        if municipality_name and not region_name:
+            raise ValueError("Муниципалитет задаётся только вместе с регионом")
+
         self._current_region = region_name
-        self._current_municipality = None
+        self._current_municipality = municipality_name
 
-    def set_municipality(self, municipality_name: str) -> None:
-        """
-        Установить текущий муниципалитет.
-        Требует, чтобы регион уже был установлен.
-        """
-        if not self._current_region:
-            raise ValueError("Сначала установите регион через set_region()")
+    @classmethod
+    def from_request(cls, request) -> 'BreadcrumbState':
+        """Навигация по параметрам URL страниц приложения settlements"""
+        match = getattr(request, 'resolver_match', None)
+        if match is None or match.namespace != 'settlements':
+            return cls()
 
-        self._current_municipality = municipality_name
+        return cls(match.kwargs.get('region_name'), match.kwargs.get('municipality_name'))
+
+    @property
+    def region_name(self) -> Optional[str]:
+        return self._current_region
+
+    @property
+    def municipality_name(self) -> Optional[str]:
+        return self._current_municipality
 
     def get_breadcrumb(self) -> List[Tuple[str, str]]:
         """
         Получить список хлебных крошек.
         """
         breadcrumb = [
-            ('Главная', '/settlements/'),
+            ('Главная', reverse('settlements:stats')),
         ]
 
         if self._current_region:
-            region_url = f"/settlements/regions/{self._current_region}/"
+            region_url = reverse('settlements:region', args=[self._current_region])
             breadcrumb.append((self._current_region, region_url))
 
-        if self._current_municipality and self._current_region:
-            municipality_url = f"/settlements/regions/{self._current_region}/{self._current_municipality}/"
+        if self._current_municipality:
+            municipality_url = reverse(
+                'settlements:municipality', args=[self._current_region, self._current_municipality]
+            )
             breadcrumb.append((self._current_municipality, municipality_url))
 
         return breadcrumb
-
-    def clear(self) -> None:
-        """Очистить навигацию (вернуться на главную)"""
-        self._current_region = None
-        self._current_municipality = None
@@ -0,0 +1,89 @@
+from django.test import TestCase
+
+from settlements.facades import StatisticsFacade
+from settlements.models import (
+    Region, Municipality, Settlement, RegionAggregate, MunicipalityAggregate
+)
+from settlements.services import AggregateBuilder
+
+
+class AggregateBuilderTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.region1 = Region.objects.create(name='Волгоградская область')
+        cls.region2 = Region.objects.create(name='Краснодарский край')
+
+        cls.mun1 = Municipality.objects.create(name='Волгоград', region=cls.region1)
+        cls.mun2 = Municipality.objects.create(name='Камышин', region=cls.region1)
+        cls.mun3 = Municipality.objects.create(name='Краснодар', region=cls.region2)
+
+        Settlement.objects.create(name='Волгоград', municipality=cls.mun1, type='город', population=1000000)
+        Settlement.objects.create(name='Старая Полтавка', municipality=cls.mun1, type='село', population=5000)
+        Settlement.objects.create(name='Урочище', municipality=cls.mun1, type='село', population=0)
+        Settlement.objects.create(name='Камышин', municipality=cls.mun2, type='город', population=100000)
+        Settlement.objects.create(name='Краснодар', municipality=cls.mun3, type='город', population=500000)
+
+    def test_rebuild_creates_aggregates(self):
+        """Проверяет пересчёт агрегатов регионов и муниципалитетов"""
+        built = AggregateBuilder().rebuild()
+
+        self.assertEqual(built, {'regions': 2, 'municipalities': 3})
+
+        region = RegionAggregate.objects.get(region=self.region1)
+        self.assertEqual(region.population, 1105000)
+        self.assertEqual(region.municipalities, 2)
+        self.assertEqual(region.settlements, 4)
+        self.assertEqual(region.empty_settlements, 1)
+        self.assertEqual(region.populated_settlements, 3)
+
+        municipality = MunicipalityAggregate.objects.get(municipality=self.mun1)
+        self.assertEqual(municipality.population, 1005000)
+        self.assertEqual(municipality.settlements, 3)
+        self.assertEqual(municipality.empty_settlements, 1)
+
+    def test_rebuild_replaces_previous_aggregates(self):
+        """Проверяет, что повторный пересчёт не дублирует строки"""
+        AggregateBuilder().rebuild()
+        AggregateBuilder().rebuild()
+
+        self.assertEqual(RegionAggregate.objects.count(), 2)
+        self.assertEqual(MunicipalityAggregate.objects.count(), 3)
+
+    def test_facade_results_match_live_computation(self):
+        """Проверяет, что фасад отдаёт одно и то же с агрегатами и без них"""
+        facade = StatisticsFacade()
+        region_name = 'Волгоградская область'
+
+        live = (
+            facade.get_top_regions(),
+            facade.get_population_stats(),
+            facade.get_general_stats(),
+            facade.get_general_stats(region_name),
+            facade.get_population_stats_by_region(region_name),
+            facade.get_municipalities_by_region(region_name),
+        )
+
+        AggregateBuilder().rebuild()
+
+        aggregated = (
+            facade.get_top_regions(),
+            facade.get_population_stats(),
+            facade.get_general_stats(),
+            facade.get_general_stats(region_name),
+            facade.get_population_stats_by_region(region_name),
+            facade.get_municipalities_by_region(region_name),
+        )
+
+        self.assertEqual(live, aggregated)
+
+    def test_top_regions_reads_aggregates_only(self):
+        """Проверяет, что главная страница не сканирует таблицу поселений"""
+        AggregateBuilder().rebuild()
+        facade = StatisticsFacade()
+        facade.result_cache.load_version()
+
+        with self.assertNumQueries(1):
+            top_regions = facade.get_top_regions()
+
+        self.assertEqual(top_regions[0]['name'], 'Волгоградская область')
+        self.assertEqual(top_regions[0]['population'], '1 105 000')
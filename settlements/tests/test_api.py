@@ -0,0 +1,122 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from settlements.models import Region, Municipality, Settlement
+from settlements.services import AggregateBuilder, bump_dataset_version
+
+
+class StatisticsApiTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        region = Region.objects.create(name='Волгоградская область')
+        municipality = Municipality.objects.create(name='Волгоград', region=region)
+
+        Settlement.objects.create(name='Волгоград', municipality=municipality, type='город', population=1000000)
+        Settlement.objects.create(name='Старая Полтавка', municipality=municipality, type='село', population=5000)
+        Settlement.objects.create(name='Урочище', municipality=municipality, type='село', population=0)
+
+        AggregateBuilder().rebuild()
+
+        cls.region_url = reverse('settlements:api_region', args=['Волгоградская область'])
+        cls.municipality_url = reverse('settlements:api_municipality', args=['Волгоградская область', 'Волгоград'])
+        cls.settlements_url = reverse(
+            'settlements:api_municipality_settlements', args=['Волгоградская область', 'Волгоград']
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_stats_endpoint(self):
+        """Проверяет общую статистику в JSON"""
+        response = self.client.get(reverse('settlements:api_stats'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+        data = response.json()
+        self.assertEqual(data['general_stats']['settlements'], 3)
+        self.assertEqual(data['top_regions'][0]['name'], 'Волгоградская область')
+        self.assertEqual(sum(item['count'] for item in data['population_distribution']), 2)
+
+    def test_region_and_municipality_endpoints(self):
+        """Проверяет статистику региона и муниципалитета"""
+        region = self.client.get(self.region_url).json()
+        self.assertEqual(region['municipalities'][0]['municipality'], 'Волгоград')
+
+        municipality = self.client.get(self.municipality_url).json()
+        self.assertEqual(municipality['general_stats']['empty_settlements'], 1)
+        self.assertEqual(municipality['population_stats']['total'], 1005000)
+
+    def test_unknown_region_returns_404(self):
+        """Проверяет 404 для несуществующих региона и муниципалитета"""
+        self.assertEqual(
+            self.client.get(reverse('settlements:api_region', args=['Нет такого'])).status_code, 404
+        )
+        self.assertEqual(
+            self.client.get(reverse('settlements:api_municipality', args=['Волгоградская область', 'Нет'])).status_code,
+            404
+        )
+
+    def test_settlements_endpoint_paginates(self):
+        """Проверяет список поселений с курсорной пагинацией"""
+        first = self.client.get(self.settlements_url, {'limit': 2}).json()
+
+        self.assertEqual(first['total'], 3)
+        self.assertEqual([row['name'] for row in first['settlements']], ['Волгоград', 'Старая Полтавка'])
+
+        second = self.client.get(self.settlements_url, {'limit': 2, 'after': first['next_cursor']}).json()
+
+        self.assertEqual([row['name'] for row in second['settlements']], ['Урочище'])
+        self.assertIsNone(second['next_cursor'])
+
+        back = self.client.get(self.settlements_url, {'limit': 2, 'before': second['previous_cursor']}).json()
+        self.assertEqual(back['settlements'], first['settlements'])
+        self.assertIsNone(back['previous_cursor'])
+
+    def test_no_validators_before_import(self):
+        """Проверяет, что до первого импорта ETag не выставляется"""
+        response = self.client.get(self.region_url)
+
+        self.assertFalse(response.has_header('ETag'))
+        self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_conditional_get(self):
+        """Проверяет 304 по If-None-Match и If-Modified-Since и смену ETag после импорта"""
+        bump_dataset_version()
+
+        response = self.client.get(self.region_url)
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+
+        # Проверка региона и чтение версии данных, без обращения к фасаду
+        with self.assertNumQueries(2):
+            cached = self.client.get(self.region_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+
+        cached = self.client.get(self.region_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(cached.status_code, 304)
+
+        bump_dataset_version()
+
+        response = self.client.get(self.region_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_conditional_get_for_unknown_objects(self):
+        """Проверяет, что условный запрос к несуществующему объекту получает 404, а не 304"""
+        etag = f'"settlements-v{bump_dataset_version().version}"'
+
+        for url, params in [
+            (reverse('settlements:api_region', args=['Нет такого']), {}),
+            (reverse('settlements:api_municipality', args=['Волгоградская область', 'Нет']), {}),
+            (reverse('settlements:api_municipality_settlements', args=['Нет такого', 'Волгоград']), {}),
+            (reverse('settlements:api_compare'), {'region': ['Нет такого']}),
+            (reverse('settlements:api_export'), {'region': 'Нет такого'}),
+        ]:
+            with self.subTest(url=url):
+                response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(reverse('settlements:api_export'), {'format': 'xlsx'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,90 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.http import Http404
+from django.test import RequestFactory, TransactionTestCase
+
+from settlements import views
+from settlements.facades import facade_call, gather_facade_calls, run_facade_calls
+from settlements.models import Region, Municipality, Settlement
+
+
+class AsyncViewsTestCase(TransactionTestCase):
+    """
+    Вызовы фасада в асинхронных страницах идут в других потоках со своими
+    соединениями, поэтому данные должны быть закоммичены (TransactionTestCase).
+    """
+
+    def setUp(self):
+        cache.clear()
+
+        region = Region.objects.create(name='Волгоградская область')
+        municipality = Municipality.objects.create(name='Волгоград', region=region)
+
+        Settlement.objects.create(name='Волгоград', municipality=municipality, type='город', population=1000000)
+        Settlement.objects.create(name='Старая Полтавка', municipality=municipality, type='село', population=5000)
+        Settlement.objects.create(name='Урочище', municipality=municipality, type='село', population=0)
+
+        self.factory = RequestFactory()
+
+    def render(self, view_class, path, **kwargs):
+        view = view_class.as_view()
+        if view_class.view_is_async:
+            view = async_to_sync(view)
+
+        response = view(self.factory.get(path), **kwargs)
+        response.render()
+
+        return response
+
+    def test_views_are_async(self):
+        """Проверяет, что асинхронные варианты распознаются Django как async"""
+        self.assertTrue(views.AsyncRegionDetailView.view_is_async)
+        self.assertFalse(views.RegionDetailView.view_is_async)
+
+    def test_gather_matches_sequential_calls(self):
+        """Проверяет, что параллельные вызовы дают те же результаты"""
+        calls = {
+            'general_stats': facade_call('get_general_stats', 'Волгоградская область'),
+            'municipalities': facade_call('get_municipalities_by_region', 'Волгоградская область'),
+            'page': facade_call(
+                'get_municipality_settlements_page', 'Волгоградская область', 'Волгоград', page_size=2
+            ),
+        }
+
+        self.assertEqual(async_to_sync(gather_facade_calls)(calls), run_facade_calls(calls))
+
+    def test_async_pages_match_sync_pages(self):
+        """Проверяет, что асинхронные страницы строят тот же контекст"""
+        pages = [
+            (views.StatsView, views.AsyncStatsView, {}),
+            (views.RegionDetailView, views.AsyncRegionDetailView, {'region_name': 'Волгоградская область'}),
+            (
+                views.MunicipalityDetailView,
+                views.AsyncMunicipalityDetailView,
+                {'region_name': 'Волгоградская область', 'municipality_name': 'Волгоград'},
+            ),
+        ]
+
+        for sync_view, async_view, kwargs in pages:
+            with self.subTest(view=sync_view.__name__):
+                expected = self.render(sync_view, '/', **kwargs)
+                actual = self.render(async_view, '/', **kwargs)
+
+                self.assertEqual(actual.status_code, 200)
+                self.assertEqual(actual.content, expected.content)
+
+    def test_async_municipality_not_found(self):
+        """Проверяет 404 для несуществующего муниципалитета до вызовов фасада"""
+        for view, runner in [
+            (views.AsyncMunicipalityDetailView, 'gather_facade_calls'),
+            (views.MunicipalityDetailView, 'run_facade_calls'),
+        ]:
+            with self.subTest(view=view.__name__), mock.patch.object(views, runner) as run_calls:
+                with self.assertRaises(Http404):
+                    self.render(
+                        view, '/', region_name='Волгоградская область', municipality_name='Нет такого'
+                    )
+
+                run_calls.assert_not_called()
@@ -0,0 +1,140 @@
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+
+from settlements.benchmarks import (
+    FacadeBenchmark, FormatterBenchmark, QueryPlanBenchmark, SyntheticDataset, ViewLatencyBenchmark
+)
+from settlements.benchmarks.facade_benchmark import facade_calls
+from settlements.facades import StatisticsFacade
+from settlements.models import Region, Municipality, Settlement
+
+
+class QueryPlanBenchmarkTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        region = Region.objects.create(name='Волгоградская область')
+        municipality = Municipality.objects.create(name='Волгоград', region=region)
+
+        Settlement.objects.create(name='Волгоград', municipality=municipality, type='Город', population=1000000)
+        Settlement.objects.create(name='Ивановка', municipality=municipality, type='Село', population=500)
+
+    def test_reports_plans_with_and_without_indexes(self):
+        """Проверяет отчёт по планам запросов страницы муниципалитета"""
+        report = QueryPlanBenchmark().run()
+
+        self.assertEqual(report['municipality'], 'Волгоград')
+        self.assertEqual(set(report['with_indexes']), set(report['without_indexes']))
+
+        for result in report['with_indexes'].values():
+            self.assertIn('plan', result)
+            self.assertIsNotNone(result['execution_ms'])
+
+    def test_indexes_are_restored_after_run(self):
+        """Проверяет, что удалённые на время замера индексы восстановлены"""
+        QueryPlanBenchmark().run()
+
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, Settlement._meta.db_table)
+
+        self.assertIn('settlement_mun_population_idx', constraints)
+        self.assertIn('settlement_mun_type_idx', constraints)
+
+
+class ViewLatencyBenchmarkTestCase(TransactionTestCase):
+    def setUp(self):
+        region = Region.objects.create(name='Волгоградская область')
+        municipality = Municipality.objects.create(name='Волгоград', region=region)
+
+        Settlement.objects.create(name='Волгоград', municipality=municipality, type='Город', population=1000000)
+
+    def test_reports_sync_and_async_latency(self):
+        """Проверяет отчёт о времени ответа синхронных и асинхронных страниц"""
+        shared_cache = caches[settings.SETTLEMENTS_CACHE_ALIAS]
+        shared_cache.set('settlements:benchmark-canary', 1)
+
+        report = ViewLatencyBenchmark(repeat=1).run()
+
+        self.assertEqual(shared_cache.get('settlements:benchmark-canary'), 1)
+
+        self.assertEqual(report['municipality'], 'Волгоград')
+        self.assertEqual(set(report['pages']), {'stats', 'region', 'municipality'})
+
+        for timing in report['pages'].values():
+            self.assertEqual(timing['sync']['runs'], 1)
+            self.assertGreater(timing['speedup'], 0)
+
+
+class SyntheticDatasetTestCase(TestCase):
+    def test_rows_are_reproducible_and_cover_municipalities(self):
+        """Проверяет, что набор воспроизводим по seed и охватывает все муниципалитеты"""
+        dataset = SyntheticDataset(settlements=500, regions=5, municipalities=20, seed=7)
+        rows = list(dataset.iter_rows(chunk_size=128))
+
+        self.assertEqual(
+            rows,
+            list(SyntheticDataset(settlements=500, regions=5, municipalities=20, seed=7).iter_rows(chunk_size=128))
+        )
+        self.assertEqual(len(rows), 500)
+        self.assertEqual(len({row[1] for row in rows}), 20)
+        self.assertEqual(len({row[0] for row in rows}), 5)
+        self.assertTrue(all(row[4] >= 0 for row in rows))
+        self.assertTrue(any(row[4] == 0 for row in rows))
+
+    def test_generate_dataset_command_loads_data(self):
+        """Проверяет генерацию и загрузку набора командой generate_dataset"""
+        call_command('generate_dataset', settlements=300, regions=3, municipalities=10, load=True, stdout=StringIO())
+
+        self.assertEqual(Settlement.objects.count(), 300)
+        self.assertEqual(Municipality.objects.count(), 10)
+        self.assertEqual(Region.objects.count(), 3)
+
+
+class FacadeBenchmarkTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        region = Region.objects.create(name='Волгоградская область')
+        municipality = Municipality.objects.create(name='Волгоград', region=region)
+
+        Settlement.objects.create(name='Волгоград', municipality=municipality, type='Город', population=1000000)
+
+    def test_covers_every_facade_method(self):
+        """Проверяет, что замеряются все публичные методы фасада"""
+        measured = {call.method for call in facade_calls('Регион', 'Муниципалитет').values()}
+        public = {name for name in dir(StatisticsFacade) if name.startswith('get_')}
+
+        self.assertEqual(measured, public)
+
+    def test_reports_methods_and_pages_per_size(self):
+        """Проверяет отчёт по размерам набора и откат загруженных данных"""
+        shared_cache = caches[settings.SETTLEMENTS_CACHE_ALIAS]
+        shared_cache.set('settlements:benchmark-canary', 1)
+
+        report = FacadeBenchmark(sizes=[200], repeat=1).run()
+        result = report['sizes']['200']
+
+        # Замер очищает только свой кэш
+        self.assertEqual(shared_cache.get('settlements:benchmark-canary'), 1)
+
+        self.assertEqual(result['settlements'], 200)
+        self.assertEqual(set(result['pages']), {'stats', 'region', 'municipality'})
+        self.assertIn('get_top_regions', result['methods'])
+        self.assertGreater(result['methods']['get_top_regions']['queries'], 0)
+
+        # Исходные данные восстановлены после замера
+        self.assertEqual(list(Settlement.objects.values_list('name', flat=True)), ['Волгоград'])
+
+
+class FormatterBenchmarkTestCase(SimpleTestCase):
+    def test_reports_formatting_and_serialization(self):
+        """Проверяет отчёт по форматированию и JSON-бэкендам"""
+        report = FormatterBenchmark(rows=500, repeat=1).run()
+
+        self.assertEqual(report['rows'], 500)
+        self.assertEqual(set(report['results']['format_column']), {'apply', 'vectorized'})
+        self.assertEqual(set(report['results']['payload']), {'records', 'columns'})
+        self.assertIn('json', report['results']['json'])
@@ -0,0 +1,146 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from settlements.cache_warmer import CacheWarmer
+from settlements.facades import StatisticsFacade
+from settlements.models import Region, Municipality, Settlement
+from settlements.services import AggregateBuilder, bump_dataset_version
+
+
+def create_settlements():
+    for region_name, municipalities in [
+        ('Волгоградская область', ['Волгоград', 'Камышин']),
+        ('Краснодарский край', ['Краснодар']),
+    ]:
+        region = Region.objects.create(name=region_name)
+
+        for municipality_name in municipalities:
+            municipality = Municipality.objects.create(name=municipality_name, region=region)
+            Settlement.objects.create(name=municipality_name, municipality=municipality, type='Город', population=1000)
+            Settlement.objects.create(name='Хутор', municipality=municipality, type='Хутор', population=0)
+
+    AggregateBuilder().rebuild()
+    bump_dataset_version()
+
+
+class SharedCacheMixin:
+    """Файловый кэш: его видят и процессы пула, и тест"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+        shared_cache = override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': self.cache_dir,
+        }})
+        shared_cache.enable()
+        self.addCleanup(shared_cache.disable)
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+
+    def assert_all_pages_cached(self):
+        facade = StatisticsFacade()
+
+        for calls in CacheWarmer.pages():
+            for call in calls.values():
+                self.assertTrue(facade.is_cached(call.method, *call.args, **call.kwargs), call)
+
+    def warm(self, **options):
+        out = StringIO()
+        call_command('warm_cache', stdout=out, **options)
+        return out.getvalue()
+
+
+class WarmCacheCommandTestCase(SharedCacheMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_settlements()
+
+    def test_pages(self):
+        """Проверяет список страниц: главная, регионы и муниципалитеты"""
+        self.assertEqual(len(CacheWarmer.pages()), 1 + 2 + 3)
+
+    def test_warm_cache_fills_facade_cache(self):
+        """Проверяет, что после прогрева все вызовы страниц берутся из кэша"""
+        output = self.warm(workers=1)
+
+        self.assertIn('6 / 6 страниц', output)
+        self.assertIn('уже в кэше 0', output)
+        self.assert_all_pages_cached()
+
+        # Страница муниципалитета читает из БД только версию данных и сам муниципалитет
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('settlements:municipality', args=['Краснодарский край', 'Краснодар']))
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_fresh_entries_are_skipped(self):
+        """Проверяет, что результаты, уже лежащие в кэше, не пересчитываются"""
+        StatisticsFacade().get_top_regions()
+
+        output = self.warm(workers=1)
+        self.assertIn('уже в кэше 1', output)
+
+        output = self.warm(workers=1)
+        self.assertIn('вычислено 0', output)
+
+        output = self.warm(workers=1, force=True)
+        self.assertIn('уже в кэше 0', output)
+
+    def test_version_bump_makes_entries_stale(self):
+        """Проверяет, что после импорта прогретые результаты снова считаются"""
+        self.warm(workers=1)
+        bump_dataset_version()
+
+        self.assertIn('уже в кэше 0', self.warm(workers=1))
+
+    def test_process_local_cache_is_rejected(self):
+        """Проверяет отказ прогревать кэш в памяти процесса"""
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            with self.assertRaises(CommandError):
+                self.warm(workers=1)
+
+
+class ImportDataWarmCacheTestCase(SharedCacheMixin, TestCase):
+    def write_csv(self):
+        csv_path = f'{self.cache_dir}/settlements.csv'
+        with open(csv_path, 'w', encoding='utf-8') as f:
+            f.write('region,municipality,settlement,type,population\nКрай,Город,Город,г,1000\n')
+
+        return csv_path
+
+    def test_import_data_warms_cache(self):
+        """Проверяет прогрев кэша в конце import_data --warm-cache"""
+        out = StringIO()
+        call_command('import_data', self.write_csv(), warm_cache=True, warm_cache_workers=1, stdout=out)
+
+        self.assertIn('Кэш прогрет', out.getvalue())
+        self.assert_all_pages_cached()
+
+    def test_import_data_skips_warmup_with_local_cache(self):
+        """Проверяет, что с кэшем в памяти процесса импорт не падает, а пропускает прогрев"""
+        out = StringIO()
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            call_command('import_data', self.write_csv(), warm_cache=True, stdout=out)
+
+        self.assertIn('прогрев после импорта пропущен', out.getvalue())
+        self.assertEqual(Settlement.objects.count(), 1)
+
+
+class WarmCacheProcessPoolTestCase(SharedCacheMixin, TransactionTestCase):
+    def test_process_pool(self):
+        """Проверяет прогрев пулом процессов: данные видны им после фиксации"""
+        create_settlements()
+
+        progress = []
+        state = CacheWarmer(workers=2, chunk_size=2).run(progress.append)
+
+        self.assertEqual(state.pages, 6)
+        self.assertEqual([item.pages for item in progress], [1, 2, 3, 4, 5, 6])
+        self.assertGreater(state.computed, 0)
+        self.assert_all_pages_cached()
@@ -0,0 +1,96 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from settlements.facades import StatisticsFacade
+from settlements.models import Region, Municipality, Settlement
+from settlements.services import SettlementSnapshot, SnapshotFetcher
+
+
+class RegionsComparisonTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        volgograd_region = Region.objects.create(name='Волгоградская область')
+        krasnodar_region = Region.objects.create(name='Краснодарский край')
+        Region.objects.create(name='Пустой край')
+
+        volgograd = Municipality.objects.create(name='Волгоград', region=volgograd_region)
+        kamyshin = Municipality.objects.create(name='Камышин', region=volgograd_region)
+        krasnodar = Municipality.objects.create(name='Краснодар', region=krasnodar_region)
+
+        for name, municipality, settlement_type, population in [
+            ('Волгоград', volgograd, 'город', 1000000),
+            ('Старая Полтавка', volgograd, 'село', 5000),
+            ('Урочище', volgograd, 'село', 0),
+            ('Заимка', volgograd, 'хутор', None),
+            ('Камышин', kamyshin, 'город', 100000),
+            ('Краснодар', krasnodar, 'город', 500000),
+        ]:
+            Settlement.objects.create(
+                name=name, municipality=municipality, type=settlement_type, population=population
+            )
+
+        cls.regions = ['Волгоградская область', 'Краснодарский край', 'Пустой край']
+        cls.url = reverse('settlements:api_compare')
+
+    def setUp(self):
+        cache.clear()
+
+    def compare(self, engine):
+        facade = StatisticsFacade(engine=engine)
+
+        if engine == 'snapshot':
+            facade.fetcher = SnapshotFetcher(SettlementSnapshot.from_database())
+
+        return facade.get_regions_comparison(self.regions, top_municipalities=1)
+
+    def test_comparison(self):
+        """Проверяет счётчики, статистику, типы и топ муниципалитетов каждого региона"""
+        volgograd, krasnodar, empty = self.compare('pandas')
+
+        self.assertEqual(volgograd['region'], 'Волгоградская область')
+        self.assertEqual(volgograd['general_stats'], {
+            'municipalities': 2, 'settlements': 5, 'empty_settlements': 2, 'populated_settlements': 3,
+        })
+        self.assertEqual(volgograd['settlement_population_stats']['total'], '1 105 000')
+        self.assertEqual(volgograd['settlement_population_stats']['median'], '100 000')
+        self.assertEqual(
+            [(row['type'], row['population'], row['count']) for row in volgograd['settlement_types']],
+            [('город', 1100000, 2), ('село', 5000, 2), ('хутор', 0, 0)]
+        )
+        self.assertEqual(volgograd['top_municipalities'], [
+            {'municipality': 'Волгоград', 'settlements_count': 3, 'population_total': '1 005 000'},
+        ])
+
+        self.assertEqual(krasnodar['settlement_population_stats']['max'], '500 000')
+
+        self.assertEqual(empty['general_stats']['settlements'], 0)
+        self.assertEqual(empty['settlement_population_stats']['total'], '0')
+        self.assertEqual(empty['settlement_types'], [])
+
+    def test_engines_agree(self):
+        """Проверяет, что движки pandas, sql и snapshot сравнивают регионы одинаково"""
+        expected = self.compare('pandas')
+
+        self.assertEqual(self.compare('sql'), expected)
+        self.assertEqual(self.compare('snapshot'), expected)
+
+    def test_query_count_does_not_depend_on_region_count(self):
+        """Проверяет, что число запросов не растёт с числом регионов"""
+        for engine, queries in [('pandas', 1), ('sql', 3)]:
+            facade = StatisticsFacade(engine=engine)
+            facade.result_cache.load_version()
+
+            with self.assertNumQueries(queries):
+                facade.get_regions_comparison(self.regions)
+
+    def test_compare_endpoint(self):
+        """Проверяет эндпоинт сравнения регионов и ошибки в параметрах"""
+        data = self.client.get(self.url, {'region': self.regions[:2], 'top': 1}).json()
+
+        self.assertEqual([region['region'] for region in data['regions']], self.regions[:2])
+        self.assertEqual(len(data['regions'][0]['top_municipalities']), 1)
+
+        self.assertEqual(self.client.get(self.url).json(), {'regions': []})
+        self.assertEqual(self.client.get(self.url, {'region': ['Атлантида']}).status_code, 404)
+        self.assertEqual(self.client.get(self.url, {'region': [f'Регион {n}' for n in range(21)]}).status_code, 400)
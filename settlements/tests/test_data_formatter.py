@@ -0,0 +1,81 @@
+import json
+from unittest import skipIf
+
+import numpy as np
+import pandas as pd
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from settlements.services import DataFormatter
+from settlements.services.json_backends import get_json_backend, json_dumps, orjson
+
+
+class DataFormatterTestCase(SimpleTestCase):
+    def setUp(self):
+        self.formatter = DataFormatter()
+
+    def test_vectorized_formatting_matches_format_number(self):
+        """Проверяет, что векторное форматирование совпадает с построчным"""
+        values = [0, 7, 999, 1000, 1005, 20030, 1000005, 1234567, -1234, None, np.nan, 12.7, 10 ** 12 + 3]
+
+        self.assertEqual(
+            self.formatter.format_numbers(values),
+            [self.formatter.format_number(value) for value in values]
+        )
+        self.assertEqual(self.formatter.format_numbers(pd.Series([], dtype='int64')), [])
+
+    def test_format_dataframe_column(self):
+        dataframe = pd.DataFrame({'name': ['a', 'b', 'c'], 'population': [1500000, np.nan, 42]})
+
+        self.formatter.format_dataframe_column(dataframe, 'population')
+
+        self.assertEqual(dataframe['population'].tolist(), ['1 500 000', '0', '42'])
+
+    def test_dataframe_to_columns(self):
+        """Проверяет выдачу данных графика по колонкам"""
+        dataframe = pd.DataFrame({'type': ['город', 'село'], 'population': [1000, 50], 'count': [1, 3]})
+
+        columns = self.formatter.dataframe_to_columns(dataframe, ['type', 'population'])
+
+        self.assertEqual(set(columns), {'type', 'population'})
+        self.assertEqual(columns['type'], ['город', 'село'])
+        self.assertIsInstance(columns['population'], np.ndarray)
+        self.assertEqual(json.loads(self.formatter.dict_to_json(columns)), {
+            'type': ['город', 'село'], 'population': [1000, 50]
+        })
+
+    def test_histogram_to_columns(self):
+        columns = self.formatter.histogram_to_columns([1, 10, 100], [0, 2, 0, 5])
+
+        self.assertEqual(columns, {'from': [1, 10, 100], 'to': [10, 100, None], 'count': [2, 0, 5]})
+
+
+class JsonBackendTestCase(SimpleTestCase):
+    data = {
+        'name': 'Волгоград',
+        'counts': np.array([1, 2, 3], dtype=np.int64),
+        'share': np.float64(0.5),
+        'rows': [{'population': np.int64(1000), 'to': None}],
+    }
+
+    def test_stdlib_backend_serializes_numpy(self):
+        self.assertEqual(json.loads(json_dumps(self.data)), {
+            'name': 'Волгоград', 'counts': [1, 2, 3], 'share': 0.5, 'rows': [{'population': 1000, 'to': None}]
+        })
+
+    @skipIf(orjson is None, 'orjson не установлен')
+    def test_backends_produce_same_json(self):
+        self.assertEqual(
+            json.loads(DataFormatter('orjson').dict_to_json(self.data)),
+            json.loads(DataFormatter('json').dict_to_json(self.data)),
+        )
+
+    def test_backend_selected_by_setting(self):
+        with override_settings(SETTLEMENTS_JSON_BACKEND='json'):
+            self.assertIs(DataFormatter().json_dumps, json_dumps)
+
+        self.assertIs(get_json_backend('auto'), get_json_backend('orjson' if orjson else 'json'))
+
+    def test_unknown_backend_raises(self):
+        with self.assertRaises(ImproperlyConfigured):
+            DataFormatter('ujson')
@@ -0,0 +1,115 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+
+from settlements import db_router
+from settlements.db_router import ReplicaRouter, read_replica, use_primary, use_replica
+from settlements.facades import StatisticsFacade
+from settlements.models import Region, Municipality, Settlement
+
+REPLICA = getattr(settings, 'SETTLEMENTS_READ_REPLICA', None) or 'replica'
+
+
+def separate_replica():
+    """Реплика настроена отдельной тестовой БД, а не зеркалом основной"""
+    replica = settings.DATABASES.get(REPLICA)
+    return replica is not None and not replica.get('TEST', {}).get('MIRROR')
+
+
+class ReplicaRouterTestCase(SimpleTestCase):
+    def test_without_replica_routing_is_unchanged(self):
+        """Проверяет, что без реплики чтения идут в БД по умолчанию"""
+        with override_settings(SETTLEMENTS_READ_REPLICA=None):
+            self.assertIsNone(read_replica())
+            self.assertIsNone(ReplicaRouter().db_for_read(Settlement))
+
+        self.assertEqual(ReplicaRouter().db_for_write(Settlement), DEFAULT_DB_ALIAS)
+
+    def test_unknown_alias_is_ignored(self):
+        """Проверяет, что псевдоним, которого нет в DATABASES, не используется"""
+        with override_settings(SETTLEMENTS_READ_REPLICA='missing'):
+            self.assertIsNone(read_replica())
+
+    @mock.patch.object(db_router, 'read_replica', return_value=REPLICA)
+    def test_only_facade_reads_go_to_replica(self, read_replica_mock):
+        """Проверяет, что на реплику идут только чтения внутри use_replica вне транзакции"""
+        router = ReplicaRouter()
+
+        self.assertIsNone(router.db_for_read(Settlement))
+
+        with use_replica():
+            self.assertEqual(router.db_for_read(Settlement), REPLICA)
+
+            with use_primary():
+                self.assertIsNone(router.db_for_read(Settlement))
+
+            with mock.patch.object(connections[DEFAULT_DB_ALIAS], 'in_atomic_block', True):
+                self.assertIsNone(router.db_for_read(Settlement))
+
+    def test_relations_between_primary_and_replica(self):
+        """Проверяет, что связи между объектами основной БД и реплики разрешены"""
+        region = Region(name='Волгоградская область')
+        municipality = Municipality(name='Волгоград')
+        region._state.db = municipality._state.db = DEFAULT_DB_ALIAS
+
+        self.assertTrue(ReplicaRouter().allow_relation(region, municipality))
+
+        municipality._state.db = 'other'
+        self.assertIsNone(ReplicaRouter().allow_relation(region, municipality))
+
+
+@skipUnless(separate_replica(), 'Нужна отдельная БД реплики (DATABASES["replica"] без TEST MIRROR)')
+class TwoDatabasesRoutingTestCase(TransactionTestCase):
+    """
+    Основная БД и реплика — две разные локальные БД с разными данными.
+    TransactionTestCase: внутри транзакции TestCase роутер не читает с реплики.
+
+    Запуск: реплика с отдельной тестовой БД, например
+        DB_REPLICA_NAME=settlements_db DB_REPLICA_TEST_NAME=test_settlements_replica \\
+            python manage.py test settlements.tests.test_db_router
+    """
+    # Без реплики класс пропускается, но тестовый раннер всё равно проверяет его БД
+    databases = {DEFAULT_DB_ALIAS, REPLICA} if separate_replica() else {DEFAULT_DB_ALIAS}
+
+    def setUp(self):
+        for alias, population in [(DEFAULT_DB_ALIAS, 1000), (REPLICA, 500)]:
+            region = Region.objects.using(alias).create(name='Волгоградская область')
+            municipality = Municipality.objects.using(alias).create(name='Волгоград', region=region)
+            Settlement.objects.using(alias).create(
+                name='Волгоград', municipality=municipality, type='город', population=population
+            )
+
+    def test_replica_is_used_for_reads(self):
+        """Проверяет, что фасад читает с реплики, а внутри use_primary — с основной БД"""
+        self.assertEqual(read_replica(), REPLICA)
+
+        replica_stats = StatisticsFacade().get_population_stats()
+        with use_primary():
+            primary_stats = StatisticsFacade().get_population_stats()
+
+        self.assertEqual(replica_stats['total'], '500')
+        self.assertEqual(primary_stats['total'], '1 000')
+
+    def test_other_reads_use_primary(self):
+        """Проверяет, что чтения вне фасада идут на основную БД"""
+        self.assertEqual(Settlement.objects.get().population, 1000)
+
+    def test_import_writes_to_primary(self):
+        """Проверяет, что import_data пишет в основную БД, а реплику не трогает"""
+        with tempfile.TemporaryDirectory() as directory:
+            csv_path = os.path.join(directory, 'settlements.csv')
+            with open(csv_path, 'w', encoding='utf-8') as f:
+                f.write('region,municipality,settlement,type,population\n'
+                        'Волгоградская область,Волгоград,Ерзовка,с,8000\n')
+
+            call_command('import_data', csv_path, stdout=StringIO())
+
+        self.assertEqual(Settlement.objects.using(DEFAULT_DB_ALIAS).count(), 2)
+        self.assertEqual(Settlement.objects.using(REPLICA).count(), 1)
+        self.assertEqual(Municipality.objects.using(DEFAULT_DB_ALIAS).count(), 1)
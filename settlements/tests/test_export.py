@@ -0,0 +1,116 @@
+import csv
+import io
+import os
+import tempfile
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from settlements.models import Region, Municipality, Settlement
+from settlements.services import SettlementExporter
+from settlements.services.settlement_export import pq
+
+
+class SettlementExportTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        region = Region.objects.create(name='Волгоградская область')
+        volgograd = Municipality.objects.create(name='Волгоград', region=region)
+        kamyshin = Municipality.objects.create(name='Камышин', region=region)
+        krasnodar = Municipality.objects.create(
+            name='Краснодар', region=Region.objects.create(name='Краснодарский край')
+        )
+
+        for name, municipality, settlement_type, population in [
+            ('Волгоград', volgograd, 'город', 1000000),
+            ('Старая Полтавка', volgograd, 'село', 5000),
+            ('Урочище', volgograd, 'село', None),
+            ('Камышин', kamyshin, 'город', 100000),
+            ('Краснодар', krasnodar, 'город', 900000),
+        ]:
+            Settlement.objects.create(
+                name=name, municipality=municipality, type=settlement_type, population=population
+            )
+
+        cls.url = reverse('settlements:api_export')
+
+    def read_csv(self, response):
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode('utf-8')
+        return list(csv.DictReader(io.StringIO(content)))
+
+    def test_csv_export_with_filters(self):
+        """Проверяет CSV-выгрузку с фильтрами по региону, муниципалитету, типу и названию"""
+        rows = self.read_csv(self.client.get(self.url))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0], {
+            'region': 'Волгоградская область', 'municipality': 'Волгоград',
+            'name': 'Волгоград', 'type': 'город', 'population': '1000000',
+        })
+        self.assertEqual(rows[2]['population'], '')
+
+        region = self.read_csv(self.client.get(self.url, {'region': 'Волгоградская область', 'type': 'город'}))
+        self.assertEqual([row['name'] for row in region], ['Волгоград', 'Камышин'])
+
+        municipality = self.read_csv(self.client.get(self.url, {
+            'region': 'Волгоградская область', 'municipality': 'Волгоград', 'search': 'полт',
+        }))
+        self.assertEqual([row['name'] for row in municipality], ['Старая Полтавка'])
+
+    def test_export_headers_and_errors(self):
+        """Проверяет заголовки ответа, неизвестный формат и несуществующий муниципалитет"""
+        response = self.client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('settlements.csv', response['Content-Disposition'])
+
+        self.assertEqual(self.client.get(self.url, {'format': 'xlsx'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'municipality': 'Волгоград'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {
+            'region': 'Краснодарский край', 'municipality': 'Волгоград',
+        }).status_code, 404)
+
+    def test_rows_are_streamed_in_chunks(self):
+        """Проверяет, что строки кодируются частями по мере чтения, а не целиком"""
+        consumed = []
+
+        def rows():
+            for number in range(5):
+                consumed.append(number)
+                yield 'Регион', 'МО', f'НП {number}', 'село', number
+
+        chunks = SettlementExporter(chunk_size=2).stream(rows())
+
+        self.assertIn(b'region,municipality', next(chunks))
+        self.assertEqual(consumed, [0, 1])
+        self.assertEqual(len(list(chunks)), 2)
+
+    def test_export_command(self):
+        """Проверяет команду export_settlements"""
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'krasnodar.csv')
+            out = io.StringIO()
+            call_command('export_settlements', output, region='Краснодарский край', stdout=out)
+
+            with open(output, encoding='utf-8') as f:
+                rows = list(csv.DictReader(f))
+
+        self.assertEqual([row['name'] for row in rows], ['Краснодар'])
+        self.assertIn('Выгружено 1 поселений', out.getvalue())
+
+    @skipUnless(pq is not None, 'Нужен pyarrow')
+    def test_parquet_export(self):
+        """Проверяет Parquet-выгрузку группами строк"""
+        response = self.client.get(self.url, {'format': 'parquet'})
+        self.assertEqual(response['Content-Type'], 'application/vnd.apache.parquet')
+
+        table = pq.read_table(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(table.column_names, ['region', 'municipality', 'name', 'type', 'population'])
+        self.assertEqual(table.column('population').to_pylist(), [1000000, 5000, None, 100000, 900000])
+
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'settlements.parquet')
+            call_command('export_settlements', output, row_group_size=2, stdout=io.StringIO())
+
+            self.assertEqual(pq.ParquetFile(output).metadata.num_row_groups, 3)
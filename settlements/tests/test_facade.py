@@ -1,8 +1,10 @@
+from django.db.models import Count, Q, Sum
 from django.test import TestCase
 import pandas as pd
 
 from settlements.facades import StatisticsFacade
-from settlements.services import DataProcessor
+from settlements.models import Region, Municipality, Settlement
+from settlements.services import DataFetcher, DataProcessor
 
 
 class DataProcessorUnitTestCase(TestCase):
@@ -98,4 +100,110 @@ class FacadeSimpleUnitTestCase(TestCase):
         self.assertEqual(stats['max'], 300)
         self.assertEqual(stats['total'], 600)
         self.assertEqual(stats['median'], 200)
-        self.assertEqual(stats['mean'], 200)
\ No newline at end of file
+        self.assertEqual(stats['mean'], 200)
+
+
+class FacadeFetchMemoizationTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        region = Region.objects.create(name='Волгоградская область')
+        mun1 = Municipality.objects.create(name='Волгоград', region=region)
+        mun2 = Municipality.objects.create(name='Камышин', region=region)
+
+        Settlement.objects.create(name='Волгоград', municipality=mun1, type='город', population=1000000)
+        Settlement.objects.create(name='Старая Полтавка', municipality=mun1, type='село', population=5000)
+        Settlement.objects.create(name='Камышин', municipality=mun2, type='город', population=100000)
+
+    def test_stats_page_scans_settlements_once(self):
+        """Проверяет, что главная страница читает все поселения один раз"""
+        facade = StatisticsFacade(engine='pandas')
+
+        # Версия данных, агрегаты регионов и одна полная выборка поселений
+        with self.assertNumQueries(3):
+            top_regions = facade.get_top_regions()
+            population_stats = facade.get_population_stats()
+
+        self.assertEqual(top_regions[0]['population'], '1 105 000')
+        self.assertEqual(population_stats['total'], '1 105 000')
+
+    def test_region_page_scans_region_once(self):
+        """Проверяет, что страница региона читает поселения региона один раз"""
+        facade = StatisticsFacade(engine='pandas')
+
+        # Версия данных, агрегаты муниципалитетов и одна выборка поселений региона
+        with self.assertNumQueries(3):
+            facade.get_population_stats_by_region('Волгоградская область')
+            municipalities = facade.get_municipalities_by_region('Волгоградская область')
+
+        self.assertEqual(len(municipalities), 2)
+
+    def test_memoization_is_scoped_to_facade_instance(self):
+        """Проверяет, что разные экземпляры фасада не делят выборки"""
+        first = StatisticsFacade()
+        second = StatisticsFacade()
+
+        self.assertIsNot(
+            first.fetcher.fetch_settlements_by_region('Волгоградская область'),
+            second.fetcher.fetch_settlements_by_region('Волгоградская область'),
+        )
+        self.assertIs(
+            first.fetcher.fetch_settlements_by_region('Волгоградская область'),
+            first.fetcher.fetch_settlements_by_region('Волгоградская область'),
+        )
+
+
+class BatchedCountsTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        region = Region.objects.create(name='Волгоградская область')
+        Region.objects.create(name='Краснодарский край')
+        mun1 = Municipality.objects.create(name='Волгоград', region=region)
+        mun2 = Municipality.objects.create(name='Камышин', region=region)
+
+        Settlement.objects.create(name='Волгоград', municipality=mun1, type='город', population=1000000)
+        Settlement.objects.create(name='Урочище', municipality=mun1, type='село', population=0)
+        Settlement.objects.create(name='Камышин', municipality=mun2, type='город', population=100000)
+
+    def setUp(self):
+        self.facade = StatisticsFacade(engine='pandas')
+        self.facade.result_cache.load_version()
+
+    def test_fetch_scalars(self):
+        """Проверяет условные агрегаты и подзапросы в одном запросе"""
+        with self.assertNumQueries(1):
+            counts = DataFetcher.fetch_scalars(
+                Settlement.objects.filter(type='город'),
+                subqueries={'regions': (Region.objects.all(), Count('id'))},
+                total=Count('id'),
+                populated=Count('id', filter=Q(population__gt=500000)),
+                population=Sum('population'),
+            )
+
+        self.assertEqual(counts, {'total': 2, 'populated': 1, 'population': 1100000, 'regions': 2})
+
+        empty = DataFetcher.fetch_scalars(Settlement.objects.filter(type='хутор'), population=Sum('population'))
+        self.assertEqual(empty, {'population': 0})
+
+    def test_general_stats_without_aggregates(self):
+        """Проверяет, что без агрегатов счётчики главной читаются одним запросом"""
+        # Попытка чтения агрегатов и один запрос к исходным таблицам
+        with self.assertNumQueries(2):
+            stats = self.facade.get_general_stats()
+
+        self.assertEqual(stats, {
+            'regions': 2,
+            'municipalities': 2,
+            'settlements': 3,
+            'empty_settlements': 1,
+            'populated_settlements': 2,
+        })
+
+        self.assertNotIn('regions', self.facade.get_general_stats('Краснодарский край'))
+        self.assertEqual(self.facade.get_general_stats('Краснодарский край')['municipalities'], 0)
+
+    def test_municipality_general_stats_single_query(self):
+        """Проверяет, что счётчики муниципалитета читаются одним запросом"""
+        with self.assertNumQueries(1):
+            stats = self.facade.get_municipality_general_stats('Волгоградская область', 'Волгоград')
+
+        self.assertEqual(stats, {'settlements': 2, 'empty_settlements': 1, 'populated_settlements': 1})
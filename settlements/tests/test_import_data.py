@@ -0,0 +1,175 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+import pandas as pd
+from django.core.management import call_command
+from django.test import TestCase
+
+from settlements.benchmarks import ImportBenchmark
+from settlements.management.commands.import_data import get_categories, get_category
+from settlements.models import Region, Municipality, Settlement, RegionAggregate
+from settlements.services import get_dataset_version
+
+CSV_CONTENT = """region,municipality,settlement,type,population
+Волгоградская область,Волгоград,Волгоград,г,1000000
+Волгоградская область,Волгоград,Старая Полтавка,с,5000
+Волгоградская область,Камышин,Камышин,г,100000
+Краснодарский край,Краснодар,Краснодар,г,500000
+Краснодарский край,Краснодар,Пашковский,неизвестный,0
+"""
+
+
+class ImportDataCommandTestCase(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.tmpdir, 'settlements.csv')
+
+        with open(self.csv_path, 'w', encoding='utf-8') as f:
+            f.write(CSV_CONTENT)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def run_import(self, *args, **options):
+        out = StringIO()
+        call_command('import_data', self.csv_path, *args, stdout=out, **options)
+        return out.getvalue()
+
+    def test_import_creates_objects(self):
+        """Проверяет загрузку регионов, муниципалитетов и поселений"""
+        self.run_import()
+
+        self.assertEqual(Region.objects.count(), 2)
+        self.assertEqual(Municipality.objects.count(), 3)
+        self.assertEqual(Settlement.objects.count(), 5)
+
+        village = Settlement.objects.get(name='Старая Полтавка')
+        self.assertEqual(village.type, 'Село')
+        self.assertEqual(Settlement.objects.get(name='Пашковский').type, 'Прочее')
+
+    def test_import_rebuilds_aggregates(self):
+        """Проверяет пересчёт агрегатов в конце импорта"""
+        self.run_import()
+
+        aggregate = RegionAggregate.objects.get(region__name='Краснодарский край')
+        self.assertEqual(aggregate.population, 500000)
+        self.assertEqual(aggregate.empty_settlements, 1)
+
+    def test_import_bumps_dataset_version(self):
+        """Проверяет смену версии данных при каждом импорте"""
+        self.assertIsNone(get_dataset_version())
+
+        self.run_import()
+        self.assertEqual(get_dataset_version().version, 1)
+
+        self.run_import()
+        self.assertEqual(get_dataset_version().version, 2)
+
+    def test_streaming_import_matches_in_memory_import(self):
+        """Проверяет, что потоковый импорт загружает те же данные"""
+        self.run_import()
+        expected = sorted(Settlement.objects.values_list(
+            'municipality__region__name', 'municipality__name', 'name', 'type', 'population'
+        ))
+
+        Region.objects.all().delete()
+
+        output = self.run_import('--stream', '--chunk-size', '2')
+        actual = sorted(Settlement.objects.values_list(
+            'municipality__region__name', 'municipality__name', 'name', 'type', 'population'
+        ))
+
+        self.assertEqual(actual, expected)
+        self.assertEqual(Municipality.objects.count(), 3)
+        self.assertIn('строк/с', output)
+
+    def test_get_categories_matches_get_category(self):
+        """Проверяет векторную классификацию типов НП"""
+        types = pd.Series(['г', 'пгт', 'с', 'д.', 'рзд', 'неизвестный', None])
+
+        self.assertEqual(
+            list(get_categories(types)),
+            [get_category(settlement_type) for settlement_type in types]
+        )
+
+    def test_copy_engine_matches_orm_engine(self):
+        """Проверяет загрузку через COPY, в том числе через временную таблицу"""
+        self.run_import()
+        expected = sorted(Settlement.objects.values_list(
+            'municipality__region__name', 'municipality__name', 'name', 'type', 'population'
+        ))
+
+        for options in ({'engine': 'copy'}, {'engine': 'copy', 'staging': True, 'stream': True}):
+            with self.subTest(**options):
+                Region.objects.all().delete()
+
+                output = self.run_import(**options)
+                actual = sorted(Settlement.objects.values_list(
+                    'municipality__region__name', 'municipality__name', 'name', 'type', 'population'
+                ))
+
+                self.assertEqual(actual, expected)
+                self.assertIn('Загружено через COPY: 5', output)
+
+    def test_import_benchmark_leaves_database_untouched(self):
+        """Проверяет, что замер движков откатывает загруженные данные"""
+        results = ImportBenchmark(self.csv_path, engines=('orm', 'copy')).run()
+
+        self.assertEqual(results['orm']['rows'], 5)
+        self.assertEqual(results['copy']['rows'], 5)
+        self.assertFalse(Settlement.objects.exists())
+
+    def test_repeated_append_import_does_not_duplicate(self):
+        """Проверяет, что повторный импорт не дублирует поселения"""
+        self.run_import()
+        self.run_import()
+
+        self.assertEqual(Settlement.objects.count(), 5)
+
+    def test_incremental_import_writes_only_changes(self):
+        """Проверяет вставку, обновление и удаление в инкрементальном режиме"""
+        self.run_import()
+        untouched = Settlement.objects.get(name='Волгоград')
+
+        with open(self.csv_path, 'w', encoding='utf-8') as f:
+            f.write(
+                "region,municipality,settlement,type,population\n"
+                "Волгоградская область,Волгоград,Волгоград,г,1000000\n"
+                "Волгоградская область,Волгоград,Старая Полтавка,с,5200\n"
+                "Волгоградская область,Камышин,Камышин,г,100000\n"
+                "Волгоградская область,Камышин,Петров Вал,г,12000\n"
+                "Краснодарский край,Краснодар,Краснодар,г,500000\n"
+            )
+
+        output = self.run_import('--mode', 'incremental')
+
+        self.assertIn('Добавлено: 1, обновлено: 1, удалено: 1, без изменений: 3', output)
+        self.assertEqual(Settlement.objects.count(), 5)
+        self.assertEqual(Settlement.objects.get(name='Старая Полтавка').population, 5200)
+        self.assertFalse(Settlement.objects.filter(name='Пашковский').exists())
+        self.assertEqual(Settlement.objects.get(name='Волгоград').pk, untouched.pk)
+        self.assertEqual(get_dataset_version().version, 2)
+
+    def test_incremental_import_counts_duplicates_separately(self):
+        """Проверяет, что повтор ключа в файле не считается обновлением и не меняет данные"""
+        self.run_import()
+
+        with open(self.csv_path, 'a', encoding='utf-8') as f:
+            f.write("Волгоградская область,Волгоград,Волгоград,г,1\n")
+
+        output = self.run_import('--mode', 'incremental')
+
+        self.assertIn('обновлено: 0, удалено: 0, без изменений: 5', output)
+        self.assertIn('Повторов поселений в файле: 1', output)
+        self.assertEqual(Settlement.objects.get(name='Волгоград').population, 1000000)
+
+    def test_incremental_import_without_changes_keeps_version(self):
+        """Проверяет, что неизменный файл не сбрасывает кэш"""
+        self.run_import()
+
+        output = self.run_import('--mode', 'incremental')
+
+        self.assertIn('Изменений нет', output)
+        self.assertEqual(get_dataset_version().version, 1)
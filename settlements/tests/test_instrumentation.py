@@ -0,0 +1,155 @@
+import asyncio
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.handlers.asgi import ASGIHandler
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from settlements.facades import StatisticsFacade
+from settlements.instrumentation import InstrumentationMiddleware, Measurement, measure
+from settlements.metrics import REGISTRY, Histogram, MetricsRegistry
+from settlements.models import Region, Municipality, Settlement
+
+
+def sample_value(name, **labels):
+    """Текущее значение метрики из общего реестра (0, если её ещё нет)"""
+    for metric in REGISTRY._metrics.values():
+        for sample_name, sample_labels, value in metric.samples():
+            if sample_name == name and dict(sample_labels) == labels:
+                return value
+
+    return 0
+
+
+class MetricsRegistryTestCase(TestCase):
+    def test_histogram_text_format(self):
+        """Проверяет накопительные интервалы гистограммы в формате Prometheus"""
+        registry = MetricsRegistry()
+        histogram = registry.register(Histogram('latency_seconds', 'Задержка', ['method'], buckets=(0.1, 1)))
+
+        histogram.observe(0.05, method='a')
+        histogram.observe(0.1, method='a')
+        histogram.observe(3, method='a')
+
+        text = registry.render()
+
+        self.assertIn('# TYPE latency_seconds histogram', text)
+        self.assertIn('latency_seconds_bucket{method="a",le="0.1"} 2', text)
+        self.assertIn('latency_seconds_bucket{method="a",le="1.0"} 2', text)
+        self.assertIn('latency_seconds_bucket{method="a",le="+Inf"} 3', text)
+        self.assertIn('latency_seconds_count{method="a"} 3', text)
+        self.assertIn('latency_seconds_sum{method="a"} 3.15', text)
+
+    def test_label_values_are_escaped(self):
+        """Проверяет экранирование кавычек в значениях меток"""
+        registry = MetricsRegistry()
+        registry.counter('calls_total', 'Вызовы', ['view']).inc(view='a"b')
+
+        self.assertIn('calls_total{view="a\\"b"} 1', registry.render())
+
+
+class InstrumentationTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        region = Region.objects.create(name='Волгоградская область')
+        municipality = Municipality.objects.create(name='Волгоград', region=region)
+
+        Settlement.objects.create(name='Волгоград', municipality=municipality, type='город', population=1000000)
+        Settlement.objects.create(name='Старая Полтавка', municipality=municipality, type='село', population=5000)
+
+    def test_measure_counts_queries_and_rows(self):
+        """Проверяет подсчёт запросов и строк, в том числе во вложенных замерах"""
+        with measure('outer') as outer:
+            list(Settlement.objects.all())
+
+            with measure('inner') as inner:
+                list(Settlement.objects.filter(type='город'))
+
+        self.assertEqual((outer.queries, outer.rows), (2, 3))
+        self.assertEqual((inner.queries, inner.rows), (1, 1))
+        self.assertGreater(outer.sql_seconds, 0)
+
+    def test_parallel_facade_time_is_not_summed(self):
+        """Проверяет, что перекрывающиеся вызовы фасада учитываются по настенному времени"""
+        scope = Measurement('request')
+
+        scope.add_facade_time(10.0, 12.0)
+        scope.add_facade_time(10.5, 11.5)
+        scope.add_facade_time(11.0, 13.0)
+        scope.add_facade_time(20.0, 21.0)
+
+        self.assertEqual(scope.facade_seconds, 4.0)
+
+    def test_facade_methods_record_metrics(self):
+        """Проверяет метрики метода фасада и компонентов обработки"""
+        method = 'get_municipality_settlements'
+        calls_before = sample_value('settlements_facade_duration_seconds_count', method=method)
+        rows_before = sample_value('settlements_facade_rows_total', method=method)
+
+        StatisticsFacade().get_municipality_settlements('Волгоградская область', 'Волгоград')
+
+        self.assertEqual(sample_value('settlements_facade_duration_seconds_count', method=method), calls_before + 1)
+        self.assertEqual(sample_value('settlements_facade_rows_total', method=method), rows_before + 2)
+
+        before = sample_value(
+            'settlements_component_duration_seconds_count', component='processor', method='calculate_statistics'
+        )
+        StatisticsFacade().get_municipality_population_stats('Волгоградская область', 'Волгоград')
+        after = sample_value(
+            'settlements_component_duration_seconds_count', component='processor', method='calculate_statistics'
+        )
+
+        self.assertEqual(after, before + 1)
+
+    def test_metrics_endpoint(self):
+        """Проверяет эндпоинт /metrics"""
+        self.client.get('/settlements/regions/Волгоградская область/')
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+
+        text = response.content.decode()
+        self.assertIn('settlements_request_duration_seconds_bucket{view="settlements:region"', text)
+        self.assertIn('settlements_facade_queries_total{method="get_general_stats"}', text)
+
+    @override_settings(SETTLEMENTS_SLOW_REQUEST_MS=1)
+    def test_slow_request_is_logged(self):
+        """Проверяет лог медленного запроса с разбивкой времени"""
+        with self.assertLogs('settlements.slow_requests', 'WARNING') as logs:
+            self.client.get('/settlements/regions/Волгоградская область/')
+
+        self.assertIn('Медленный запрос GET', logs.output[0])
+        self.assertIn('SQL:', logs.output[0])
+
+    @override_settings(SETTLEMENTS_SLOW_REQUEST_MS=0)
+    def test_slow_request_log_can_be_disabled(self):
+        """Проверяет, что нулевой порог отключает лог"""
+        with self.assertNoLogs('settlements.slow_requests', 'WARNING'):
+            self.client.get('/settlements/regions/Волгоградская область/')
+
+
+class AsyncMiddlewareTestCase(SimpleTestCase):
+    @override_settings(DEBUG=True)
+    def test_asgi_chain_is_not_adapted(self):
+        """Проверяет, что под ASGI цепочка middleware не переводится в синхронный режим"""
+        # С DEBUG Django пишет в django.request каждое переключение sync/async
+        with self.assertNoLogs('django.request', 'DEBUG'):
+            ASGIHandler()
+
+    @override_settings(SETTLEMENTS_SLOW_REQUEST_MS=1)
+    def test_async_request_is_measured(self):
+        """Проверяет, что асинхронный запрос замеряется и попадает в лог медленных"""
+        async def get_response(request):
+            await asyncio.sleep(0.005)
+            return HttpResponse()
+
+        middleware = InstrumentationMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        self.assertFalse(iscoroutinefunction(InstrumentationMiddleware(lambda request: HttpResponse())))
+
+        with self.assertLogs('settlements.slow_requests', 'WARNING') as logs:
+            response = async_to_sync(middleware)(RequestFactory().get('/settlements/'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Медленный запрос GET /settlements/', logs.output[0])
@@ -0,0 +1,96 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from settlements.models import Region, Municipality, Settlement
+from settlements.services import (
+    SettlementSearchIndex, SettlementSnapshot, get_dataset_version, get_search_index, normalize_name
+)
+
+
+class SettlementSearchTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        moscow_region = Region.objects.create(name='Московская область')
+        orel_region = Region.objects.create(name='Орловская область')
+
+        podolsk = Municipality.objects.create(name='Подольск', region=moscow_region)
+        orel = Municipality.objects.create(name='Орёл', region=orel_region)
+        mtsensk = Municipality.objects.create(name='Мценский район', region=orel_region)
+
+        for name, municipality, settlement_type, population in [
+            ('Москва', podolsk, 'город', 13000000),
+            ('Московский', podolsk, 'поселок', 80000),
+            ('Нижняя Москва', podolsk, 'деревня', 15),
+            ('Орёл', orel, 'город', 300000),
+            ('Орловка', mtsensk, 'деревня', 40),
+            ('Ореховка', mtsensk, 'деревня', None),
+            ('Старый Орёл', mtsensk, 'село', 1200),
+        ]:
+            Settlement.objects.create(
+                name=name, municipality=municipality, type=settlement_type, population=population
+            )
+
+        cls.url = reverse('settlements:api_search')
+
+    def setUp(self):
+        cache.clear()
+        self.index = SettlementSearchIndex(SettlementSnapshot.from_database())
+
+    def names(self, query, limit=20):
+        return [row['name'] for row in self.index.search(query, limit)]
+
+    def test_normalize_name(self):
+        """Проверяет нормализацию: регистр, ё и знаки препинания"""
+        self.assertEqual(normalize_name('  Старый  ОРЁЛ-2 '), 'старый орел 2')
+
+    def test_exact_and_prefix_matches_first(self):
+        """Проверяет порядок: точное совпадение, начало названия, начало слова"""
+        self.assertEqual(self.names('москва'), ['Москва', 'Нижняя Москва'])
+        self.assertEqual(self.names('моск')[:3], ['Москва', 'Московский', 'Нижняя Москва'])
+
+    def test_yo_is_the_same_as_ye(self):
+        """Проверяет, что ё и е не различаются ни в запросе, ни в названии"""
+        self.assertEqual(self.names('ОРЕЛ')[:2], ['Орёл', 'Старый Орёл'])
+        self.assertEqual(self.names('орёл'), self.names('орел'))
+
+    def test_fuzzy_match_with_typo(self):
+        """Проверяет нечёткое совпадение по триграммам"""
+        self.assertEqual(self.names('Масква')[0], 'Москва')
+        self.assertEqual(self.names('Аривховка'), [])
+        self.assertIn('Ореховка', self.names('Орехофка'))
+
+    def test_limit_and_location(self):
+        """Проверяет ограничение числа результатов, регион и муниципалитет"""
+        self.assertEqual(len(self.names('о', limit=2)), 2)
+
+        row = self.index.search('Орловка', 1)[0]
+        self.assertEqual(row['region'], 'Орловская область')
+        self.assertEqual(row['municipality'], 'Мценский район')
+        self.assertEqual(row['type'], 'деревня')
+
+        self.assertIsNone(self.index.search('Ореховка', 1)[0]['population'])
+
+    def test_search_endpoint(self):
+        """Проверяет эндпоинт поиска по всей стране"""
+        data = self.client.get(self.url, {'q': 'Моск', 'limit': 2}).json()
+
+        self.assertEqual(data['query'], 'Моск')
+        self.assertEqual([row['name'] for row in data['results']], ['Москва', 'Московский'])
+        self.assertEqual(data['results'][0]['region'], 'Московская область')
+
+        self.assertEqual(self.client.get(self.url).json()['results'], [])
+
+    def test_index_is_kept_before_first_import(self):
+        """Проверяет, что без версии данных индекс не перестраивается на каждый запрос"""
+        self.assertIsNone(get_dataset_version())
+
+        self.client.get(self.url, {'q': 'Моск'})
+        index = get_search_index()
+
+        # Снимок и индекс уже в памяти: версия данных для ETag и снимка и наибольший id
+        with self.assertNumQueries(3):
+            data = self.client.get(self.url, {'q': 'Орёл'}).json()
+
+        self.assertIs(get_search_index(), index)
+        self.assertEqual(data['results'][0]['name'], 'Орёл')
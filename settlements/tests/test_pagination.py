@@ -0,0 +1,142 @@
+from django.test import TestCase
+
+from settlements.facades import StatisticsFacade
+from settlements.models import Region, Municipality, Settlement
+from settlements.pagination import KeysetCursor
+
+
+class KeysetCursorTestCase(TestCase):
+    def test_round_trip(self):
+        """Проверяет кодирование и разбор курсора"""
+        self.assertEqual(KeysetCursor.decode(KeysetCursor.encode(1500, 42)), (1500, 42))
+        self.assertEqual(KeysetCursor.decode(KeysetCursor.encode(None, 7)), (None, 7))
+
+    def test_invalid_cursor(self):
+        """Проверяет, что некорректный курсор отклоняется"""
+        for cursor in ('', 'abc', '10', 'x:1', '1:y'):
+            with self.assertRaises(ValueError):
+                KeysetCursor.decode(cursor)
+
+
+class KeysetPaginationTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        region = Region.objects.create(name='Волгоградская область')
+        cls.municipality = Municipality.objects.create(name='Волгоград', region=region)
+
+        # Одинаковая численность у нескольких поселений и NULL проверяют порядок по id
+        populations = [5000, 300, 300, 300, 0, None, None, 120, 5000, 40, 300]
+        for index, population in enumerate(populations):
+            Settlement.objects.create(
+                name=f'Поселение {index}',
+                municipality=cls.municipality,
+                type='село' if index % 2 else 'деревня',
+                population=population
+            )
+
+        cls.url = f'/settlements/regions/{region.name}/{cls.municipality.name}/'
+
+    def walk(self, page_size, **filters):
+        """Пройти все страницы по курсорам и вернуть id в порядке выдачи"""
+        facade = StatisticsFacade()
+        ids, after = [], None
+
+        while True:
+            page = facade.get_municipality_settlements_page(
+                'Волгоградская область', 'Волгоград', after=after, page_size=page_size, **filters
+            )
+            ids.extend(row['id'] for row in page['settlements'])
+            after = page['next_cursor']
+
+            if after is None:
+                return ids, page['total']
+
+    def test_pages_follow_offset_order(self):
+        """Проверяет, что обход по курсорам совпадает с полным упорядоченным списком"""
+        expected = list(
+            Settlement.objects.filter(municipality=self.municipality)
+            .order_by('-population', '-id').values_list('id', flat=True)
+        )
+
+        for page_size in (1, 3, 4, 20):
+            with self.subTest(page_size=page_size):
+                ids, total = self.walk(page_size)
+                self.assertEqual(ids, expected)
+                self.assertEqual(total, len(expected))
+
+    def test_previous_pages_mirror_next_pages(self):
+        """Проверяет, что обход назад по курсорам ?before= возвращает те же страницы"""
+        for engine in ('pandas', 'snapshot'):
+            for page_size in (1, 3, 4):
+                with self.subTest(engine=engine, page_size=page_size):
+                    facade = StatisticsFacade(engine)
+                    pages, after = [], None
+
+                    while True:
+                        page = facade.get_municipality_settlements_page(
+                            'Волгоградская область', 'Волгоград', after=after, page_size=page_size
+                        )
+                        pages.append(page)
+                        after = page['next_cursor']
+                        if after is None:
+                            break
+
+                    self.assertIsNone(pages[0]['previous_cursor'])
+
+                    for previous, page in zip(pages, pages[1:]):
+                        back = facade.get_municipality_settlements_page(
+                            'Волгоградская область', 'Волгоград', before=page['previous_cursor'], page_size=page_size
+                        )
+
+                        self.assertEqual(back['settlements'], previous['settlements'])
+                        self.assertEqual(back['previous_cursor'], previous['previous_cursor'])
+                        self.assertEqual(back['next_cursor'], previous['next_cursor'])
+
+    def test_pages_respect_filters(self):
+        """Проверяет курсорную пагинацию вместе с фильтром по типу"""
+        ids, total = self.walk(2, settlement_type='село')
+
+        self.assertEqual(total, 5)
+        self.assertEqual(
+            set(ids),
+            set(Settlement.objects.filter(type='село').values_list('id', flat=True))
+        )
+
+    def test_page_query_count_does_not_depend_on_position(self):
+        """Проверяет, что страница читается одним запросом плюс подсчёт"""
+        facade = StatisticsFacade()
+        facade.result_cache.load_version()
+        first = facade.get_municipality_settlements_page('Волгоградская область', 'Волгоград', page_size=3)
+
+        with self.assertNumQueries(2):
+            facade.get_municipality_settlements_page(
+                'Волгоградская область', 'Волгоград', after=first['next_cursor'], page_size=3
+            )
+
+    def test_view_next_link(self):
+        """Проверяет ссылку на следующую страницу и переход по ней"""
+        response = self.client.get(self.url)
+        page_obj = response.context['page_obj']
+
+        self.assertEqual(len(page_obj), 11)
+        self.assertFalse(page_obj.has_other_pages())
+
+        response = self.client.get(self.url, {'after': KeysetCursor.encode(300, 0)})
+        page_obj = response.context['page_obj']
+
+        self.assertTrue(page_obj.has_previous())
+        self.assertTrue(all(row['population'] is not None and row['population'] < 300 for row in page_obj))
+        self.assertContains(response, 'В начало')
+        self.assertContains(response, '?before=')
+
+    def test_view_invalid_cursor_shows_first_page(self):
+        """Проверяет, что некорректный курсор открывает первую страницу без ссылок назад"""
+        for params in ({'after': 'мусор'}, {'before': '1:'}):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                page_obj = response.context['page_obj']
+
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(page_obj), 11)
+                self.assertFalse(page_obj.has_previous())
+                self.assertNotContains(response, 'В начало')
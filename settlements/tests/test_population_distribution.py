@@ -0,0 +1,64 @@
+import json
+
+from django.test import TestCase
+
+from settlements.facades import StatisticsFacade
+from settlements.models import Region, Municipality, Settlement
+from settlements.services import DataFormatter, DataProcessor, SqlDataProcessor, DataFetcher
+
+
+class PopulationHistogramTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        region = Region.objects.create(name='Волгоградская область')
+        municipality = Municipality.objects.create(name='Волгоград', region=region)
+
+        populations = [0, None, 1, 2, 9, 10, 11, 99, 100, 5000, 1000000]
+        for index, population in enumerate(populations):
+            Settlement.objects.create(
+                name=f'Поселение {index}', municipality=municipality, type='село', population=population
+            )
+
+    def test_edges_are_increasing_integers(self):
+        """Проверяет логарифмические границы интервалов"""
+        edges = DataProcessor.histogram_edges(4)
+
+        self.assertEqual(edges[0], 1)
+        self.assertEqual(edges[-1], 10 ** 8)
+        self.assertIn(10, edges)
+        self.assertEqual(edges, sorted(set(edges)))
+
+    def test_engines_produce_same_histogram(self):
+        """Проверяет, что NumPy и width_bucket дают одинаковые интервалы"""
+        edges = DataProcessor.histogram_edges(1)
+        data = DataFetcher().fetch_populated_settlements()
+
+        pandas_counts = DataProcessor().calculate_histogram(data, edges)
+        sql_counts = SqlDataProcessor().calculate_histogram(data, edges)
+
+        self.assertEqual(pandas_counts, sql_counts)
+        # [1, 10): 1, 2, 9; [10, 100): 10, 11, 99; [100, 1000): 100; [1000, 10000): 5000; [10^6, 10^7): 1000000
+        self.assertEqual(pandas_counts[:8], [0, 3, 3, 1, 1, 0, 0, 1])
+        self.assertEqual(sum(pandas_counts), 9)
+
+    def test_records_trim_empty_edges(self):
+        """Проверяет, что пустые крайние интервалы не передаются на страницу"""
+        records = DataFormatter().histogram_to_records([1, 10, 100], [0, 2, 0, 5])
+
+        self.assertEqual(records, [
+            {'from': 1, 'to': 10, 'count': 2},
+            {'from': 10, 'to': 100, 'count': 0},
+            {'from': 100, 'to': None, 'count': 5},
+        ])
+        self.assertEqual(DataFormatter().histogram_to_records([1, 10], [0, 0, 0]), [])
+
+    def test_facade_returns_bins_instead_of_rows(self):
+        """Проверяет компактный формат распределения населения"""
+        for engine in ('pandas', 'sql'):
+            with self.subTest(engine=engine):
+                bins = json.loads(StatisticsFacade(engine).get_population_distribution('Волгоградская область'))
+
+                self.assertEqual(set(bins), {'from', 'to', 'count'})
+                self.assertEqual(sum(bins['count']), 9)
+                self.assertEqual(bins['from'][0], 1)
+                self.assertEqual(len(bins['from']), len(bins['count']))
@@ -0,0 +1,174 @@
+import numpy as np
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from settlements.facades import StatisticsFacade
+from settlements.models import Region, Municipality, Settlement, MunicipalityAggregate, RegionAggregate
+from settlements.services import AggregateBuilder, DataProcessor, QuantileSketch
+from settlements.services.quantile_sketch import RELATIVE_ACCURACY
+
+
+def parse_number(value):
+    return int(value.replace(' ', ''))
+
+
+class QuantileSketchTestCase(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.values = np.maximum(rng.lognormal(5, 2, 20001).round().astype(np.int64), 1)
+
+    def test_quantiles_within_relative_accuracy(self):
+        """Проверяет, что оценки квантилей отличаются от точных не больше чем на α"""
+        sketch = QuantileSketch.from_values(self.values)
+        ordered = np.sort(self.values)
+
+        for q in (0, 0.01, 0.25, 0.5, 0.9, 0.99, 0.999, 1):
+            with self.subTest(q=q):
+                exact = ordered[int(np.floor(q * (len(ordered) - 1)))]
+                self.assertLessEqual(abs(sketch.quantile(q) - exact), RELATIVE_ACCURACY * exact)
+
+        self.assertEqual(sketch.quantile(0), ordered[0])
+        self.assertEqual(sketch.quantile(1), ordered[-1])
+
+    def test_merge_equals_sketch_of_union(self):
+        """Проверяет, что слияние скетчей частей совпадает со скетчем всех значений"""
+        parts = [QuantileSketch.from_values(part) for part in np.array_split(self.values, 7)]
+        expected = QuantileSketch.from_values(self.values)
+
+        for merged in (QuantileSketch.merge(parts), QuantileSketch.merge(parts[::-1] + [QuantileSketch()])):
+            self.assertEqual(merged.offset, expected.offset)
+            np.testing.assert_array_equal(merged.counts, expected.counts)
+            self.assertEqual(
+                (merged.total, merged.minimum, merged.maximum),
+                (expected.total, expected.minimum, expected.maximum)
+            )
+
+    def test_approximate_statistics(self):
+        """Проверяет приближённый режим calculate_statistics"""
+        processor = DataProcessor()
+        sketch = QuantileSketch.from_values(self.values)
+
+        exact = processor.calculate_statistics(list(self.values), percentiles=(90, 99))
+        approximate = processor.calculate_statistics(sketch, approximate=True, percentiles=(90, 99))
+
+        self.assertEqual(set(approximate), {'mean', 'median', 'max', 'min', 'total', 'p90', 'p99'})
+        for key in ('mean', 'max', 'min', 'total'):
+            self.assertEqual(approximate[key], exact[key])
+        for key in ('median', 'p90', 'p99'):
+            self.assertLessEqual(abs(approximate[key] - exact[key]), RELATIVE_ACCURACY * exact[key] + 1)
+
+        self.assertEqual(QuantileSketch().statistics((90,)), {
+            'mean': 0, 'median': 0, 'max': 0, 'min': 0, 'total': 0, 'p90': 0
+        })
+
+
+class SettlementPopulationStatsTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        rng = np.random.default_rng(1)
+
+        settlements = []
+        for region_index in range(2):
+            region = Region.objects.create(name=f'Регион {region_index}')
+
+            for municipality_index in range(3):
+                municipality = Municipality.objects.create(name=f'Район {municipality_index}', region=region)
+                population = rng.lognormal(5 + municipality_index, 1.5, 400).round().astype(int)
+
+                settlements += [
+                    Settlement(name=f'НП {index}', type='село', municipality=municipality,
+                               population=None if index % 50 == 0 else int(value))
+                    for index, value in enumerate(population)
+                ]
+
+        Settlement.objects.bulk_create(settlements)
+        AggregateBuilder().rebuild()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_import_builds_municipality_sketches(self):
+        """Проверяет скетчи, построенные в БД при пересчёте агрегатов"""
+        for aggregate in MunicipalityAggregate.objects.all():
+            population = np.array(
+                Settlement.objects.filter(municipality_id=aggregate.municipality_id, population__gt=0)
+                .values_list('population', flat=True)
+            )
+            expected = QuantileSketch.from_values(population)
+
+            self.assertEqual(aggregate.sketch_offset, expected.offset)
+            self.assertEqual(aggregate.sketch_counts, expected.counts.tolist())
+            self.assertEqual((aggregate.population_min, aggregate.population_max), (expected.minimum, expected.maximum))
+
+    def test_region_sketches_merge_municipality_sketches(self):
+        """Проверяет, что скетч региона — слияние скетчей его муниципалитетов"""
+        for aggregate in RegionAggregate.objects.all():
+            expected = QuantileSketch.merge([
+                QuantileSketch(municipality.sketch_offset, municipality.sketch_counts)
+                for municipality in MunicipalityAggregate.objects.filter(municipality__region_id=aggregate.region_id)
+            ])
+
+            self.assertEqual(aggregate.sketch_offset, expected.offset)
+            self.assertEqual(aggregate.sketch_counts, expected.counts.tolist())
+
+    def test_approximate_matches_exact_within_accuracy(self):
+        """Проверяет приближённые медиану и перцентили страны и региона во всех движках"""
+        for region_name in (None, 'Регион 1'):
+            settlements = Settlement.objects.filter(population__gt=0)
+            if region_name:
+                settlements = settlements.filter(municipality__region__name=region_name)
+            ordered = np.sort(np.array(settlements.values_list('population', flat=True)))
+
+            for engine in ('pandas', 'sql', 'snapshot'):
+                with self.subTest(engine=engine, region=region_name):
+                    facade = StatisticsFacade(engine)
+
+                    exact = facade.get_settlement_population_stats(region_name, approximate=False)
+                    approximate = facade.get_settlement_population_stats(region_name)
+
+                    self.assertEqual(set(approximate), {'mean', 'median', 'max', 'min', 'total', 'p90', 'p99'})
+                    self.assertEqual(approximate['total'], exact['total'])
+
+                    # Точный перцентиль интерполирует между соседними по рангу значениями,
+                    # оценка скетча отличается от нижнего из них не больше чем на α
+                    for key, q in (('median', 0.5), ('p90', 0.9), ('p99', 0.99)):
+                        rank = q * (len(ordered) - 1)
+                        lower, upper = ordered[int(np.floor(rank))], ordered[int(np.ceil(rank))]
+                        value = parse_number(approximate[key])
+
+                        self.assertGreaterEqual(value, int(lower * (1 - RELATIVE_ACCURACY)))
+                        self.assertLessEqual(value, upper * (1 + RELATIVE_ACCURACY))
+                        self.assertTrue(lower <= parse_number(exact[key]) <= upper)
+
+    def test_snapshot_engine_uses_exact_percentiles(self):
+        """Проверяет, что движок snapshot считает перцентили точно, без скетча"""
+        facade = StatisticsFacade('snapshot')
+
+        self.assertIsNone(facade.fetcher.fetch_population_sketch('Регион 1'))
+        self.assertEqual(
+            facade.get_settlement_population_stats('Регион 1'),
+            facade.get_settlement_population_stats('Регион 1', approximate=False)
+        )
+
+    def test_approximate_mode_does_not_read_settlements(self):
+        """Проверяет, что приближённая статистика страны читает только агрегаты"""
+        with CaptureQueriesContext(connection) as queries:
+            stats = StatisticsFacade('pandas').get_settlement_population_stats(percentiles=(50, 75))
+
+        self.assertIn('p75', stats)
+        for query in queries:
+            self.assertNotIn(f'"{Settlement._meta.db_table}"', query['sql'])
+
+    def test_aggregates_without_sketches_fall_back_to_exact(self):
+        """Проверяет, что агрегаты, построенные до скетчей, не дают нулевую статистику"""
+        exact = StatisticsFacade('pandas').get_settlement_population_stats(approximate=False)
+
+        # Так выглядят строки агрегатов сразу после миграции 0007 без пересчёта
+        MunicipalityAggregate.objects.update(sketch_counts=[], population_min=None, population_max=None)
+        RegionAggregate.objects.update(sketch_counts=[], population_min=None, population_max=None)
+
+        self.assertIsNone(StatisticsFacade('pandas').fetcher.fetch_population_sketch())
+        self.assertIsNone(StatisticsFacade('pandas').fetcher.fetch_population_sketch('Регион 1'))
+        self.assertEqual(StatisticsFacade('pandas').get_settlement_population_stats(), exact)
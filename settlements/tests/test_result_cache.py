@@ -0,0 +1,77 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from settlements.facades import StatisticsFacade
+from settlements.models import Region, Municipality, Settlement
+from settlements.services import bump_dataset_version
+
+
+class ResultCacheTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.region = Region.objects.create(name='Волгоградская область')
+        cls.municipality = Municipality.objects.create(name='Волгоград', region=cls.region)
+
+        Settlement.objects.create(name='Волгоград', municipality=cls.municipality, type='город', population=1000000)
+        Settlement.objects.create(name='Старая Полтавка', municipality=cls.municipality, type='село', population=5000)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cache_is_bypassed_without_dataset_version(self):
+        """Проверяет, что до первого импорта кэш не используется"""
+        # Каждый экземпляр читает версию данных и выполняет выборку сам
+        with self.assertNumQueries(4):
+            StatisticsFacade().get_settlement_types('Волгоградская область', 'Волгоград')
+            StatisticsFacade().get_settlement_types('Волгоградская область', 'Волгоград')
+
+    def test_version_is_loaded_once(self):
+        """Проверяет, что версия данных читается из БД один раз на экземпляр"""
+        version = bump_dataset_version().version
+        result_cache = StatisticsFacade().result_cache
+
+        with self.assertNumQueries(1):
+            self.assertEqual(result_cache.load_version(), version)
+            self.assertEqual(result_cache.load_version(), version)
+            self.assertEqual(result_cache.dataset_version, version)
+
+    def test_repeated_call_is_served_from_cache(self):
+        """Проверяет, что повторный вызов не обращается к таблицам"""
+        bump_dataset_version()
+        expected = StatisticsFacade().get_municipalities_by_region('Волгоградская область')
+
+        facade = StatisticsFacade()
+
+        # Единственный запрос — чтение версии данных
+        with self.assertNumQueries(1):
+            result = facade.get_municipalities_by_region('Волгоградская область')
+            facade.get_municipalities_by_region(region_name='Волгоградская область')
+
+        self.assertEqual(result, expected)
+
+    def test_arguments_are_part_of_the_key(self):
+        """Проверяет, что разные аргументы кэшируются раздельно"""
+        bump_dataset_version()
+        facade = StatisticsFacade()
+
+        cities = facade.get_municipality_settlements('Волгоградская область', 'Волгоград', '', 'город')
+        villages = facade.get_municipality_settlements('Волгоградская область', 'Волгоград', '', 'село')
+
+        self.assertEqual([s['name'] for s in cities], ['Волгоград'])
+        self.assertEqual([s['name'] for s in villages], ['Старая Полтавка'])
+
+    def test_version_bump_invalidates_cached_results(self):
+        """Проверяет, что смена версии данных сбрасывает весь кэш"""
+        bump_dataset_version()
+        before = StatisticsFacade().get_municipality_general_stats('Волгоградская область', 'Волгоград')
+
+        Settlement.objects.create(name='Заячья Балка', municipality=self.municipality, type='посёлок', population=0)
+
+        stale = StatisticsFacade().get_municipality_general_stats('Волгоградская область', 'Волгоград')
+        self.assertEqual(stale, before)
+
+        bump_dataset_version()
+        fresh = StatisticsFacade().get_municipality_general_stats('Волгоградская область', 'Волгоград')
+
+        self.assertEqual(fresh['settlements'], 3)
+        self.assertEqual(fresh['empty_settlements'], 1)
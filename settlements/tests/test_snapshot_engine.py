@@ -0,0 +1,216 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+import numpy as np
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from settlements.benchmarks.facade_benchmark import facade_calls
+from settlements.facades import StatisticsFacade
+from settlements.models import Region, Municipality, Settlement
+from settlements.services import (
+    AggregateBuilder, SettlementSnapshot, SnapshotFetcher, SnapshotProcessor, StringTable,
+    bump_dataset_version, get_snapshot, load_snapshot
+)
+
+
+def decoded(result):
+    """JSON-данные графиков сравниваются по значениям: 5000.0 из pandas равно 5000"""
+    return json.loads(result) if isinstance(result, str) else result
+
+
+def exact_kwargs(call):
+    """Снимок считает перцентили точно, а pandas по умолчанию — по скетчам агрегатов"""
+    if call.method == 'get_settlement_population_stats':
+        return {**call.kwargs, 'approximate': False}
+
+    return call.kwargs
+
+
+class SnapshotEngineTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        region1 = Region.objects.create(name='Волгоградская область')
+        region2 = Region.objects.create(name='Краснодарский край')
+        Region.objects.create(name='Пустой регион')
+
+        mun1 = Municipality.objects.create(name='Волгоград', region=region1)
+        mun2 = Municipality.objects.create(name='Камышин', region=region1)
+        mun3 = Municipality.objects.create(name='Краснодар', region=region2)
+        Municipality.objects.create(name='Камышин', region=region2)
+
+        settlements = [
+            ('Волгоград', mun1, 'город', 1000000),
+            ('Старая Полтавка', mun1, 'село', 5000),
+            ('Ерзовка', mun1, 'рабочий посёлок', 12000),
+            ('Урочище', mun1, 'село', 0),
+            ('Заимка', mun1, 'хутор', None),
+            ('Каменный Брод', mun1, 'село', 700),
+            ('Камышин', mun2, 'город', 100000),
+            ('Краснодар', mun3, 'город', 500000),
+            ('Елизаветинская', mun3, 'станица', 25000),
+        ]
+        Settlement.objects.bulk_create(
+            Settlement(name=name, municipality=municipality, type=settlement_type, population=population)
+            for name, municipality, settlement_type, population in settlements
+        )
+        AggregateBuilder().rebuild()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_results_match_pandas_engine(self):
+        """Проверяет, что все методы фасада совпадают с движком pandas"""
+        locations = [
+            ('Волгоградская область', 'Волгоград'),
+            ('Краснодарский край', 'Камышин'),
+            ('Пустой регион', 'Нет такого'),
+        ]
+
+        for location in locations:
+            for name, call in facade_calls(*location).items():
+                with self.subTest(location=location, method=name):
+                    expected = getattr(StatisticsFacade('pandas'), call.method)(*call.args, **exact_kwargs(call))
+                    actual = getattr(StatisticsFacade('snapshot'), call.method)(*call.args, **call.kwargs)
+
+                    self.assertEqual(decoded(actual), decoded(expected))
+
+    def test_filters_and_pages_match_pandas_engine(self):
+        """Проверяет поиск, фильтр по типу и обход страниц по курсору"""
+        for search_query, settlement_type in [('ка', None), (None, 'село'), ('ВОЛГО', 'город')]:
+            with self.subTest(search=search_query, type=settlement_type):
+                args = ('Волгоградская область', 'Волгоград', search_query, settlement_type)
+
+                self.assertEqual(
+                    StatisticsFacade('snapshot').get_municipality_settlements(*args),
+                    StatisticsFacade('pandas').get_municipality_settlements(*args),
+                )
+
+        pages = {}
+        for engine in ('pandas', 'snapshot'):
+            facade, after, names = StatisticsFacade(engine), None, []
+            while True:
+                page = facade.get_municipality_settlements_page(
+                    'Волгоградская область', 'Волгоград', after=after, page_size=2
+                )
+                names += [row['name'] for row in page['settlements']]
+                after = page['next_cursor']
+                if after is None:
+                    break
+            pages[engine] = names
+
+        self.assertEqual(pages['snapshot'], pages['pandas'])
+        self.assertEqual(len(pages['snapshot']), 6)
+
+    def test_snapshot_answers_without_settlement_queries(self):
+        """Проверяет, что после загрузки снимка фасад читает из БД только версию данных"""
+        bump_dataset_version()
+        get_snapshot()
+
+        facade = StatisticsFacade('snapshot')
+        self.assertIsInstance(facade.processor, SnapshotProcessor)
+
+        with self.assertNumQueries(0):
+            for call in facade_calls('Волгоградская область', 'Волгоград').values():
+                getattr(facade, call.method)(*call.args, **call.kwargs)
+
+        with self.assertNumQueries(1):
+            StatisticsFacade('snapshot')
+
+    def test_snapshot_reloaded_after_import(self):
+        """Проверяет, что смена версии данных перечитывает снимок"""
+        bump_dataset_version()
+        snapshot = get_snapshot()
+        self.assertIs(get_snapshot(), snapshot)
+
+        Settlement.objects.filter(name='Краснодар').update(population=600000)
+        bump_dataset_version()
+
+        reloaded = SnapshotFetcher().snapshot
+        self.assertIsNot(reloaded, snapshot)
+        self.assertEqual(reloaded.version, snapshot.version + 1)
+        self.assertIn(600000, reloaded.population)
+
+    def test_snapshot_is_kept_before_first_import(self):
+        """Проверяет, что без версии данных снимок не перечитывается на каждый запрос"""
+        snapshot = get_snapshot()
+
+        # Только проверка версии и наибольшего id, без чтения таблицы
+        with self.assertNumQueries(2):
+            self.assertIs(get_snapshot(), snapshot)
+
+        Settlement.objects.create(
+            name='Ерзовка', municipality=Municipality.objects.get(name='Камышин', region__name='Краснодарский край'),
+            type='село', population=300
+        )
+
+        reloaded = get_snapshot()
+        self.assertIsNot(reloaded, snapshot)
+        self.assertIn(300, reloaded.population)
+
+
+class SnapshotFileTestCase(TestCase):
+    setUpTestData = SnapshotEngineTestCase.setUpTestData
+
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'settlements.snapshot')
+
+    def test_file_round_trip(self):
+        """Проверяет, что снимок из файла совпадает со снимком из БД и отображён в память"""
+        snapshot = SettlementSnapshot.from_database(version=7)
+        snapshot.to_file(self.path)
+
+        with self.assertNumQueries(0):
+            mapped = SettlementSnapshot.from_file(self.path)
+
+        self.assertEqual(mapped.version, 7)
+        self.assertIsInstance(mapped.population.base, np.memmap)
+        self.assertIsInstance(mapped.names, StringTable)
+        self.assertEqual(mapped.names[:].tolist(), snapshot.names.tolist())
+        self.assertEqual(mapped.names[3], snapshot.names[3])
+        self.assertEqual(mapped.municipality_names, snapshot.municipality_names)
+        self.assertEqual(mapped.type_names, snapshot.type_names)
+
+        for name in ('ids', 'type_codes', 'municipality_codes', 'population', 'municipality_regions'):
+            np.testing.assert_array_equal(getattr(mapped, name), getattr(snapshot, name))
+
+    def test_engine_answers_from_exported_file(self):
+        """Проверяет, что движок snapshot открывает выгруженный файл текущей версии"""
+        bump_dataset_version()
+        call_command('export_snapshot', output=self.path, stdout=StringIO())
+
+        with override_settings(SETTLEMENTS_SNAPSHOT_PATH=self.path):
+            with self.assertNumQueries(1):
+                snapshot = get_snapshot()
+
+            self.assertIsInstance(snapshot.names, StringTable)
+
+            for name, call in facade_calls('Волгоградская область', 'Волгоград').items():
+                with self.subTest(method=name):
+                    expected = getattr(StatisticsFacade('pandas'), call.method)(*call.args, **exact_kwargs(call))
+                    actual = getattr(StatisticsFacade('snapshot'), call.method)(*call.args, **call.kwargs)
+
+                    self.assertEqual(decoded(actual), decoded(expected))
+
+    def test_stale_file_is_ignored(self):
+        """Проверяет, что файл другой версии данных не используется"""
+        bump_dataset_version()
+        call_command('export_snapshot', output=self.path, stdout=StringIO())
+        version = bump_dataset_version()
+
+        with override_settings(SETTLEMENTS_SNAPSHOT_PATH=self.path):
+            snapshot = load_snapshot(version.version)
+
+        self.assertNotIsInstance(snapshot.names, StringTable)
+        self.assertEqual(snapshot.version, version.version)
+
+    def test_export_requires_dataset_version(self):
+        with self.assertRaises(CommandError):
+            call_command('export_snapshot', output=self.path, stdout=StringIO())
@@ -0,0 +1,103 @@
+import pandas as pd
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+
+from settlements.facades import StatisticsFacade
+from settlements.models import Region, Municipality, Settlement
+from settlements.services import DataFetcher, DataProcessor, SqlDataProcessor
+
+
+class SqlDataProcessorTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.region1 = Region.objects.create(name='Волгоградская область')
+        cls.region2 = Region.objects.create(name='Краснодарский край')
+
+        cls.mun1 = Municipality.objects.create(name='Волгоград', region=cls.region1)
+        cls.mun2 = Municipality.objects.create(name='Камышин', region=cls.region1)
+        cls.mun3 = Municipality.objects.create(name='Краснодар', region=cls.region2)
+
+        Settlement.objects.create(name='Волгоград', municipality=cls.mun1, type='город', population=1000000)
+        Settlement.objects.create(name='Старая Полтавка', municipality=cls.mun1, type='село', population=5000)
+        Settlement.objects.create(name='Урочище', municipality=cls.mun1, type='село', population=0)
+        Settlement.objects.create(name='Заимка', municipality=cls.mun1, type='хутор', population=None)
+        Settlement.objects.create(name='Камышин', municipality=cls.mun2, type='город', population=100000)
+        Settlement.objects.create(name='Краснодар', municipality=cls.mun3, type='город', population=500000)
+
+    def setUp(self):
+        self.fetcher = DataFetcher()
+        self.pandas = DataProcessor()
+        self.sql = SqlDataProcessor()
+
+    def test_aggregate_by_region_matches_pandas(self):
+        """Проверяет совпадение агрегации по регионам"""
+        data = self.fetcher.fetch_all_settlements_with_relations()
+
+        expected = self.pandas.aggregate_by_region(data).to_dict('records')
+        actual = self.sql.aggregate_by_region(data).to_dict('records')
+
+        self.assertEqual(actual, expected)
+
+    def test_aggregate_by_municipality_matches_pandas(self):
+        """Проверяет совпадение агрегации по муниципалитетам"""
+        data = self.fetcher.fetch_settlements_by_region('Волгоградская область')
+
+        expected = self.pandas.aggregate_by_municipality(data).to_dict('records')
+        actual = self.sql.aggregate_by_municipality(data).to_dict('records')
+
+        self.assertEqual(actual, expected)
+
+    def test_distribution_by_type_matches_pandas(self):
+        """Проверяет совпадение распределения по типам"""
+        data = Settlement.objects.values_list('type', 'population')
+
+        expected = self.pandas.get_distribution_by_type(data).to_dict('records')
+        actual = self.sql.get_distribution_by_type(data).to_dict('records')
+
+        self.assertEqual(actual, expected)
+
+    def test_calculate_statistics_uses_percentile_median(self):
+        """Проверяет расчёт статистики с медианой через percentile_cont"""
+        data = self.fetcher.fetch_settlements_by_municipality('Волгоградская область', 'Волгоград')
+
+        self.assertEqual(self.sql.calculate_statistics(data), self.pandas.calculate_statistics(data))
+        self.assertEqual(self.sql.calculate_statistics(data)['median'], 502500)
+
+    def test_group_statistics_match_pandas(self):
+        """Проверяет статистику по суммам групп"""
+        data = self.fetcher.fetch_all_settlements_with_relations()
+        columns = ['region', 'municipality', 'population']
+
+        self.assertEqual(
+            self.sql.calculate_group_statistics(data, columns, 'region'),
+            self.pandas.calculate_group_statistics(data, columns, 'region'),
+        )
+
+    def test_sql_engine_returns_only_grouped_rows(self):
+        """Проверяет, что из БД приходит один сгруппированный запрос"""
+        data = self.fetcher.fetch_all_settlements_with_relations()
+
+        with self.assertNumQueries(1):
+            result = self.sql.aggregate_by_region(data)
+
+        self.assertEqual(len(result), 2)
+
+
+class FacadeEngineSelectionTestCase(TestCase):
+    @override_settings(SETTLEMENTS_STATS_ENGINE='pandas')
+    def test_pandas_engine_selected_by_setting(self):
+        self.assertIs(type(StatisticsFacade().processor), DataProcessor)
+
+    @override_settings(SETTLEMENTS_STATS_ENGINE='sql')
+    def test_engine_selected_by_setting(self):
+        facade = StatisticsFacade()
+        self.assertEqual(facade.engine, 'sql')
+        self.assertIsInstance(facade.processor, SqlDataProcessor)
+
+    def test_sql_engine_handles_materialized_series(self):
+        stats = StatisticsFacade(engine='sql').processor.calculate_statistics(pd.Series([100, 200, 300]))
+        self.assertEqual(stats['median'], 200)
+
+    def test_unknown_engine_raises(self):
+        with self.assertRaises(ImproperlyConfigured):
+            StatisticsFacade(engine='spark')
@@ -1,5 +1,13 @@
-from django.test import TestCase, Client
+import json
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote
+
+from django.db import connections
+from django.test import TestCase, TransactionTestCase, Client
 from settlements.models import Region, Municipality, Settlement
+from settlements.state.breadcrumb import BreadcrumbState
 
 
 class StatsViewIntegrationTestCase(TestCase):
@@ -82,16 +90,42 @@ class StatsViewIntegrationTestCase(TestCase):
         self.assertIn('total', stats)
 
     def test_stats_view_contains_settlement_types(self):
-        """Проверяет что в контексте есть распределение по типам"""
+        """Проверяет что в контексте есть распределение по типам для графика"""
         response = self.client.get('/settlements/')
-        self.assertIn('settlement_types', response.context)
-        self.assertGreater(len(response.context['settlement_types']), 0)
+        self.assertIn('settlement_types_chart', response.context)
+        self.assertNotIn('settlement_types', response.context)
+
+        chart = json.loads(response.context['settlement_types_chart'])
+        self.assertGreater(len(chart['type']), 0)
+        self.assertEqual(len(chart['type']), len(chart['population']))
 
     def test_stats_view_contains_breadcrumb(self):
         """Проверяет что в контексте есть хлебные крошки"""
         response = self.client.get('/settlements/')
         self.assertIn('breadcrumb', response.context)
 
+    def test_breadcrumb_follows_url(self):
+        """Проверяет хлебные крошки региона и муниципалитета, построенные по URL"""
+        response = self.client.get('/settlements/regions/Волгоградская область/Волгоград/')
+        self.assertEqual([label for label, _ in response.context['breadcrumb']], [
+            'Главная', 'Волгоградская область', 'Волгоград'
+        ])
+
+        # Предыдущий запрос не влияет на навигацию следующего
+        response = self.client.get('/settlements/')
+        self.assertEqual(response.context['breadcrumb'], [('Главная', '/settlements/')])
+
+    def test_breadcrumb_states_are_independent(self):
+        """Проверяет, что у каждой навигации своё состояние"""
+        region = BreadcrumbState('Краснодарский край')
+        municipality = BreadcrumbState('Волгоградская область', 'Волгоград')
+
+        self.assertEqual([label for label, _ in region.get_breadcrumb()], ['Главная', 'Краснодарский край'])
+        self.assertEqual(municipality.region_name, 'Волгоградская область')
+
+        with self.assertRaises(ValueError):
+            BreadcrumbState(municipality_name='Волгоград')
+
 
 class RegionDetailViewIntegrationTestCase(TestCase):
     @classmethod
@@ -281,4 +315,79 @@ class MunicipalityDetailViewIntegrationTestCase(TestCase):
 
         self.assertIn('page_obj', response.context)
         self.assertIn('total_results', response.context)
-        self.assertEqual(response.context['total_results'], 3)
\ No newline at end of file
+        self.assertEqual(response.context['total_results'], 3)
+
+
+class ConcurrentBreadcrumbTestCase(TransactionTestCase):
+    """Страницы под нагрузкой из многих потоков, как под потоковым WSGI-сервером"""
+    threads = 8
+    requests_per_thread = 12
+
+    def setUp(self):
+        for region_name, municipalities in [
+            ('Волгоградская область', ['Волгоград', 'Камышин']),
+            ('Краснодарский край', ['Краснодар', 'Сочи']),
+        ]:
+            region = Region.objects.create(name=region_name)
+
+            for municipality_name in municipalities:
+                municipality = Municipality.objects.create(name=municipality_name, region=region)
+                Settlement.objects.create(
+                    name=municipality_name, municipality=municipality, type='Город', population=1000
+                )
+
+        self.pages = [('/settlements/', ['Главная'])]
+        for municipality in Municipality.objects.select_related('region'):
+            region_name = municipality.region.name
+
+            self.pages.append((f'/settlements/regions/{region_name}/', ['Главная', region_name]))
+            self.pages.append((
+                f'/settlements/regions/{region_name}/{municipality.name}/',
+                ['Главная', region_name, municipality.name],
+            ))
+
+    @staticmethod
+    def breadcrumb_labels(response):
+        nav = re.search(r'<nav class="breadcrumb">(.*?)</nav>', response.content.decode(), re.S).group(1)
+        return [
+            (label, unquote(url)) for url, label in re.findall(r'<a href="([^"]+)" class="breadcrumb-item">([^<]+)</a>', nav)
+        ]
+
+    def fetch_pages(self, offset):
+        client = Client()
+        mismatches = []
+
+        try:
+            for index in range(self.requests_per_thread):
+                url, expected = self.pages[(offset + index) % len(self.pages)]
+                response = client.get(url)
+
+                labels = [label for label, _ in self.breadcrumb_labels(response)]
+                if response.status_code != 200 or labels != expected:
+                    mismatches.append((url, response.status_code, labels))
+        finally:
+            connections.close_all()
+
+        return mismatches
+
+    def test_concurrent_requests_get_their_own_breadcrumbs(self):
+        """Проверяет, что параллельные запросы не перезаписывают навигацию друг друга"""
+        # Частое переключение потоков, чтобы гонки проявлялись и на одном процессоре
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, switch_interval)
+
+        with ThreadPoolExecutor(max_workers=self.threads) as pool:
+            results = list(pool.map(self.fetch_pages, range(self.threads)))
+
+        self.assertEqual([mismatch for result in results for mismatch in result], [])
+
+    def test_breadcrumb_links_point_to_pages(self):
+        """Проверяет адреса ссылок хлебных крошек"""
+        response = self.client.get('/settlements/regions/Краснодарский край/Сочи/')
+
+        self.assertEqual(self.breadcrumb_labels(response), [
+            ('Главная', '/settlements/'),
+            ('Краснодарский край', '/settlements/regions/Краснодарский край/'),
+            ('Сочи', '/settlements/regions/Краснодарский край/Сочи/'),
+        ])
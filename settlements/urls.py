@@ -1,10 +1,33 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import api, views
 
 app_name = 'settlements'
 
+if getattr(settings, 'SETTLEMENTS_ASYNC_VIEWS', False):
+    # Под ASGI вызовы фасада на странице выполняются параллельно
+    StatsView = views.AsyncStatsView
+    RegionDetailView = views.AsyncRegionDetailView
+    MunicipalityDetailView = views.AsyncMunicipalityDetailView
+else:
+    StatsView = views.StatsView
+    RegionDetailView = views.RegionDetailView
+    MunicipalityDetailView = views.MunicipalityDetailView
+
 urlpatterns = [
-    path('', views.StatsView.as_view(), name='stats'),
-    path('regions/<str:region_name>/', views.RegionDetailView.as_view(), name='region'),
-    path('regions/<str:region_name>/<str:municipality_name>/', views.MunicipalityDetailView.as_view(), name='municipality'),
+    path('', StatsView.as_view(), name='stats'),
+    path('regions/<str:region_name>/', RegionDetailView.as_view(), name='region'),
+    path('regions/<str:region_name>/<str:municipality_name>/', MunicipalityDetailView.as_view(), name='municipality'),
+
+    path('api/', api.StatsApiView.as_view(), name='api_stats'),
+    path('api/search/', api.SettlementSearchApiView.as_view(), name='api_search'),
+    path('api/export/', api.SettlementExportView.as_view(), name='api_export'),
+    path('api/compare/', api.RegionsComparisonApiView.as_view(), name='api_compare'),
+    path('api/regions/<str:region_name>/', api.RegionApiView.as_view(), name='api_region'),
+    path('api/regions/<str:region_name>/<str:municipality_name>/', api.MunicipalityApiView.as_view(), name='api_municipality'),
+    path(
+        'api/regions/<str:region_name>/<str:municipality_name>/settlements/',
+        api.MunicipalitySettlementsApiView.as_view(),
+        name='api_municipality_settlements'
+    ),
 ]
@@ -1,116 +1,181 @@
-from django.core.paginator import Paginator
-from django.db.models import Q
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from django.views.generic import TemplateView
 
 from .models import Municipality
-from .facades import StatisticsFacade
-from settlements.state.breadcrumb import BreadcrumbState
-
-class StatsView(TemplateView):
-    template_name = 'settlements/stats.html'
+from .metrics import REGISTRY
+from .pagination import KeysetCursor, KeysetPage
+from .facades import facade_call, gather_facade_calls, run_facade_calls
+
+# Поселений на странице муниципалитета
+MUNICIPALITY_PAGE_SIZE = 20
+
+
+def stats_page_calls():
+    """Вызовы фасада главной страницы"""
+    return {
+        'top_regions': facade_call('get_top_regions'),
+        'population_stats': facade_call('get_population_stats'),
+        'settlement_types_chart': facade_call('get_settlement_types_chart'),
+        'general_stats': facade_call('get_general_stats'),
+        'population_distribution': facade_call('get_population_distribution'),
+    }
+
+
+def region_page_calls(region_name):
+    """Вызовы фасада страницы региона"""
+    return {
+        'region_stats': facade_call('get_general_stats', region_name),
+        'population_stats': facade_call('get_population_stats_by_region', region_name),
+        'municipalities': facade_call('get_municipalities_by_region', region_name),
+        'settlement_types_chart': facade_call('get_settlement_types_chart', region_name),
+        'population_distribution': facade_call('get_population_distribution', region_name),
+    }
+
+
+def municipality_page_calls(region_name, municipality_name, search_query='', settlement_type='',
+                            after=None, page_size=MUNICIPALITY_PAGE_SIZE, before=None):
+    """Вызовы фасада страницы муниципалитета (без параметров — первая страница без фильтров)"""
+    return {
+        'population_stats': facade_call(
+            'get_municipality_population_stats', region_name, municipality_name
+        ),
+        'general_stats': facade_call(
+            'get_municipality_general_stats', region_name, municipality_name
+        ),
+        'settlements_page': facade_call(
+            'get_municipality_settlements_page', region_name, municipality_name,
+            search_query, settlement_type, after=after, page_size=page_size, before=before
+        ),
+        'settlement_types': facade_call(
+            'get_settlement_types', region_name, municipality_name
+        ),
+        'settlement_types_chart': facade_call(
+            'get_settlement_types_chart', region_name, municipality_name
+        ),
+        'population_distribution': facade_call(
+            'get_population_distribution', region_name, municipality_name
+        ),
+    }
+
+
+class FacadeContextMixin:
+    """
+    Контекст страницы из независимых вызовов StatisticsFacade.
+    Синхронная версия выполняет их по очереди, AsyncFacadeViewMixin — параллельно.
+    """
+    facade_results = None
+
+    def get_facade_calls(self):
+        """Словарь {ключ контекста: facade_call(...)}"""
+        raise NotImplementedError
+
+    def check_object(self):
+        """Проверить объект страницы до вызовов фасада (Http404), чтобы не заполнять кэш"""
+
+    def get(self, request, *args, **kwargs):
+        self.check_object()
+        return super().get(request, *args, **kwargs)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        facade = StatisticsFacade()
-
-        context['top_regions'] = facade.get_top_regions()
-        context['population_stats'] = facade.get_population_stats()
-        context['settlement_types'] = facade.get_settlement_types_distribution()
-        context['general_stats'] = facade.get_general_stats()
-        context['population_distribution'] = facade.get_population_distribution()
+        if self.facade_results is None:
+            self.facade_results = run_facade_calls(self.get_facade_calls())
 
-        breadcrumb = BreadcrumbState()
-        breadcrumb.clear()
-        context['breadcrumb'] = breadcrumb.get_breadcrumb()
+        context.update(self.facade_results)
 
         return context
 
 
-class RegionDetailView(TemplateView):
-    template_name = 'settlements/region.html'
+class AsyncFacadeViewMixin:
+    """
+    Асинхронный вариант страницы (для ASGI): вызовы фасада выполняются
+    параллельно через asyncio.gather, остальной контекст и шаблон — как обычно.
+    """
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        region_name = self.kwargs['region_name']
+    async def get(self, request, *args, **kwargs):
+        await sync_to_async(self.check_object)()
 
-        facade = StatisticsFacade()
+        self.facade_results = await gather_facade_calls(self.get_facade_calls())
+        context = await sync_to_async(self.get_context_data)(**kwargs)
 
-        context['region_stats'] = facade.get_general_stats(region_name)
-        context['population_stats'] = facade.get_population_stats_by_region(region_name)
-        context['municipalities'] = facade.get_municipalities_by_region(region_name)
-        context['region_name'] = region_name
-        context['settlement_types_chart'] = facade.get_settlement_types_distribution(
-            Q(municipality__region__name=region_name)
-        )
-        context['population_distribution'] = facade.get_population_distribution(
-            Q(municipality__region__name=region_name)
-        )
+        return self.render_to_response(context)
 
-        breadcrumb = BreadcrumbState()
-        breadcrumb.set_region(region_name)
-        context['breadcrumb'] = breadcrumb.get_breadcrumb()
 
-        return context
+class StatsView(FacadeContextMixin, TemplateView):
+    template_name = 'settlements/stats.html'
 
+    def get_facade_calls(self):
+        return stats_page_calls()
 
-class MunicipalityDetailView(TemplateView):
-    template_name = 'settlements/municipality.html'
-    paginate_by = 20
+
+class RegionDetailView(FacadeContextMixin, TemplateView):
+    template_name = 'settlements/region.html'
+
+    def get_facade_calls(self):
+        return region_page_calls(self.kwargs['region_name'])
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        context['region_name'] = self.kwargs['region_name']
+
+        return context
 
-        region_name = self.kwargs['region_name']
-        municipality_name = self.kwargs['municipality_name']
 
-        municipality = get_object_or_404(
+class MunicipalityDetailView(FacadeContextMixin, TemplateView):
+    template_name = 'settlements/municipality.html'
+    paginate_by = MUNICIPALITY_PAGE_SIZE
+
+    def get_facade_calls(self):
+        return municipality_page_calls(
+            self.kwargs['region_name'], self.kwargs['municipality_name'],
+            self.request.GET.get('search', ''), self.request.GET.get('type', ''),
+            after=KeysetCursor.clean(self.request.GET.get('after')),
+            before=KeysetCursor.clean(self.request.GET.get('before')),
+            page_size=self.paginate_by
+        )
+
+    def check_object(self):
+        self.municipality = get_object_or_404(
             Municipality,
-            name=municipality_name,
-            region__name=region_name
+            name=self.kwargs['municipality_name'],
+            region__name=self.kwargs['region_name']
         )
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+
         search_query = self.request.GET.get('search', '')
         settlement_type = self.request.GET.get('type', '')
-        page_number = self.request.GET.get('page', 1)
-
-        context['municipality'] = municipality
-        context['region_name'] = region_name
-
-        facade = StatisticsFacade()
-
-        context['population_stats'] = facade.get_municipality_population_stats(
-            region_name, municipality_name
-        )
-        context['general_stats'] = facade.get_municipality_general_stats(
-            region_name, municipality_name
-        )
 
-        settlements = facade.get_municipality_settlements(
-            region_name, municipality_name, search_query, settlement_type
-        )
+        context['municipality'] = self.municipality
+        context['region_name'] = self.kwargs['region_name']
 
-        paginator = Paginator(settlements, self.paginate_by)
-        page_obj = paginator.get_page(page_number)
+        page = context.pop('settlements_page')
+        page_obj = KeysetPage(page['settlements'], page['next_cursor'], page['total'], page['previous_cursor'])
 
         context['page_obj'] = page_obj
         context['search_query'] = search_query
         context['selected_type'] = settlement_type
-        context['settlement_types'] = facade.get_settlement_types(
-            region_name, municipality_name
-        )
-        context['total_results'] = paginator.count
-        context['settlement_types_chart'] = facade.get_settlement_types_distribution(
-            Q(municipality__name=municipality_name, municipality__region__name=region_name)
-        )
-        context['population_distribution'] = facade.get_population_distribution(
-            Q(municipality__name=municipality.name, municipality__region__name=region_name)
-        )
+        context['total_results'] = page['total']
+
+        return context
+
+
+class AsyncStatsView(AsyncFacadeViewMixin, StatsView):
+    pass
+
+
+class AsyncRegionDetailView(AsyncFacadeViewMixin, RegionDetailView):
+    pass
+
+
+class AsyncMunicipalityDetailView(AsyncFacadeViewMixin, MunicipalityDetailView):
+    pass
 
-        breadcrumb = BreadcrumbState()
-        breadcrumb.set_region(region_name)
-        breadcrumb.set_municipality(municipality_name)
-        context['breadcrumb'] = breadcrumb.get_breadcrumb()
 
-        return context
\ No newline at end of file
+def metrics(request):
+    """Метрики процесса в текстовом формате Prometheus"""
+    return HttpResponse(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
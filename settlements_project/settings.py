@@ -35,6 +35,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.humanize',
+    'django.contrib.postgres',
     'settlements',
 ]
 
@@ -46,6 +47,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'settlements.instrumentation.InstrumentationMiddleware',
 ]
 
 ROOT_URLCONF = 'settlements_project.urls'
@@ -60,6 +62,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'settlements.context_processors.breadcrumb',
             ],
         },
     },
@@ -79,8 +82,49 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD', 'postgres'),
         'HOST': os.getenv('DB_HOST', 'localhost'),
         'PORT': os.getenv('DB_PORT', '5432'),
+        # Постоянные соединения: сколько секунд держать соединение между запросами (0 — закрывать)
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
+
+# Пул соединений psycopg (нужен psycopg 3 с psycopg_pool: pip install "psycopg[pool]").
+# DB_POOL_MAX_SIZE > 0 включает пул вместо постоянных соединений
+
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', 0))
+
+if DB_POOL_MAX_SIZE:
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+            'max_size': DB_POOL_MAX_SIZE,
+            'timeout': int(os.getenv('DB_POOL_TIMEOUT', 10)),
+        },
+    }
+
+# Реплика для аналитических чтений (settlements.db_router.ReplicaRouter);
+# запись, в том числе import_data, всегда идёт в основную БД
+
+if os.getenv('DB_REPLICA_HOST') or os.getenv('DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'USER': os.getenv('DB_REPLICA_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.getenv('DB_REPLICA_PASSWORD', DATABASES['default']['PASSWORD']),
+        'HOST': os.getenv('DB_REPLICA_HOST', DATABASES['default']['HOST']),
+        'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'OPTIONS': {**DATABASES['default'].get('OPTIONS', {})},
+        # В тестах реплика — та же тестовая БД; DB_REPLICA_TEST_NAME даёт ей
+        # отдельную тестовую БД (нужно для TwoDatabasesRoutingTestCase)
+        'TEST': (
+            {'NAME': os.getenv('DB_REPLICA_TEST_NAME')} if os.getenv('DB_REPLICA_TEST_NAME')
+            else {'MIRROR': 'default'}
+        ),
+    }
+
+DATABASE_ROUTERS = ['settlements.db_router.ReplicaRouter']
+
 ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
 
 # Password validation
@@ -121,4 +165,53 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'static'),
-]
\ No newline at end of file
+]
+
+
+# Settlements analytics
+# Движок агрегации статистики: 'pandas' (в Python), 'sql' (в PostgreSQL)
+# или 'snapshot' (колоночный снимок данных в памяти процесса)
+
+SETTLEMENTS_STATS_ENGINE = os.getenv('STATS_ENGINE', 'pandas')
+
+# Файл снимка для движка 'snapshot' (команда export_snapshot); воркеры отображают его
+# через np.memmap вместо чтения таблицы. Пусто — снимок читается из БД
+
+SETTLEMENTS_SNAPSHOT_PATH = os.getenv('SNAPSHOT_PATH', '')
+
+# Асинхронные страницы: независимые вызовы фасада выполняются параллельно (для запуска под ASGI)
+
+SETTLEMENTS_ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', 'False') == 'True'
+
+# Число интервалов на порядок величины в гистограмме населения
+
+SETTLEMENTS_HISTOGRAM_BINS_PER_DECADE = int(os.getenv('HISTOGRAM_BINS_PER_DECADE', 4))
+
+# Сериализация JSON для графиков и API: 'auto' (orjson, если установлен), 'orjson' или 'json'
+
+SETTLEMENTS_JSON_BACKEND = os.getenv('JSON_BACKEND', 'auto')
+
+# Порог медленного запроса в миллисекундах для лога settlements.slow_requests (0 — не писать)
+
+SETTLEMENTS_SLOW_REQUEST_MS = int(os.getenv('SLOW_REQUEST_MS', 1000))
+
+# Псевдоним БД для чтений статистики (пусто — основная БД)
+
+SETTLEMENTS_READ_REPLICA = 'replica' if 'replica' in DATABASES else None
+
+# Число процессов команды warm_cache (0 — по числу процессоров)
+
+SETTLEMENTS_WARM_CACHE_WORKERS = int(os.getenv('WARM_CACHE_WORKERS', 0))
+
+# Кэш результатов StatisticsFacade; инвалидируется сменой версии данных при импорте
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'settlements'),
+    }
+}
+
+SETTLEMENTS_CACHE_ALIAS = 'default'
+
+SETTLEMENTS_CACHE_TIMEOUT = int(os.getenv('STATS_CACHE_TIMEOUT', 60 * 60 * 24))
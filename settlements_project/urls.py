@@ -2,8 +2,11 @@ from django.contrib import admin
 from django.urls import path, include
 from django.views.generic import RedirectView
 
+from settlements.views import metrics
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('settlements/', include('settlements.urls')),
+    path('metrics', metrics, name='metrics'),
     path('', RedirectView.as_view(url='/settlements/')),
 ]
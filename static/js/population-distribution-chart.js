@@ -1,36 +1,44 @@
-function initPopulationDistributionChart(canvasId, populationData, step = 1) {
-    const container = document.getElementById(canvasId);
-    if (!container || !populationData || populationData.length === 0) {
-        return;
+function formatPopulationBin(from, to) {
+    const fromText = from.toLocaleString('ru-RU');
+
+    if (to === null) {
+        return `от ${fromText}`;
     }
 
-    const data = populationData
-        .filter(item => item.population > 0)
-        .filter((_, i) => i % step === 0);
+    // Интервалы полуоткрытые: [from, to)
+    const toText = (to - 1).toLocaleString('ru-RU');
+    return to - 1 === from ? fromText : `${fromText}–${toText}`;
+}
 
-    const xValues = data.map(() => Math.random());
-    const yValues = data.map(item => item.population);
+function initPopulationDistributionChart(canvasId, histogramData) {
+    // Данные приходят по колонкам: {from: [...], to: [...], count: [...]}
+    const container = document.getElementById(canvasId);
+    if (!container || !histogramData || histogramData.count.length === 0) {
+        return;
+    }
 
     const trace = {
-        x: xValues,
-        y: yValues,
-        mode: 'markers',
-        type: 'scatter',
+        x: histogramData.from.map((from, index) => formatPopulationBin(from, histogramData.to[index])),
+        y: histogramData.count,
+        type: 'bar',
         marker: {
-            size: 8,
             color: '#3498db',
-            opacity: 0.6
-        }
+            opacity: 0.8
+        },
+        hovertemplate: '%{x} чел.: %{y} поселений<extra></extra>'
     };
 
     const layout = {
-        title: 'Плотность населения поселений',
+        title: 'Распределение поселений по численности населения',
         xaxis: {
-            visible: false
+            title: 'Население (человек, логарифмическая шкала)',
+            type: 'category',
+            tickangle: -45
         },
         yaxis: {
-            title: 'Население (человек)'
+            title: 'Число поселений'
         },
+        bargap: 0.05,
         height: 500,
         showlegend: false
     };
@@ -1,6 +1,7 @@
 function initSettlementTypesChart(canvasId, data) {
-    const labels = data.map(item => item.type);
-    const populations = data.map(item => item.population);
+    // Данные приходят по колонкам: {type: [...], population: [...]}
+    const labels = data.type;
+    const populations = data.population;
     const maxValue = Math.max(...populations);
 
     const colors = [